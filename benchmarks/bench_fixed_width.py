@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare decoding a block of floats from the AUX file token by token with
+decoding it as fixed-width fields.
+
+Usage: python benchmarks/bench_fixed_width.py [n_values ...]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from mopac_step.mopac_base import _fixed_width_floats, _split_run_together
+
+
+def make_block(n_values, per_line=10, fmt="{:8.3f}", seed=0):
+    """Lines of floats as written by MOPAC, some of them run together."""
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(-999.0, 999.0, n_values)
+    lines = []
+    for start in range(0, n_values, per_line):
+        lines.append(
+            " " + "".join(fmt.format(x) for x in values[start : start + per_line])
+        )
+    return lines
+
+
+def per_token(lines):
+    """The original path: split into tokens, fix run together numbers, convert."""
+    tokens = _split_run_together(" ".join(lines).split())
+    return np.array([float(value) for value in tokens])
+
+
+def fixed_width(lines):
+    """The fast path."""
+    return _fixed_width_floats(lines)
+
+
+def main(sizes):
+    print(f"{'values':>10s} {'per token':>12s} {'fixed width':>12s} {'speedup':>8s}")
+    for n_values in sizes:
+        lines = make_block(n_values)
+        assert np.array_equal(per_token(lines), fixed_width(lines))
+        number = max(1, 200000 // n_values)
+        t_token = min(timeit.repeat(lambda: per_token(lines), number=number, repeat=3))
+        t_fixed = min(
+            timeit.repeat(lambda: fixed_width(lines), number=number, repeat=3)
+        )
+        t_token /= number
+        t_fixed /= number
+        print(
+            f"{n_values:10d} {1000 * t_token:10.3f}ms {1000 * t_fixed:10.3f}ms "
+            f"{t_token / t_fixed:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [1000, 10000, 100000, 1000000]
+    main(sizes)
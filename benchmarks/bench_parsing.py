@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark parsing and analyzing MOPAC output, without running MOPAC.
+
+Synthetic mopac.aux and mopac.out files are generated for each kind of
+calculation and size of system, and the following are timed:
+
+    parse     reading all sections of the AUX file with MOPAC.read_aux()
+    out       splitting the output file into sections
+    analyze   MOPAC.analyze(), including each substep's analyze()
+
+The throughput is given in MB/s of the file read, and the peak memory
+allocated by Python, from tracemalloc, in MB. The results can be saved as JSON
+and compared with an earlier run to catch regressions:
+
+    python -m benchmarks.bench_parsing --json baseline.json
+    ... change the code ...
+    python -m benchmarks.bench_parsing --compare baseline.json
+
+which exits with a non-zero status if any timing is more than --tolerance
+times slower than the baseline.
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import molsystem
+import seamm
+
+import mopac_step
+from benchmarks.synthetic import generate
+
+KINDS = {
+    "energy": "Energy",
+    "optimization": "Optimization",
+    "force": "IR",
+    "thermo": "Thermodynamics",
+    "force constants": "Forceconstants",
+}
+
+# Calculations whose size grows as the square of the number of atoms
+DENSE = ("force", "thermo", "force constants")
+
+# The RMSD between the initial and optimized structures aligns every
+# permutation of equivalent molecules, so is very slow for the water boxes
+OPTIMIZATION_LIMIT = 100
+
+
+def setup(directory, kind, molecule):
+    """Create a MOPAC step with the substep for the kind of calculation.
+
+    Parameters
+    ----------
+    directory : str
+        The directory for the flowchart.
+    kind : str
+        The kind of calculation.
+    molecule : benchmarks.synthetic.Molecule
+        The system.
+
+    Returns
+    -------
+    mopac_step.MOPAC
+        The MOPAC step, with its system in the flowchart variables.
+    """
+    seamm.flowchart_variables = seamm.Variables()
+    flowchart = seamm.Flowchart(directory=directory)
+    mopac = mopac_step.MOPAC(flowchart=flowchart)
+    # The defaults of the command-line options, normally set by the parser
+    mopac.options = {
+        "mopac_exe": "mopac",
+        "mopac_path": "",
+        "ncores": "default",
+        "mkl_num_threads": "default",
+        "max_atoms_to_print": 25,
+        "backend": "executable",
+        "parallel_jobs": "default",
+    }
+    flowchart.add_node(mopac)
+    flowchart.add_edge(
+        flowchart.get_node("1"),
+        mopac,
+        edge_type="execution",
+        start_point="s",
+        end_point="n",
+    )
+    subflowchart = mopac.subflowchart
+    node = getattr(mopac_step, KINDS[kind])(flowchart=subflowchart)
+    node.parent = mopac
+    subflowchart.add_node(node)
+    subflowchart.add_edge(
+        subflowchart.get_node("1"),
+        node,
+        edge_type="execution",
+        start_point="s",
+        end_point="n",
+    )
+    if kind == "force constants":
+        node.parameters["two-sided_cell"].value = "no"
+        node.parameters["MOZYME"].value = "never"
+    flowchart.set_ids()
+
+    system_db = molsystem.SystemDB(filename=":memory:")
+    seamm.flowchart_variables.set_variable("_system_db", system_db)
+    system = system_db.create_system()
+    configuration = system.create_configuration()
+    if molecule.periodic:
+        configuration.periodicity = 3
+        configuration.coordinate_system = "Cartesian"
+        configuration.cell.parameters = molecule.cell
+    x, y, z = molecule.xyz.T.tolist()
+    configuration.atoms.append(x=x, y=y, z=z, symbol=molecule.symbols)
+
+    return mopac
+
+
+def measure(function, memory):
+    """Time a function and optionally find the peak memory it allocates.
+
+    Returns
+    -------
+    float, float or None
+        The time in seconds and peak memory in MB.
+    """
+    gc.collect()
+    t0 = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - t0
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(kind, n_atoms, memory=True, dense_limit=1000):
+    """Benchmark one kind of calculation for one size of system."""
+    molecule, aux_text, out_text, n_calculations = generate(
+        kind, n_atoms, dense_limit=dense_limit
+    )
+    result = {"kind": kind, "n_atoms": molecule.n_atoms}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mopac = setup(tmpdir, kind, molecule)
+        directory = Path(mopac.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        aux_path = directory / "mopac.aux"
+        out_path = directory / "mopac.out"
+        aux_path.write_text(aux_text)
+        out_path.write_text(out_text)
+        del aux_text, out_text
+        aux_mb = os.path.getsize(aux_path) / 1e6
+        out_mb = os.path.getsize(out_path) / 1e6
+        result["aux MB"] = aux_mb
+        result["out MB"] = out_mb
+
+        t, peak = measure(
+            lambda: list(mopac.read_aux(aux_path, as_arrays=True)), memory
+        )
+        result["parse s"] = t
+        result["parse MB/s"] = aux_mb / t
+        result["parse peak MB"] = peak
+
+        t, peak = measure(lambda: mopac.read_output_sections(out_path), memory)
+        result["out s"] = t
+        result["out MB/s"] = out_mb / t
+        result["out peak MB"] = peak
+
+        # Time each substep's analyze() as MOPAC.analyze() calls it
+        node_times = {}
+        node = mopac.subflowchart.get_node("1").next()
+        while node:
+            original = node.analyze
+
+            def timed(*args, _original=original, _title=node.title, **kwargs):
+                t0 = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    node_times[_title] = time.perf_counter() - t0
+
+            node.analyze = timed
+            node = node.next()
+
+        def analyze():
+            # Without the sidecar cache, so that the AUX file is parsed.
+            sidecar = aux_path.with_name(aux_path.name + ".npz")
+            if sidecar.exists():
+                sidecar.unlink()
+            mopac.analyze(n_calculations=n_calculations)
+
+        t, peak = measure(analyze, memory)
+        result["analyze s"] = t
+        result["analyze MB/s"] = (aux_mb + out_mb) / t
+        result["analyze peak MB"] = peak
+        for title, value in node_times.items():
+            result[f"{title} s"] = value
+
+        t, _ = measure(lambda: mopac.analyze(n_calculations=n_calculations), False)
+        result["reanalyze s"] = t
+
+    return result
+
+
+def report(results, fd=sys.stdout):
+    """Print a table of the results."""
+    columns = [
+        ("kind", "{:>15s}", "{:>15s}"),
+        ("n_atoms", "{:>8s}", "{:8d}"),
+        ("aux MB", "{:>8s}", "{:8.2f}"),
+        ("parse s", "{:>8s}", "{:8.3f}"),
+        ("parse MB/s", "{:>10s}", "{:10.1f}"),
+        ("parse peak MB", "{:>13s}", "{:13.1f}"),
+        ("out MB", "{:>8s}", "{:8.2f}"),
+        ("out s", "{:>8s}", "{:8.3f}"),
+        ("out MB/s", "{:>10s}", "{:10.1f}"),
+        ("analyze s", "{:>9s}", "{:9.3f}"),
+        ("analyze peak MB", "{:>15s}", "{:15.1f}"),
+        ("reanalyze s", "{:>11s}", "{:11.3f}"),
+    ]
+    print(" ".join(header.format(name) for name, header, _ in columns), file=fd)
+    for result in results:
+        row = []
+        for name, header, fmt in columns:
+            value = result.get(name)
+            if value is None:
+                row.append(header.format("-"))
+            else:
+                row.append(fmt.format(value))
+        print(" ".join(row), file=fd)
+
+
+def compare(results, baseline, tolerance):
+    """Compare the timings with a baseline.
+
+    Returns
+    -------
+    [str]
+        A description of each timing slower than the tolerance allows.
+    """
+    previous = {(r["kind"], r["n_atoms"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        key = (result["kind"], result["n_atoms"])
+        if key not in previous:
+            continue
+        for name, value in result.items():
+            if not name.endswith(" s"):
+                continue
+            old = previous[key].get(name)
+            # Ignore very short times, which are mostly noise
+            if old is None or max(old, value) < 0.01:
+                continue
+            if value > tolerance * old:
+                regressions.append(
+                    f"{key[0]} {key[1]} atoms: {name} {value:.3f} vs {old:.3f}"
+                )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--kind",
+        action="append",
+        choices=list(KINDS),
+        help="The kinds of calculation, by default all.",
+    )
+    parser.add_argument(
+        "--atoms",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10000, 100000],
+        help="The sizes of the systems.",
+    )
+    parser.add_argument(
+        "--dense-limit",
+        type=int,
+        default=1000,
+        help="The largest system for the force and force constant calculations.",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Do not measure the peak memory, which doubles the run time.",
+    )
+    parser.add_argument("--json", help="Save the results to this file.")
+    parser.add_argument("--compare", help="Compare with the results in this file.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="The ratio to the baseline time regarded as a regression.",
+    )
+    args = parser.parse_args(argv)
+
+    # The analysis prints a lot, which is not what is being measured.
+    logging.getLogger("mopac").setLevel(logging.CRITICAL)
+    logging.getLogger("mopac_step").setLevel(logging.CRITICAL)
+
+    results = []
+    for kind in args.kind or list(KINDS):
+        for n_atoms in args.atoms:
+            if kind in DENSE and n_atoms > args.dense_limit:
+                continue
+            if kind == "optimization" and n_atoms > OPTIMIZATION_LIMIT:
+                continue
+            results.append(
+                run(
+                    kind,
+                    n_atoms,
+                    memory=not args.no_memory,
+                    dense_limit=args.dense_limit,
+                )
+            )
+            report(results[-1:], fd=sys.stderr)
+
+    report(results)
+
+    if args.json is not None:
+        Path(args.json).write_text(json.dumps(results, indent=4))
+
+    if args.compare is not None:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        if len(regressions) > 0:
+            print("\nRegressions:")
+            for text in regressions:
+                print("    " + text)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
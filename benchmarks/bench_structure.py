@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare writing the structure for the input file line by line with
+formatting it all at once.
+
+Usage: python benchmarks/bench_structure.py [n_atoms ...]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from mopac_step.mopac_base import _format_structure
+
+
+def make_structure(n_atoms, seed=0):
+    """Random elements, coordinates and optimization flags."""
+    rng = np.random.default_rng(seed)
+    elements = rng.choice(["C", "H", "N", "O", "Cl"], n_atoms).tolist()
+    xyz = rng.uniform(-100.0, 100.0, (n_atoms, 3))
+    flags = rng.integers(0, 2, (n_atoms, 3))
+    return elements, xyz, flags
+
+
+def per_line(elements, xyz, flags):
+    """The original path: format each line and add it to the string."""
+    structure = ""
+    for element, (x, y, z), (fx, fy, fz) in zip(elements, xyz.tolist(), flags.tolist()):
+        structure += "{:2} {: 12.8f} {:d} {: 12.8f} {:d} {: 12.8f} {:d}\n".format(
+            element, x, fx, y, fy, z, fz
+        )
+    return structure
+
+
+def main(sizes):
+    print(f"{'atoms':>10s} {'per line':>12s} {'at once':>12s} {'speedup':>8s}")
+    for n_atoms in sizes:
+        args = make_structure(n_atoms)
+        assert per_line(*args) == _format_structure(*args)
+        number = max(1, 100000 // n_atoms)
+        t_line = min(timeit.repeat(lambda: per_line(*args), number=number, repeat=3))
+        t_once = min(
+            timeit.repeat(lambda: _format_structure(*args), number=number, repeat=3)
+        )
+        t_line /= number
+        t_once /= number
+        print(
+            f"{n_atoms:10d} {1000 * t_line:10.3f}ms {1000 * t_once:10.3f}ms "
+            f"{t_line / t_once:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(x) for x in sys.argv[1:]] or [100, 1000, 10000, 100000]
+    main(sizes)
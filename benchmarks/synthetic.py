@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+
+"""Generators for synthetic MOPAC output, mopac.aux and mopac.out.
+
+The files have the layout, keys and field widths of those written by MOPAC
+with AUX(MOS=10,XP,XS,PRECISION=3), for a box of water molecules of any size,
+so that the parsing and analysis can be timed without running MOPAC. The
+numbers are random but plausible, and consistent with each other where the
+analysis depends on it, e.g. the number of vibrational modes.
+
+Keys whose size grows as the square of the number of atoms, such as the bond
+orders, density matrix and Hessian, are only written for systems up to
+`dense_limit` atoms, as MOPAC itself would not be run with the corresponding
+keywords on larger systems.
+"""
+
+import numpy as np
+
+MOPAC_VERSION = "MOPAC2016.22.191L"
+
+# Atomic orbitals and masses of the atoms in water
+N_AOS = {"O": 4, "H": 1}
+MASSES = {"O": 15.999, "H": 1.008}
+CORES = {"O": 6, "H": 1}
+AO_TYPES = {"O": ("S", "PX", "PY", "PZ"), "H": ("S",)}
+PQN = {"O": 2, "H": 1}
+
+# The number of MOs written with MOS=10: 10 occupied and 10 virtual
+N_MOS = 20
+
+
+class Molecule(object):
+    """A cubic box of water molecules.
+
+    Parameters
+    ----------
+    n_atoms : int
+        The approximate number of atoms, rounded to a multiple of 3.
+    periodic : bool = False
+        Whether the box is a periodic cell.
+    seed : int = 0
+        Seed for the random numbers.
+    """
+
+    def __init__(self, n_atoms, periodic=False, seed=0):
+        n_molecules = max(1, n_atoms // 3)
+        self.rng = np.random.default_rng(seed)
+        self.periodic = periodic
+
+        n_side = int(np.ceil(n_molecules ** (1 / 3)))
+        spacing = 3.1
+        grid = np.array(
+            [
+                (i, j, k)
+                for i in range(n_side)
+                for j in range(n_side)
+                for k in range(n_side)
+            ]
+        )[:n_molecules]
+        centers = grid * spacing
+        offsets = np.array([[0.0, 0.0, 0.0], [0.757, 0.586, 0.0], [-0.757, 0.586, 0.0]])
+        self.xyz = (centers[:, np.newaxis, :] + offsets).reshape(-1, 3)
+        self.symbols = ["O", "H", "H"] * n_molecules
+        self.cell = 3 * [n_side * spacing] + 3 * [90.0]
+
+    @property
+    def n_atoms(self):
+        return len(self.symbols)
+
+    @property
+    def n_aos(self):
+        return sum(N_AOS[symbol] for symbol in self.symbols)
+
+    def perturbed(self, scale=0.01):
+        """Coordinates with a small random displacement."""
+        return self.xyz + self.rng.normal(0.0, scale, self.xyz.shape)
+
+
+class AuxWriter(object):
+    """Write the keys of an AUX file in MOPAC's format."""
+
+    def __init__(self):
+        self.lines = []
+
+    def text(self):
+        return "\n".join(self.lines) + "\n"
+
+    def start(self):
+        self.lines.append(" START OF MOPAC FILE")
+
+    def end(self):
+        self.lines.append(" END OF MOPAC FILE")
+
+    def comment(self, text):
+        self.lines.append(" " + "#" * 36)
+        self.lines.append(f" #{text:^34s}#")
+        self.lines.append(" " + "#" * 36)
+
+    def scalar(self, key, value, units=None):
+        head = key if units is None else f"{key}:{units}"
+        self.lines.append(f" {head}={value}")
+
+    def array(self, key, values, fmt, per_line, units=None):
+        """An array, with `per_line` values on each line in the given format."""
+        head = key if units is None else f"{key}:{units}"
+        values = list(values)
+        self.lines.append(f" {head}[{len(values):04d}]=")
+        line_fmt = fmt * per_line
+        n_full = len(values) // per_line * per_line
+        for start in range(0, n_full, per_line):
+            self.lines.append(" " + line_fmt % tuple(values[start : start + per_line]))
+        if n_full < len(values):
+            rest = values[n_full:]
+            self.lines.append(" " + (fmt * len(rest)) % tuple(rest))
+
+    def floats(self, key, values, units=None, width=10, decimals=4, per_line=10):
+        self.array(key, values, f"%{width}.{decimals}f", per_line, units=units)
+
+    def integers(self, key, values, per_line=20):
+        self.array(key, values, "%6d", per_line)
+
+    def strings(self, key, values, per_line=20):
+        self.array(key, values, "%3s", per_line)
+
+
+def _input_data(aux, molecule, keywords, xyz=None):
+    """The input data at the start of each section."""
+    rng = molecule.rng
+    symbols = molecule.symbols
+    if xyz is None:
+        xyz = molecule.xyz
+
+    aux.comment("Start of Input data")
+    aux.scalar("MOPAC_VERSION", f'"{MOPAC_VERSION}"')
+    aux.scalar("DATE", '"Mon Jan  1 00:00:00 2024"')
+    aux.scalar("METHOD", "PM7")
+    aux.scalar("TITLE", '"Synthetic water box"')
+    aux.scalar("KEYWORDS", f'"{keywords}"')
+    aux.scalar(
+        "EMPIRICAL_FORMULA", f'"H{2 * (len(symbols) // 3)} O{len(symbols) // 3}"'
+    )
+    aux.strings("ATOM_EL", symbols)
+    aux.integers("ATOM_CORE", [CORES[s] for s in symbols])
+    aux.floats("ATOM_X", xyz.ravel(), units="ANGSTROMS", per_line=3)
+    if molecule.periodic:
+        a, b, c = molecule.cell[0:3]
+        aux.floats(
+            "TRANS_VECTS", [a, 0, 0, 0, b, 0, 0, 0, c], units="ANGSTROMS", per_line=3
+        )
+
+    index = []
+    types = []
+    pqn = []
+    for i, symbol in enumerate(symbols, start=1):
+        index.extend(N_AOS[symbol] * [i])
+        types.extend(AO_TYPES[symbol])
+        pqn.extend(N_AOS[symbol] * [PQN[symbol]])
+    aux.integers("AO_ATOMINDEX", index)
+    aux.strings("ATOM_SYMTYPE", types)
+    aux.floats("AO_ZETA", rng.uniform(1.0, 5.0, len(index)))
+    aux.integers("ATOM_PQN", pqn)
+    aux.scalar("NUM_ELECTRONS", 8 * (len(symbols) // 3))
+
+
+def _results(aux, molecule, xyz, heat, dense_limit, cpu_time):
+    """The final results for a calculation."""
+    rng = molecule.rng
+    n_atoms = molecule.n_atoms
+    n_aos = molecule.n_aos
+
+    aux.comment("Final SCF results")
+    aux.scalar("HEAT_OF_FORMATION", f"{heat / 100:+.5f}D+02", units="KCAL/MOL")
+    aux.scalar("GRADIENT_NORM", f"{rng.uniform(0, 1):.5f}D+00", "KCAL/MOL/ANGSTROM")
+    aux.scalar("POINT_GROUP", '"C1"')
+    aux.scalar("DIPOLE", f"{rng.uniform(0, 5):.5f}D+00", units="DEBYE")
+    aux.floats("DIP_VEC", rng.normal(0, 1, 3), units="DEBYE", per_line=3)
+    aux.scalar("IONIZATION_POTENTIAL", f"{rng.uniform(10, 12):.5f}D+00", units="EV")
+    aux.scalar("MOLECULAR_WEIGHT", f"{18.015 * n_atoms // 3:.4f}", units="AMU")
+    aux.scalar("TOTAL_ENERGY", f"{-322.0 * n_atoms:.4f}", units="EV")
+    if molecule.periodic:
+        aux.scalar(
+            "VOLUME", f"{np.prod(molecule.cell[0:3]):.4f}", units="CUBIC_ANGSTROMS"
+        )
+        aux.floats("VOIGT_STRESS", rng.normal(0, 0.1, 6), units="GPA", per_line=6)
+    aux.floats("ATOM_X_OPT", xyz.ravel(), units="ANGSTROMS", per_line=3)
+
+    charges = np.tile([-0.62, 0.31, 0.31], n_atoms // 3) + rng.normal(0, 0.01, n_atoms)
+    aux.floats("ATOM_CHARGES", charges, decimals=5)
+    n_gradients = 3 * n_atoms + (9 if molecule.periodic else 0)
+    aux.floats("GRADIENTS", rng.normal(0, 1, n_gradients), units="KCAL/MOL/ANGSTROM")
+
+    # MOS=10: the 10 highest occupied and 10 lowest virtual orbitals
+    aux.array("SET_OF_MOS", [1, N_MOS], "%5d", 2)
+    aux.floats("EIGENVECTORS", rng.normal(0, 0.1, N_MOS * n_aos), decimals=4)
+    eigenvalues = np.concatenate(
+        (np.sort(rng.uniform(-15, -11, 10)), np.sort(rng.uniform(1, 4, 10)))
+    )
+    aux.floats("EIGENVALUES", eigenvalues, units="EV")
+    aux.floats("MOLECULAR_ORBITAL_OCCUPANCIES", 10 * [2.0] + 10 * [0.0], decimals=4)
+
+    if n_atoms <= dense_limit:
+        # Lower triangle of the bond orders, by rows
+        bonds = []
+        for i in range(n_atoms):
+            row = np.zeros(i + 1)
+            if i % 3 != 0:
+                row[i - i % 3] = 0.95
+            bonds.extend(row)
+        aux.floats("BOND_ORDERS", bonds, decimals=4)
+        n = n_aos * (n_aos + 1) // 2
+        aux.floats("DENSITY_MATRIX", rng.normal(0, 0.1, n), decimals=4)
+
+    aux.scalar("NUMBER_SCF_CYCLES", int(rng.integers(5, 20)))
+    aux.floats("CPU_TIME", [cpu_time], units="SECONDS", per_line=1, decimals=2)
+
+
+def _vibrations(aux, molecule, thermo=False):
+    """The results of a FORCE calculation, and optionally THERMO."""
+    rng = molecule.rng
+    n_atoms = molecule.n_atoms
+    n_dof = 3 * n_atoms
+
+    aux.comment("Vibrational data")
+    aux.floats("ISOTOPIC_MASSES", [MASSES[s] for s in molecule.symbols], units="AMU")
+    aux.floats(
+        "ORIENTATION_ATOM_X", molecule.xyz.ravel(), units="ANGSTROMS", per_line=3
+    )
+    n = n_dof * (n_dof + 1) // 2
+    aux.floats("HESSIAN_MATRIX", rng.normal(0, 0.1, n), units="MILLIDYNE/ANGSTROM")
+
+    # The translations and rotations are at the end
+    n_vib = n_dof - 6
+    frequencies = np.concatenate(
+        (np.sort(rng.uniform(50, 3800, n_vib)), rng.normal(0, 5, 6))
+    )
+    aux.floats("VIB._FREQ", frequencies, units="1/CM", decimals=2)
+    aux.strings("NORMAL_MODE_SYMMETRY_LABELS", n_dof * ["A"])
+    aux.floats("VIB._T_DIP", rng.uniform(0, 1, n_dof), units="ELECTRONS")
+    aux.floats("VIB._TRAVEL", rng.uniform(0, 0.2, n_dof), units="ANGSTROMS")
+    aux.floats("VIB._RED_MASS", rng.uniform(1, 16, n_dof), units="AMU")
+    aux.floats("VIB._EFF_MASS", rng.uniform(0, 16, n_dof), units="AMU")
+    aux.floats("PRI_MOM_OF_I", [0.6, 1.1, 1.7], units="10**(-40)*GRAM-CM**2")
+    aux.floats("ROTAT_CONSTS", [27.9, 14.5, 9.5], units="CM(-1)")
+    aux.scalar("ZERO_POINT_ENERGY", f"{13.4 * n_atoms / 3:.4f}", units="KCAL/MOL")
+
+    if thermo:
+        temperatures = np.arange(200.0, 401.0, 10.0)
+        n_temps = len(temperatures)
+        aux.floats("THERMODYNAMIC_PROPERTIES_TEMPS", temperatures, units="KELVIN")
+        aux.floats("H_O_F(T)", rng.uniform(-58, -56, n_temps), units="KCAL/MOL")
+        aux.floats("ENTHALPY_TOT", rng.uniform(2000, 3000, n_temps), units="CAL/MOL")
+        aux.floats("HEAT_CAPACITY_TOT", rng.uniform(7, 9, n_temps), units="CAL/K/MOL")
+        aux.floats("ENTROPY_TOT", rng.uniform(43, 47, n_temps), units="CAL/K/MOL")
+
+
+def _output_section(molecule, title, n_cycles=0, optimizer=None):
+    """The text of one calculation in the output file."""
+    rng = molecule.rng
+    # The citation is on the 6th line, which is where MOPAC.analyze expects it.
+    lines = [
+        " " + "*" * 79,
+        " **" + " " * 75 + "**",
+        " **" + "MOPAC2016".center(75) + "**",
+        " **" + " " * 75 + "**",
+        " " + "*" * 79,
+        " ** Cite this program as: MOPAC2016, Version: 22.191L, James J. P. Stewart,"
+        " **",
+        " **           Stewart Computational Chemistry, web: HTTP://OpenMOPAC.net  **",
+        " " + "*" * 79,
+        "",
+        f" {title}",
+        "",
+    ]
+    if optimizer is not None:
+        lines.append(f" Geometry optimization using {optimizer}")
+    for cycle in range(1, n_cycles + 1):
+        lines.append(
+            f" CYCLE:{cycle:6d} TIME:  0.100 TIME LEFT:  2.00D  "
+            f"GRAD.:{rng.uniform(0, 10):10.3f} HEAT: {-57.0 - cycle / 100:10.4f}"
+        )
+    lines.append("")
+    lines.append("          FINAL HEAT OF FORMATION =        -57.77600 KCAL/MOL")
+    lines.append("")
+    lines.append("                             CARTESIAN COORDINATES")
+    lines.append("")
+    for i, (symbol, (x, y, z)) in enumerate(zip(molecule.symbols, molecule.xyz), 1):
+        lines.append(f"{i:6d}         {symbol:2s}{x:16.7f}{y:16.7f}{z:16.7f}")
+    lines.append("")
+    lines.append("              NET ATOMIC CHARGES AND DIPOLE CONTRIBUTIONS")
+    lines.append("")
+    lines.append(
+        "  ATOM NO.   TYPE          CHARGE      No. of ELECS.   s-Pop       p-Pop"
+    )
+    for i, symbol in enumerate(molecule.symbols, 1):
+        q = rng.normal(0, 0.3)
+        lines.append(f"{i:6d}{symbol:>10s}{q:20.6f}{CORES[symbol] - q:14.4f}")
+    lines.append("")
+    lines.append(" TOTAL JOB TIME:             0.25 SECONDS")
+    lines.append("")
+    lines.append(" == MOPAC DONE ==")
+    return lines
+
+
+def generate(kind, n_atoms, dense_limit=1000, n_steps=10, n_mozyme=300, seed=0):
+    """Generate the AUX and output files for a calculation.
+
+    Parameters
+    ----------
+    kind : str
+        One of "energy", "optimization", "force", "thermo" or "force constants".
+        The last is a periodic force-constant run, with an SCF at the initial
+        and each of the 6 strained cells, followed by a FORCE calculation.
+    n_atoms : int
+        The approximate number of atoms.
+    dense_limit : int = 1000
+        The largest system with quadratically-sized keys in the AUX file.
+    n_steps : int = 10
+        The number of steps in an optimization.
+    n_mozyme : int = 300
+        Systems this large use MOZYME, which is followed by a 1SCF calculation
+        with the final structure, as the Energy step does by default. The
+        force-constant calculations do not support MOZYME.
+    seed : int = 0
+        The random number seed.
+
+    Returns
+    -------
+    Molecule, str, str, [int]
+        The molecule, text of the AUX file, text of the output file, and the
+        number of calculations for each step.
+    """
+    periodic = kind == "force constants"
+    molecule = Molecule(n_atoms, periodic=periodic, seed=seed)
+    aux = AuxWriter()
+    out = []
+    keywords = "PM7 AUX(MOS=10,XP,XS,PRECISION=3) LARGE"
+
+    if kind == "energy":
+        aux.start()
+        _input_data(aux, molecule, keywords + " 1SCF")
+        _results(aux, molecule, molecule.xyz, -57.776, dense_limit, 0.25)
+        aux.end()
+        out.extend(_output_section(molecule, "Energy"))
+        n_calculations = [1]
+    elif kind == "optimization":
+        aux.start()
+        _input_data(aux, molecule, keywords + " EF")
+        aux.comment("Geometry optimization")
+        for step in range(n_steps):
+            xyz = molecule.perturbed(0.01 / (step + 1))
+            aux.floats(
+                "HEAT_OF_FORM_UPDATED", [-57.0 - step / 100], "KCAL/MOL", per_line=1
+            )
+            aux.floats(
+                "GRADIENT_NORM_UPDATED",
+                [10.0 / (step + 1)],
+                "KCAL/MOL/ANGSTROM",
+                per_line=1,
+            )
+            aux.floats("ATOM_X_UPDATED", xyz.ravel(), units="ANGSTROMS", per_line=3)
+        _results(aux, molecule, xyz, -57.776, dense_limit, 0.25 * n_steps)
+        aux.end()
+        out.extend(_output_section(molecule, "Optimization", n_steps, "EF"))
+        n_calculations = [1]
+    elif kind in ("force", "thermo"):
+        aux.start()
+        _input_data(
+            aux, molecule, keywords + " FORCE" + (" THERMO" if kind == "thermo" else "")
+        )
+        _results(aux, molecule, molecule.xyz, -57.776, dense_limit, 0.25)
+        if molecule.n_atoms <= dense_limit:
+            _vibrations(aux, molecule, thermo=kind == "thermo")
+        aux.end()
+        out.extend(_output_section(molecule, "Vibrations"))
+        n_calculations = [1]
+    elif kind == "force constants":
+        t = 0.0
+        for strain in range(7):
+            t += 0.25
+            aux.start()
+            _input_data(aux, molecule, keywords + " 1SCF")
+            _results(aux, molecule, molecule.xyz, -57.776, dense_limit, t)
+            aux.end()
+            out.extend(_output_section(molecule, f"Strain {strain}"))
+        t += 1.0
+        aux.start()
+        _input_data(aux, molecule, keywords + " FORCE LET NOREOR")
+        _results(aux, molecule, molecule.xyz, -57.776, dense_limit, t)
+        if molecule.n_atoms <= dense_limit:
+            _vibrations(aux, molecule)
+        aux.end()
+        out.extend(_output_section(molecule, "Atomic Hessian"))
+        n_calculations = [8]
+    else:
+        raise ValueError(f"Unknown kind of calculation '{kind}'")
+
+    if kind != "force constants" and molecule.n_atoms >= n_mozyme:
+        aux.start()
+        _input_data(aux, molecule, keywords + " MOZYME 1SCF OLDGEO")
+        _results(aux, molecule, molecule.xyz, -57.776, dense_limit, 0.25)
+        aux.end()
+        out.extend(_output_section(molecule, "MOZYME follow-up"))
+        n_calculations = [n_calculations[0] + 1]
+
+    return molecule, aux.text(), "\n".join(out) + "\n", n_calculations
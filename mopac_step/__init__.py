@@ -5,6 +5,15 @@
 # Bring up the classes so that they appear to be directly in
 # the package.
 
+from .aux_cache import AuxCache  # noqa: F401
+from .aux_index import AuxIndex  # noqa: F401
+from .aux_tail import AuxTail  # noqa: F401
+from .out_index import OutIndex, OutSection  # noqa: F401
+from .result_cache import ResultCache, parse_size  # noqa: F401
+from .timing_store import TimingStore  # noqa: F401
+from .predictor import TimingPredictor  # noqa: F401
+from .host_policy import HostPolicy  # noqa: F401
+from .jobs import JobQueue, MOPACJob  # noqa: F401
 from .mopac_base import MOPACBase  # noqa: F401
 
 from .lewis_structure_step import LewisStructureStep  # noqa: F401
@@ -1,9 +1,13 @@
 # !/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-"""Handle the installation of the MOPAC step."""
+"""Handle the installation of the MOPAC step.
 
-from .installer import Installer
+`python -m mopac_step benchmark` instead measures the best number of threads
+for MOPAC on this host.
+"""
+
+import sys
 
 
 def run():
@@ -12,6 +16,13 @@ def run():
     * Find and/or install the MOPAC executable.
     * Add or update information in the SEAMM.ini file for MOPAC
     """
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        from .thread_benchmark import main
+
+        sys.exit(main(sys.argv[2:]))
+
+    # Only needed for installing, so that the benchmark can run without it
+    from .installer import Installer
 
     # Create an installer object
     installer = Installer()
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+"""A binary sidecar holding the parsed sections of a MOPAC AUX file.
+
+Reparsing the AUX file of a large, finished job is slow, so the parsed
+sections are saved next to it, e.g. ``mopac.aux.npz``. The sidecar is a zip
+archive of NumPy ``.npy`` members plus a JSON manifest, so it can be read
+without pickling. It records the size, modification time and a hash of the AUX
+file it came from, and is ignored if the AUX file has changed. If the AUX file
+is compressed or removed once the step is finished, restamp() records this so
+that the sidecar can still be used.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import zipfile
+
+import numpy as np
+
+from mopac_step import retention
+
+logger = logging.getLogger(__name__)
+
+# Bump if the layout of the sidecar changes
+FORMAT_VERSION = 1
+
+# The amount of the start and end of the AUX file that is hashed.
+HASH_BLOCK = 1024 * 1024
+
+
+def fingerprint(path):
+    """Identify the contents of a file cheaply.
+
+    The size and modification time catch almost all changes. A hash of the
+    first and last megabyte of the file guards against the file being
+    rewritten within the resolution of the timestamp.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file.
+
+    Returns
+    -------
+    dict
+        The size, mtime (ns) and hash of the file.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fd:
+        digest.update(fd.read(HASH_BLOCK))
+        if stat.st_size > HASH_BLOCK:
+            fd.seek(max(HASH_BLOCK, stat.st_size - HASH_BLOCK))
+            digest.update(fd.read(HASH_BLOCK))
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": digest.hexdigest(),
+    }
+
+
+class AuxCache(object):
+    """The sidecar cache for the parsed sections of an AUX file.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The AUX file. The sidecar is the same path with ".npz" appended.
+    as_arrays : bool = False
+        Whether the sections were parsed with numerical arrays as NumPy
+        arrays. Sidecars written in one mode are not used for the other.
+    """
+
+    def __init__(self, path, as_arrays=False):
+        self.path = Path(path)
+        self.sidecar = self.path.with_name(self.path.name + ".npz")
+        self.as_arrays = as_arrays
+        self._zip = None
+        self._sections = None
+        self._writer = None
+        self._tmp = None
+        self._manifest = None
+        self.complete = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._writer is not None:
+            self.abort()
+        self.close()
+
+    def __len__(self):
+        return 0 if self._sections is None else len(self._sections)
+
+    @property
+    def full(self):
+        """Whether the sidecar holds every property of every section."""
+        return (
+            self.complete
+            and self._sections is not None
+            and all(section["wanted"] is None for section in self._sections)
+        )
+
+    def close(self):
+        """Close the sidecar, if it is open."""
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def open(self):
+        """Open the sidecar if it is valid for the current AUX file.
+
+        Returns
+        -------
+        bool
+            True if the sidecar can be used.
+        """
+        self.close()
+        self._sections = None
+        self.complete = False
+        if not self.sidecar.exists():
+            return False
+        try:
+            zf = zipfile.ZipFile(self.sidecar, mode="r")
+            manifest = json.loads(zf.read("manifest.json"))
+        except Exception as e:
+            logger.debug(f"Could not read {self.sidecar}: {e}")
+            return False
+
+        if (
+            manifest.get("version") != FORMAT_VERSION
+            or manifest.get("as_arrays") != self.as_arrays
+            or manifest.get("source") != self._source()
+        ):
+            logger.debug(f"{self.sidecar} is out of date.")
+            zf.close()
+            return False
+
+        self._zip = zf
+        self._sections = manifest["sections"]
+        self.complete = manifest["complete"]
+        return True
+
+    def covers(self, section, wanted=None):
+        """Whether a section is in the sidecar with all the wanted properties.
+
+        Parameters
+        ----------
+        section : int
+            The index of the section, counting from 0.
+        wanted : set(str) = None
+            The properties needed, or None for all of them.
+
+        Returns
+        -------
+        bool
+        """
+        if self._sections is None or section >= len(self._sections):
+            return False
+        cached = self._sections[section]["wanted"]
+        if cached is None:
+            return True
+        if wanted is None:
+            return False
+        return wanted <= set(cached)
+
+    def get(self, section, wanted=None):
+        """The data for a section, as returned by MOPACBase.parse_aux().
+
+        Parameters
+        ----------
+        section : int
+            The index of the section, counting from 0.
+        wanted : set(str) = None
+            The properties to load, or None for all in the sidecar.
+
+        Returns
+        -------
+        dict
+        """
+        data = {}
+        for n, (key, kind, items) in enumerate(self._sections[section]["keys"]):
+            if wanted is not None and key.split(",")[0] not in wanted:
+                continue
+            member = f"{section}/{n}"
+            if kind == "sequence":
+                data[key] = [
+                    self._decode(self._read(f"{member}/{j}"), item_kind)
+                    for j, item_kind in enumerate(items)
+                ]
+            else:
+                data[key] = self._decode(self._read(member), kind)
+        return data
+
+    def begin(self):
+        """Start writing a new sidecar for the current AUX file.
+
+        Sections are added one at a time with append() and the sidecar is
+        only replaced when commit() is called, so readers never see a partial
+        file. The existing sidecar can still be read until then. Any problem
+        writing the sidecar is logged and the new sidecar abandoned, since the
+        sidecar is only an optimization.
+        """
+        self._tmp = self.sidecar.with_name(self.sidecar.name + f".{os.getpid()}.tmp")
+        self._manifest = {
+            "version": FORMAT_VERSION,
+            "as_arrays": self.as_arrays,
+            "source": self._source(),
+            "sections": [],
+        }
+        try:
+            self._writer = zipfile.ZipFile(self._tmp, mode="w")
+        except Exception as e:
+            logger.debug(f"Could not write {self.sidecar}: {e}")
+            self._writer = None
+
+    def append(self, data, wanted=None):
+        """Add the next section to the sidecar being written.
+
+        Parameters
+        ----------
+        data : dict
+            The data for the section, as returned by MOPACBase.parse_aux().
+        wanted : set(str) = None
+            The properties that were parsed, or None for all.
+        """
+        if self._writer is None:
+            return
+        section = len(self._manifest["sections"])
+        keys = []
+        try:
+            for n, (key, value) in enumerate(data.items()):
+                member = f"{section}/{n}"
+                if isinstance(value, list) and any(
+                    isinstance(v, (list, np.ndarray)) for v in value
+                ):
+                    kinds = []
+                    for j, item in enumerate(value):
+                        kinds.append(self._kind(item))
+                        self._write(f"{member}/{j}", item)
+                    keys.append((key, "sequence", kinds))
+                else:
+                    keys.append((key, self._kind(value), None))
+                    self._write(member, value)
+        except Exception as e:
+            logger.debug(f"Could not write {self.sidecar}: {e}")
+            self.abort()
+            return
+        self._manifest["sections"].append(
+            {"wanted": None if wanted is None else sorted(wanted), "keys": keys}
+        )
+
+    def commit(self, complete=False):
+        """Finish writing the sidecar and put it in place.
+
+        Parameters
+        ----------
+        complete : bool = False
+            Whether the sidecar holds all the sections in the AUX file.
+
+        Returns
+        -------
+        bool
+            Whether the sidecar was written.
+        """
+        if self._writer is None:
+            return False
+        try:
+            self._manifest["complete"] = complete
+            self._writer.writestr("manifest.json", json.dumps(self._manifest))
+            self._writer.close()
+            self._writer = None
+            self.close()
+            os.replace(self._tmp, self.sidecar)
+        except Exception as e:
+            logger.debug(f"Could not write {self.sidecar}: {e}")
+            self.abort()
+            return False
+        return True
+
+    def abort(self):
+        """Abandon the sidecar being written."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._tmp is not None and self._tmp.exists():
+            self._tmp.unlink()
+
+    def restamp(self):
+        """Keep the open sidecar valid after the AUX file is compressed or removed.
+
+        The sidecar records the AUX file it came from, so compressing or
+        removing the AUX file would make it out of date. This records the
+        compressed file instead, or that there is no longer an AUX file. Call
+        it after open() has found the sidecar valid and the AUX file has been
+        compressed or removed.
+
+        Returns
+        -------
+        bool
+            Whether the sidecar was updated.
+        """
+        if self._zip is None:
+            return False
+        tmp = self.sidecar.with_name(self.sidecar.name + f".{os.getpid()}.tmp")
+        try:
+            manifest = json.loads(self._zip.read("manifest.json"))
+            manifest["source"] = self._source()
+            with zipfile.ZipFile(tmp, mode="w") as writer:
+                for info in self._zip.infolist():
+                    if info.filename == "manifest.json":
+                        continue
+                    with self._zip.open(info) as src, writer.open(info, "w") as fd:
+                        shutil.copyfileobj(src, fd, retention.CHUNK)
+                writer.writestr("manifest.json", json.dumps(manifest))
+            self.close()
+            os.replace(tmp, self.sidecar)
+        except Exception as e:
+            logger.debug(f"Could not update {self.sidecar}: {e}")
+            tmp.unlink(missing_ok=True)
+            return False
+        return True
+
+    def _source(self):
+        """The fingerprint of the AUX file, or None if it has been removed."""
+        path = retention.locate(self.path)
+        return fingerprint(path) if path.exists() else None
+
+    def _read(self, member):
+        with self._zip.open(member + ".npy") as fd:
+            return np.lib.format.read_array(fd, allow_pickle=False)
+
+    def _write(self, member, value):
+        array = np.asarray(value)
+        if array.dtype.hasobject:
+            raise TypeError(f"Cannot store {type(value)} in the sidecar.")
+        with self._writer.open(member + ".npy", mode="w") as fd:
+            np.lib.format.write_array(fd, array, allow_pickle=False)
+
+    @staticmethod
+    def _kind(value):
+        if isinstance(value, np.ndarray):
+            return "ndarray"
+        if isinstance(value, list):
+            return "list"
+        if isinstance(value, str):
+            return "str"
+        return "scalar"
+
+    @staticmethod
+    def _decode(array, kind):
+        if kind == "ndarray":
+            return array
+        if kind == "list":
+            return array.tolist()
+        if kind == "str":
+            return str(array.item())
+        return array.item()
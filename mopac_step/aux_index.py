@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""A memory-mapped index of the sections and keys in a MOPAC AUX file.
+
+Large periodic or MOZYME calculations write AUX files of many gigabytes, most
+of which, e.g. the molecular orbitals, a given step never uses. The file is
+memory-mapped and scanned once to find the byte range of every key in every
+section. Only the ranges of the keys that are wanted are then decoded, so the
+rest of the file need not be held in memory.
+"""
+
+import logging
+import mmap
+import os
+import re
+
+from mopac_step import retention
+
+logger = logging.getLogger(__name__)
+
+# The start of a line with a key, e.g. " ATOM_X:ANGSTROMS[0009]=", or a marker
+# for the start or end of a section.
+_LINE_RE = re.compile(rb"[ \t]*(?:(START|END) OF MOPAC|([A-Za-z][^=\n]*)=)")
+
+
+class AuxIndex(object):
+    """The sections of an AUX file and where each key is in them.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The AUX file.
+
+    Attributes
+    ----------
+    sections : [[(str, int, int)]]
+        For each complete section, the name of each key with the byte offsets
+        of the start and end of its lines, in the order in the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sections = []
+        self._fd = None
+        self._mm = None
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.sections)
+
+    def close(self):
+        """Unmap and close the file."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+    def open(self):
+        """Map the file and index it."""
+        self.close()
+        self.sections = []
+        self._fd = retention.open_mappable(self.path)
+        if os.fstat(self._fd.fileno()).st_size == 0:
+            return
+        self._mm = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        current = []
+        previous = None
+        for start in self._line_starts():
+            match = _LINE_RE.match(self._mm, start)
+            if match is None:
+                continue
+            if previous is not None:
+                current.append((*previous, start))
+                previous = None
+            marker = match.group(1)
+            if marker is None:
+                key = match.group(2).decode("latin-1")
+                name = key.split("[")[0].split(":")[0].strip()
+                previous = (name, start)
+            elif marker == b"END":
+                if len(current) > 0:
+                    self.sections.append(current)
+                current = []
+        # Anything after the last end marker is an incomplete section, e.g.
+        # from a job that was killed, so is ignored.
+
+        # The scan touched every page; let the kernel drop them again.
+        if hasattr(mmap, "MADV_DONTNEED"):
+            self._mm.madvise(mmap.MADV_DONTNEED)
+
+    def _line_starts(self):
+        """The offsets of the lines that may hold a key or section marker.
+
+        Every key line contains "=", and every marker "OF MOPAC", and these
+        are found far faster than by looking at each line in turn.
+
+        Yields
+        ------
+        int
+            The offset of the start of each candidate line, in order.
+        """
+        mm = self._mm
+        last = -1
+        next_key = mm.find(b"=")
+        next_marker = mm.find(b"OF MOPAC")
+        while next_key >= 0 or next_marker >= 0:
+            if next_marker < 0 or (next_key >= 0 and next_key < next_marker):
+                pos = next_key
+                next_key = mm.find(b"=", pos + 1)
+            else:
+                pos = next_marker
+                next_marker = mm.find(b"OF MOPAC", pos + 1)
+            start = mm.rfind(b"\n", 0, pos) + 1
+            if start != last:
+                # Several "=" on a line, e.g. in KEYWORDS, are one key
+                yield start
+                last = start
+
+    def keys(self, section):
+        """The names of the keys in a section, in order.
+
+        Parameters
+        ----------
+        section : int
+            The index of the section, counting from 0.
+
+        Returns
+        -------
+        [str]
+        """
+        return [name for name, start, end in self.sections[section]]
+
+    def lines(self, section, wanted=None):
+        """The lines of the wanted keys in a section.
+
+        Parameters
+        ----------
+        section : int
+            The index of the section, counting from 0.
+        wanted : set(str) = None
+            The keys to return, or None for all. NUM_ALPHA_ELECTRONS is always
+            included, since it is needed to parse other keys.
+
+        Yields
+        ------
+        str
+            The lines of the keys, in the order they are in the file. Each key
+            is decoded only as its lines are needed.
+        """
+        for name, start, end in self.sections[section]:
+            if wanted is None or name in wanted or name == "NUM_ALPHA_ELECTRONS":
+                yield from self._mm[start:end].decode("latin-1").splitlines()
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""Follow the progress of a running MOPAC job through its AUX file.
+
+During an optimization MOPAC writes the heat of formation, gradient norm and
+coordinates to the AUX file at every cycle, as HEAT_OF_FORM_UPDATED,
+GRADIENT_NORM_UPDATED and ATOM_X_UPDATED. AuxTail watches the file as it
+grows, in a background thread, and reads only what has been added since it
+last looked, so that the progress of long jobs can be followed.
+"""
+
+from datetime import datetime, timezone
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+
+logger = logging.getLogger(__name__)
+
+_D_TO_E = str.maketrans("Dd", "Ee")
+
+# The keys that mark the progress of an optimization, and the name of the
+# value in the progress.
+_PROGRESS_KEYS = {
+    "HEAT_OF_FORM_UPDATED": "energy",
+    "GRADIENT_NORM_UPDATED": "gradient_norm",
+}
+
+
+class AuxTail(object):
+    """Incrementally parse a growing AUX file for the optimization progress.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The AUX file, which need not exist yet.
+    status : str or pathlib.Path = None
+        A JSON file to write the progress to, replaced whenever it changes.
+    interval : float = 10.0
+        The time in seconds between looking at the AUX file.
+    callback : function = None
+        Called as callback(tail) from the background thread when there are
+        new cycles.
+
+    Attributes
+    ----------
+    cycles : [dict]
+        For each optimization cycle, the calculation (section) it is in, the
+        cycle number in the calculation, the energy (kcal/mol) and the
+        gradient norm (kcal/mol/Å), as far as they have been written.
+    n_calculations : int
+        The number of calculations (sections) started in the AUX file.
+    """
+
+    def __init__(self, path, status=None, interval=10.0, callback=None):
+        self.path = Path(path)
+        self.status = None if status is None else Path(status)
+        self.interval = interval
+        self.callback = callback
+        self.cycles = []
+        self.n_calculations = 0
+        self._offset = 0
+        self._partial = b""
+        self._key = None
+        self._values = []
+        self._cycle = None
+        self._n_cycle = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def n_cycles(self):
+        """The number of optimization cycles seen so far."""
+        return len(self.cycles)
+
+    def progress(self):
+        """The progress so far, as written to the status file.
+
+        Returns
+        -------
+        dict
+        """
+        with self._lock:
+            return {
+                "file": str(self.path),
+                "updated": datetime.now(timezone.utc).isoformat(),
+                "bytes read": self._offset,
+                "calculations": self.n_calculations,
+                "cycles": [dict(cycle) for cycle in self.cycles],
+            }
+
+    def start(self):
+        """Start following the AUX file in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="AuxTail", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background thread, after a final look at the file."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def poll(self):
+        """Read and parse anything added to the AUX file since the last poll.
+
+        Returns
+        -------
+        int
+            The number of new optimization cycles.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self._offset:
+            # The file has been replaced, e.g. by a restarted job.
+            with self._lock:
+                self.cycles = []
+                self.n_calculations = 0
+            self._offset = 0
+            self._partial = b""
+            self._key = None
+            self._values = []
+            self._cycle = None
+            self._n_cycle = 0
+        if size == self._offset:
+            return 0
+
+        with open(self.path, "rb") as fd:
+            fd.seek(self._offset)
+            data = fd.read(size - self._offset)
+        self._offset += len(data)
+
+        # Only parse complete lines; keep the rest for the next time.
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+
+        n_cycles = self.n_cycles
+        for line in data[:end].decode("latin-1").splitlines():
+            self._parse_line(line)
+        return self.n_cycles - n_cycles
+
+    def _parse_line(self, line):
+        """Handle the next complete line of the AUX file."""
+        if "OF MOPAC" in line:
+            self._finish_key()
+            if "START OF MOPAC" in line:
+                with self._lock:
+                    self.n_calculations += 1
+                self._cycle = None
+                self._n_cycle = 0
+            return
+        if "=" in line:
+            self._finish_key()
+            key, rest = line.split("=", 1)
+            name = key.split("[")[0].split(":")[0].strip()
+            if name in _PROGRESS_KEYS:
+                self._key = name
+                self._values.extend(rest.split())
+            elif name == "ATOM_X_UPDATED":
+                # The coordinates end the cycle.
+                self._cycle = None
+        elif self._key is not None:
+            self._values.extend(line.split())
+
+    def _finish_key(self):
+        """Store the value of the progress key that was being read."""
+        if self._key is None:
+            return
+        name = _PROGRESS_KEYS[self._key]
+        self._key = None
+        values, self._values = self._values, []
+        try:
+            value = float(values[0].translate(_D_TO_E))
+        except (IndexError, ValueError):
+            return
+        with self._lock:
+            if self._cycle is None or name in self._cycle:
+                self._n_cycle += 1
+                self._cycle = {
+                    "calculation": self.n_calculations,
+                    "cycle": self._n_cycle,
+                }
+                self.cycles.append(self._cycle)
+            self._cycle[name] = value
+
+    def _run(self):
+        """The background thread."""
+        while True:
+            stopping = self._stop.wait(self.interval)
+            try:
+                n_new = self.poll()
+            except Exception as e:
+                logger.debug(f"Error following {self.path}: {e}")
+                n_new = 0
+            if n_new > 0:
+                cycle = self.cycles[-1]
+                logger.info(
+                    f"Optimization cycle {cycle['cycle']}: "
+                    f"energy = {cycle.get('energy', float('nan')):.4f} kcal/mol, "
+                    f"gradient norm = {cycle.get('gradient_norm', float('nan')):.4f}"
+                )
+                self._write_status()
+                if self.callback is not None:
+                    try:
+                        self.callback(self)
+                    except Exception as e:
+                        logger.warning(f"Error in the AUX progress callback: {e}")
+            if stopping:
+                break
+
+    def _write_status(self):
+        """Replace the status file with the current progress."""
+        if self.status is None:
+            return
+        tmp = self.status.with_name(self.status.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(self.progress(), indent=4))
+            os.replace(tmp, self.status)
+        except Exception as e:
+            logger.debug(f"Could not write {self.status}: {e}")
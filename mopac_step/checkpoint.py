@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+"""Resume MOPAC runs that were interrupted, e.g. by a walltime limit.
+
+When a job is killed, success.dat is never written, so the step would
+normally start again from the beginning. Instead, the calculations that had
+finished are found from the complete sections of the AUX file, and their
+output is kept in mopac.out.done and mopac.aux.done. Only the remaining
+calculations are run, and when they finish their output is appended to what
+was kept, so the files look as if MOPAC had run without stopping.
+
+The calculation that was interrupted, if it is an optimization or force
+constant calculation, continues from MOPAC's restart file with RESTART. To
+have restart files worth using, such calculations are given DUMP so that
+MOPAC writes them regularly.
+
+A run is only resumed if its input is the same as that of the interrupted
+run, which is recorded in resume.json.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+from pathlib import Path
+
+from mopac_step.out_index import OutIndex
+
+logger = logging.getLogger(__name__)
+
+# The files that are kept from the finished calculations
+OUTPUTS = ("mopac.out", "mopac.aux")
+
+END_MARKER = b"END OF MOPAC FILE"
+
+
+def restartable(keywords):
+    """Whether MOPAC can restart a calculation from its restart file.
+
+    Parameters
+    ----------
+    keywords : [str]
+        The keywords of the calculation.
+
+    Returns
+    -------
+    bool
+        True for geometry optimizations and force constants.
+    """
+    return "1SCF" not in keywords or any(
+        k in ("FORCE", "FORCETS") or k.startswith("THERMO") for k in keywords
+    )
+
+
+def complete_sections(path):
+    """The number of complete sections in an AUX file, and where they end.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The AUX file.
+
+    Returns
+    -------
+    int, int
+        The number of sections with an end marker, and the offset just after
+        the line with the last end marker.
+    """
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return 0, 0
+    n = 0
+    end = 0
+    with open(path, "rb") as fd, mmap.mmap(
+        fd.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        position = mm.find(END_MARKER)
+        while position >= 0:
+            n += 1
+            newline = mm.find(b"\n", position)
+            end = len(mm) if newline < 0 else newline + 1
+            position = mm.find(END_MARKER, end)
+    return n, end
+
+
+def output_offset(path, n):
+    """The offset in the output file of the start of a calculation.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The output file, normally mopac.out.
+    n : int
+        The calculation, counting from 0.
+
+    Returns
+    -------
+    int
+        The offset, or the size of the file if it has fewer calculations.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    with OutIndex(path) as index:
+        if n < len(index):
+            return index[n].start
+    return path.stat().st_size
+
+
+def with_coordinates(structure, xyz):
+    """The structure for the input file, with new coordinates.
+
+    Parameters
+    ----------
+    structure : str
+        The lines of the structure, each with the element and each coordinate
+        followed by its optimization flag.
+    xyz : [[float]]
+        The new coordinates of the atoms, followed by any translation vectors.
+
+    Returns
+    -------
+    str or None
+        The structure, or None if the number of coordinates does not match.
+    """
+    lines = structure.splitlines()
+    if len(lines) != len(xyz):
+        return None
+    result = ""
+    for line, (x, y, z) in zip(lines, xyz):
+        element, _, fx, _, fy, _, fz = line.split()
+        result += f"{element:2} {x: 12.8f} {fx} {y: 12.8f} {fy} {z: 12.8f} {fz}\n"
+    return result
+
+
+class Checkpoint(object):
+    """The progress of the MOPAC run in a directory.
+
+    Parameters
+    ----------
+    directory : str or pathlib.Path
+        The directory of the step.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.record = self.directory / "resume.json"
+        self.restart = self.directory / "mopac.res"
+
+    @staticmethod
+    def input_hash(text):
+        """The hash identifying an input file."""
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def start(self, text):
+        """Note the start of a new run, discarding any earlier progress.
+
+        Parameters
+        ----------
+        text : str
+            The input file.
+        """
+        self._clear_done()
+        self.restart.unlink(missing_ok=True)
+        self._write_record(text, 0)
+
+    def resume(self, text):
+        """Keep the output of the calculations finished by an earlier run.
+
+        Parameters
+        ----------
+        text : str
+            The input file, which must match that of the earlier run.
+
+        Returns
+        -------
+        int, int or None
+            The number of calculations finished, and the first calculation of
+            the earlier run, or None if there is nothing to resume.
+        """
+        try:
+            record = json.loads(self.record.read_text())
+        except Exception:
+            return None
+        if record.get("input") != self.input_hash(text):
+            return None
+
+        first = record.get("done", 0)
+        n, aux_end = complete_sections(self.directory / "mopac.aux")
+        if n > 0:
+            out_end = output_offset(self.directory / "mopac.out", n)
+            self._keep("mopac.aux", aux_end)
+            self._keep("mopac.out", out_end)
+            self._write_record(text, first + n)
+            # So that they are not kept again if the next run is interrupted
+            for name in OUTPUTS:
+                (self.directory / name).unlink(missing_ok=True)
+        elif first == 0 and not self.restart.exists():
+            return None
+        return first + n, first
+
+    def finish(self):
+        """Put the output of the finished calculations back in front."""
+        for name in OUTPUTS:
+            done = self.directory / (name + ".done")
+            if not done.exists():
+                continue
+            path = self.directory / name
+            tmp = self.directory / f".{name}.{os.getpid()}"
+            with open(tmp, "wb") as fd:
+                for part in (done, path):
+                    if part.exists():
+                        with open(part, "rb") as src:
+                            while chunk := src.read(1 << 20):
+                                fd.write(chunk)
+            os.replace(tmp, path)
+        self.clear()
+
+    def clear(self):
+        """Forget the progress, e.g. once the run has finished."""
+        self._clear_done()
+        self.record.unlink(missing_ok=True)
+
+    def _clear_done(self):
+        for name in OUTPUTS:
+            (self.directory / (name + ".done")).unlink(missing_ok=True)
+
+    def _keep(self, name, size):
+        """Append the first size bytes of an output to the finished output."""
+        path = self.directory / name
+        if not path.exists():
+            return
+        with open(path, "rb") as src, open(
+            self.directory / (name + ".done"), "ab"
+        ) as fd:
+            remaining = size
+            while remaining > 0:
+                chunk = src.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                fd.write(chunk)
+                remaining -= len(chunk)
+
+    def _write_record(self, text, done):
+        data = {"input": self.input_hash(text), "done": done}
+        self.record.write_text(json.dumps(data))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""Start the SCF of MOPAC calculations from the density of earlier ones.
+
+A chain of substeps such as Optimization, Thermodynamics and IR reuses the
+structure of the previous calculation with OLDGEO, but each calculation
+starts its SCF from a guess. MOPAC can save the density with DENOUT, to
+<name>.den, and start from it with OLDENS. For large systems whose SCF is
+slow to converge this saves many iterations.
+
+chain() adds these keywords between consecutive calculations that continue
+from the same structure, and rewrite() puts them in the input file. The
+DensityRegistry keeps the density at the end of each MOPAC step, keyed by the
+structure and the electronic state, so that a later step on the same
+structure can start from it.
+
+A density is only reused for the same Hamiltonian, charge, spin state and
+MOZYME or not, since otherwise it is not a sensible guess.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+import threading
+
+from mopac_step.mopactools_backend import HAMILTONIANS, MULTIPLICITIES
+
+logger = logging.getLogger(__name__)
+
+# Keywords that must match for a density to be reused
+STATE_KEYWORDS = {*HAMILTONIANS, *MULTIPLICITIES, "UHF", "MOZYME", "SPARKLES"}
+STATE_PREFIXES = ("CHARGE=", "MS=", "OPEN(", "ROOT=")
+
+
+def state(keywords):
+    """The keywords that determine the electronic state and Hamiltonian.
+
+    Parameters
+    ----------
+    keywords : [str]
+        The keywords of a calculation.
+
+    Returns
+    -------
+    tuple(str)
+        The relevant keywords, sorted.
+    """
+    return tuple(
+        sorted(
+            k for k in keywords if k in STATE_KEYWORDS or k.startswith(STATE_PREFIXES)
+        )
+    )
+
+
+def chain(calculations):
+    """Pass the density between consecutive calculations on a structure.
+
+    Each calculation that continues from the structure of the one before
+    with OLDGEO starts from its density, if the electronic state is the same.
+
+    Parameters
+    ----------
+    calculations : [([str], str)]
+        The keywords and structure for each calculation. DENOUT and OLDENS
+        are added to the keywords where the density is passed on.
+    """
+    for (before, _), (keywords, _) in zip(calculations, calculations[1:]):
+        if "OLDGEO" in keywords and state(keywords) == state(before):
+            add_keyword(before, "DENOUT")
+            add_keyword(keywords, "OLDENS")
+
+
+def rewrite(text, starts, calculations):
+    """Rewrite the input file with the current keywords of each calculation.
+
+    Parameters
+    ----------
+    text : str
+        The input file.
+    starts : [int]
+        The offset in the text of the start of each calculation.
+    calculations : [([str], str)]
+        The keywords and structure for each calculation.
+
+    Returns
+    -------
+    str, [int]
+        The input file and the offset of the start of each calculation.
+    """
+    result = ""
+    new_starts = []
+    ends = starts[1:] + [len(text)]
+    for start, end, (keywords, _) in zip(starts, ends, calculations):
+        new_starts.append(len(result))
+        # The keywords are the first line of each calculation
+        _, rest = text[start:end].split("\n", 1)
+        result += " ".join(keywords) + "\n" + rest
+    return result, new_starts
+
+
+def add_keyword(keywords, keyword):
+    """Add a keyword to a list, if it is not already there."""
+    if keyword not in keywords:
+        keywords.append(keyword)
+
+
+class DensityRegistry(object):
+    """The densities saved by MOPAC steps, by structure and state."""
+
+    def __init__(self):
+        self._densities = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(structure, keywords):
+        """The key for a structure, as in the input file, and keywords."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(structure.encode())
+        h.update("\0".join(state(keywords)).encode())
+        return h.hexdigest()
+
+    def add(self, structure, keywords, path):
+        """Record the density for a structure.
+
+        Parameters
+        ----------
+        structure : str
+            The structure, as in the input file.
+        keywords : [str]
+            The keywords of the calculation that gave the density.
+        path : str or pathlib.Path
+            The density file, <name>.den, which is left where it is.
+        """
+        path = Path(path)
+        if path.exists():
+            with self._lock:
+                self._densities[self.key(structure, keywords)] = path
+
+    def get(self, structure, keywords):
+        """The density for a structure, if one was saved.
+
+        Parameters
+        ----------
+        structure : str
+            The structure, as in the input file.
+        keywords : [str]
+            The keywords of the calculation that will use the density.
+
+        Returns
+        -------
+        pathlib.Path or None
+            The density file, or None if there is none.
+        """
+        with self._lock:
+            path = self._densities.get(self.key(structure, keywords))
+        if path is None or not path.exists():
+            return None
+        return path
+
+    def clear(self):
+        """Forget all the densities."""
+        with self._lock:
+            self._densities.clear()
+
+
+# The densities from the MOPAC steps in this process
+registry = DensityRegistry()
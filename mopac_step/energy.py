@@ -5,7 +5,6 @@
 import copy
 import csv
 import logging
-from math import sqrt
 from pathlib import Path
 import pprint  # noqa: F401
 import textwrap
@@ -14,6 +13,7 @@ import numpy as np
 from tabulate import tabulate
 
 import mopac_step
+from mopac_step import instrumentation
 import seamm
 import seamm.data
 from seamm_util import Q_, units_class
@@ -34,9 +34,38 @@ class Energy(seamm.Node):
         super().__init__(flowchart=flowchart, title=title, extension=extension)
 
         self._calculation = "energy"
+        # The properties in the AUX file that analyze() uses
+        self._aux_properties = {
+            "ALPHA_EIGENVALUES",
+            "ALPHA_MOLECULAR_ORBITAL_OCCUPANCIES",
+            "AO_ATOMINDEX",
+            "AO_SPINS",
+            "AREA",
+            "ATOM_CHARGES",
+            "BETA_EIGENVALUES",
+            "BETA_MOLECULAR_ORBITAL_OCCUPANCIES",
+            "BOND_ORDERS",
+            "CPU_TIME",
+            "DIPOLE",
+            "EIGENVALUES",
+            "GRADIENTS",
+            "GRADIENT_NORM",
+            "HEAT_OF_FORMATION",
+            "HESSIAN_MATRIX",
+            "IONIZATION_POTENTIAL",
+            "ISOTOPIC_MASSES",
+            "MOLECULAR_ORBITAL_OCCUPANCIES",
+            "MOPAC_VERSION",
+            "POINT_GROUP",
+            "SPIN_COMPONENT",
+            "TOTAL_SPIN",
+            "VOIGT_STRESS",
+            "VOLUME",
+        }
         self._model = None
         self._metadata = mopac_step.metadata
         self._use_mozyme = None
+        self._n_mozyme = None  # The size for MOZYME, from the host policy
         self.parameters = mopac_step.EnergyParameters()
         self.description = "A single point energy calculation"
 
@@ -45,6 +74,21 @@ class Energy(seamm.Node):
         """A printable header for this section of output"""
         return "Step {}: {}".format(".".join(str(e) for e in self._id), self.title)
 
+    @property
+    def aux_properties(self):
+        """The properties in the AUX file that this step needs.
+
+        These are the properties that analyze() uses, plus any that have been
+        requested as results. The rest of the AUX file need not be parsed.
+        """
+        wanted = set(self._aux_properties)
+        if "results" in self.parameters:
+            metadata = self.metadata["results"]
+            wanted.update(
+                key for key in self.parameters["results"].value if key in metadata
+            )
+        return wanted
+
     @property
     def version(self):
         """The semantic version of this module."""
@@ -205,6 +249,16 @@ class Energy(seamm.Node):
         # The model chemistry, for labeling properties.
         self.model = P["hamiltonian"]
 
+        # Unless it has been changed, switch to MOZYME at the size where the
+        # benchmark found it to be faster on this host.
+        parameter = self.parameters["nMOZYME"]
+        if parameter.value == parameter.default:
+            policy = mopac_step.HostPolicy.load()
+            if policy is not None and policy.mozyme_atoms is not None:
+                P["nMOZYME"] = policy.mozyme_atoms
+        # analyze() must make the same choice
+        self._n_mozyme = P["nMOZYME"]
+
         # Have to fix formatting for printing...
         PP = dict(P)
         for key in PP:
@@ -808,6 +862,11 @@ class Energy(seamm.Node):
 
         system, configuration = self.get_system_configuration(None)
 
+        # The size for MOZYME that get_input() used, which may be from the
+        # host policy.
+        if self._n_mozyme is not None:
+            P["nMOZYME"] = self._n_mozyme
+
         if P["MOZYME"] == "always":
             used_mozyme = True
         elif (
@@ -1077,9 +1136,11 @@ class Energy(seamm.Node):
                 writer = csv.writer(fd)
                 if "AO_SPINS" in data:
                     # Sum to atom spins...
-                    spins = len(symbols) * [0.0]
-                    for spin, indx in zip(data["AO_SPINS"], data["AO_ATOMINDEX"]):
-                        spins[indx - 1] += spin
+                    spins = np.bincount(
+                        np.asarray(data["AO_ATOMINDEX"]) - 1,
+                        weights=data["AO_SPINS"],
+                        minlength=len(symbols),
+                    ).tolist()
 
                     # Add to atoms (in coordinate table)
                     if "spin" not in atoms:
@@ -1168,7 +1229,9 @@ class Energy(seamm.Node):
             data["energy"] = data["HEAT_OF_FORMATION"]
         else:
             # See if it is in the output. PM7-TS does not write to AUX!
-            lines = iter(out_sections[0])
+            section = out_sections[0]
+            start = section.find("FINAL HEAT OF FORMATION =")
+            lines = iter(section[start:] if start >= 0 else [])
             for line in lines:
                 if "FINAL HEAT OF FORMATION =" in line:
                     try:
@@ -1194,7 +1257,9 @@ class Energy(seamm.Node):
         elif "GRADIENT_NORM" in data:
             # MOPAC does not currently write gradients to the AUX file if they are small
             # They are, however, written to the output file.
-            lines = iter(out_sections[0])
+            section = out_sections[0]
+            start = section.find("FINAL  POINT  AND  DERIVATIVES")
+            lines = iter(section[start:] if start >= 0 else [])
             for line in lines:
                 if "FINAL  POINT  AND  DERIVATIVES" in line:
                     for line in lines:
@@ -1218,24 +1283,30 @@ class Energy(seamm.Node):
             if "ISOTOPIC_MASSES" not in data:
                 raise RuntimeError("Found no atomic masses")
             # Expand the mass array for x, y, z
-            mass = [v for v in data["ISOTOPIC_MASSES"] for j in range(3)]
+            mass = np.repeat(np.asarray(data["ISOTOPIC_MASSES"], dtype=float), 3)
 
-            # Get the atom part of the force constant matrix.
-            hessian = data["HESSIAN_MATRIX"]
-            ij = 0
+            # Get the atom part of the force constant matrix, which is the lower
+            # triangle stored by rows.
+            i, j = np.tril_indices(mass.size)
+            hessian = np.asarray(data["HESSIAN_MATRIX"][: i.size], dtype=float)
             factor = Q_(1.0, "mdyne/Å").m_as("kcal/mol/Å^2")
-            tmp = []
-            for i, mass_i in enumerate(mass):
-                for mass_j in mass[0 : i + 1]:
-                    tmp.append(factor * hessian[ij] * sqrt(mass_i * mass_j))
-                    ij += 1
-            data["force constants"] = tmp
-
-        self.store_results(
-            configuration=configuration,
-            data=data,
-            create_tables=self.parameters["create tables"].get(),
-        )
+            tmp = factor * hessian * np.sqrt(mass[i] * mass[j])
+            data["force constants"] = tmp.tolist()
+
+        # The database and variables expect lists rather than NumPy arrays.
+        for key, value in data.items():
+            if isinstance(value, np.ndarray):
+                data[key] = value.tolist()
+            elif isinstance(value, list) and len(value) > 0:
+                if isinstance(value[0], np.ndarray):
+                    data[key] = [v.tolist() for v in value]
+
+        with instrumentation.phase("store_results"):
+            self.store_results(
+                configuration=configuration,
+                data=data,
+                create_tables=self.parameters["create tables"].get(),
+            )
 
     def _bond_orders(self, control, bond_order_matrix, configuration):
         """Analyze and print the bond orders, and optionally use for the bonding
@@ -1271,27 +1342,22 @@ class Energy(seamm.Node):
             result += "\n"
             return result
 
-        bond_i = []
-        bond_j = []
+        # The lower triangle is stored by rows, i.e. j, i with i <= j
+        jj, ii = np.tril_indices(n_atoms)
+        bond_order_matrix = np.asarray(bond_order_matrix, dtype=float)
+        bonded = (ii != jj) & (bond_order_matrix > 0.5)
+        bond_i = ii[bonded].tolist()
+        bond_j = jj[bonded].tolist()
+        orders = bond_order_matrix[bonded].tolist()
         bond_order = []
         bond_order_str = []
-        orders = []
-        ij = 0
-        for j in range(n_atoms):
-            for i in range(j + 1):
-                if i != j:
-                    order = bond_order_matrix[ij]
-                    if order > 0.5:
-                        bond_i.append(i)
-                        bond_j.append(j)
-                        if order > 1.3 and order < 1.7:
-                            bond_order.append(5)
-                            bond_order_str.append("aromatic")
-                        else:
-                            bond_order.append(round(order))
-                            bond_order_str.append(str(round(order)))
-                        orders.append(order)
-                ij += 1
+        for order in orders:
+            if order > 1.3 and order < 1.7:
+                bond_order.append(5)
+                bond_order_str.append("aromatic")
+            else:
+                bond_order.append(round(order))
+                bond_order_str.append(str(round(order)))
 
         if len(bond_order) > 0:
             symbols = configuration.atoms.symbols
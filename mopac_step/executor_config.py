@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""How to run MOPAC with each executor, from mopac.ini.
+
+The configuration file, mopac.ini in the SEAMM root directory, is parsed once
+per process and kept until the file changes, so that steps in loops and
+batches do not read it again for every calculation. If the file does not
+exist a default is created from the one in the package. The file is always
+written by replacing it in one step, so jobs running at the same time never
+see, or overwrite each other with, a partial file.
+"""
+
+import configparser
+import importlib.resources
+import logging
+import os
+from pathlib import Path
+import shutil
+import threading
+
+from seamm_util import Configuration
+
+logger = logging.getLogger(__name__)
+
+# The parsed files: path -> (modification time, size, ConfigParser)
+_cache = {}
+_lock = threading.Lock()
+
+
+def ini_path(root):
+    """The path to mopac.ini.
+
+    Parameters
+    ----------
+    root : str or pathlib.Path
+        The SEAMM root directory, seamm_options["root"].
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return Path(root).expanduser() / "mopac.ini"
+
+
+def resolve(executor_type, root):
+    """The configuration for running MOPAC with an executor.
+
+    Parameters
+    ----------
+    executor_type : str
+        The name of the executor, which is the section of the ini file.
+    root : str or pathlib.Path
+        The SEAMM root directory, seamm_options["root"].
+
+    Returns
+    -------
+    dict(str, str)
+        The configuration, a new dictionary that the caller may change.
+    """
+    path = ini_path(root)
+    with _lock:
+        if not path.exists():
+            _bootstrap(path)
+        full_config = _read(path)
+
+        # Getting desperate! Look for an executable in the path
+        if executor_type not in full_config:
+            code = shutil.which("mopac")
+            if code is None:
+                raise RuntimeError(
+                    f"No section for '{executor_type}' in MOPAC ini file "
+                    f"({path}), nor in the defaults, nor in the path!"
+                )
+            txt_config = Configuration(path)
+            txt_config.add_section(executor_type)
+            txt_config.set_value(executor_type, "installation", "local")
+            txt_config.set_value(executor_type, "code", str(code))
+            _write(path, str(txt_config))
+            full_config = _read(path)
+
+        return dict(full_config.items(executor_type))
+
+
+def clear():
+    """Forget the parsed files, e.g. for tests."""
+    with _lock:
+        _cache.clear()
+
+
+def _bootstrap(path):
+    """Create the default mopac.ini, unless another job has just done so."""
+    resources = importlib.resources.files("mopac_step") / "data"
+    txt_config = Configuration()
+    txt_config.from_string((resources / "mopac.ini").read_text())
+
+    # Work out the conda info needed
+    if "CONDA_EXE" in os.environ:
+        txt_config.set_value("local", "conda", os.environ["CONDA_EXE"])
+    txt_config.set_value("local", "conda-environment", "seamm-mopac")
+    _write(path, str(txt_config), exclusive=True)
+
+
+def _read(path):
+    """The parsed file, read again only if it has changed."""
+    stat = path.stat()
+    cached = _cache.get(path)
+    if cached is not None and cached[0:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    full_config = configparser.ConfigParser()
+    full_config.read(path)
+    _cache[path] = (stat.st_mtime_ns, stat.st_size, full_config)
+    return full_config
+
+
+def _write(path, text, exclusive=False):
+    """Write the file atomically, through a temporary file in its directory.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The file.
+    text : str
+        The contents.
+    exclusive : bool = False
+        Leave the file alone if it already exists.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    tmp.write_text(text)
+    try:
+        if exclusive:
+            try:
+                os.link(tmp, path)
+            except FileExistsError:
+                logger.debug(f"{path} was created by another job.")
+        else:
+            os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    _cache.pop(path, None)
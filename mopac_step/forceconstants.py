@@ -3,10 +3,11 @@
 """Caculate the forceconstant matrix using MOPAC"""
 
 import logging
-from math import sqrt
 from pathlib import Path
 import textwrap
 
+import numpy as np
+
 import mopac_step
 import seamm
 import seamm_util.printing as printing
@@ -27,6 +28,7 @@ class Forceconstants(mopac_step.Energy):
         super().__init__(flowchart=flowchart, title=title, extension=extension)
 
         self._calculation = "force constants"
+        self._aux_properties.add("TRANS_VECTS")
         self._model = None
         self._metadata = mopac_step.metadata
         self.parameters = mopac_step.ForceconstantsParameters()
@@ -242,22 +244,17 @@ class Forceconstants(mopac_step.Energy):
             n_atoms = len(tmp)
 
             # Replicate for x, y, z
-            mass = []
-            for v in tmp:
-                for _ in range(3):
-                    mass.append(v)
+            mass = np.repeat(np.asarray(tmp, dtype=float), 3)
 
             # Get the atom part of the force constant matrix.
             if "HESSIAN_MATRIX" not in data:
                 raise RuntimeError("Found no atomic Hessian matrix!")
-            hessian = data["HESSIAN_MATRIX"]
 
-            ij = 0
+            # The lower triangle, stored by rows
+            i, j = np.tril_indices(last)
+            hessian = np.asarray(data["HESSIAN_MATRIX"][: i.size], dtype=float)
             factor = Q_(1.0, "mdyne/Å").m_as(P["atom_units"])
-            for i in range(last):
-                for j in range(i + 1):
-                    result.append(factor * hessian[ij] * sqrt(mass[i] * mass[j]))
-                    ij += 1
+            result.extend((factor * hessian * np.sqrt(mass[i] * mass[j])).tolist())
 
         if is_periodic and P["what"] != "atom part only":
             step = P["stepsize"]
@@ -341,8 +338,8 @@ class Forceconstants(mopac_step.Energy):
                     # atoms
                     if P["what"] == "full Hessian":
                         factor = Q_(1.0, "kcal/mol/Å^2").m_as(P["atom_units"])
-                        for v1, v2 in zip(f1, f2):
-                            result.append((v2 - v1) / (2 * step) * factor)
+                        tmp = (np.asarray(f2) - np.asarray(f1)) / (2 * step) * factor
+                        result.extend(tmp.tolist())
 
                     # strains
                     for i in range(strain + 1):
@@ -427,8 +424,8 @@ class Forceconstants(mopac_step.Energy):
                     # atoms
                     if P["what"] == "full Hessian":
                         factor = Q_(1.0, "kcal/mol/Å^2").m_as(P["atom_units"])
-                        for v, v0 in zip(f, f0):
-                            result.append(((v - v0) / step) * factor)
+                        tmp = (np.asarray(f) - np.asarray(f0)) / step * factor
+                        result.extend(tmp.tolist())
 
                     # strains
                     for i in range(strain + 1):
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""A description of this computer's hardware, for the timing records.
+
+Finding the details of the CPU with py-cpuinfo can take a second or more, so
+it is done only when first needed, once per process. The result is also kept
+in a small file for each host, so that later processes on the same machine
+need not probe the CPU again.
+"""
+
+import functools
+import json
+import logging
+import os
+from pathlib import Path
+import platform
+
+logger = logging.getLogger(__name__)
+
+# Where the fingerprints for each host are kept
+CACHE_DIR = Path("~/.seamm.d/timing/hosts")
+
+FIELDS = ("node", "cpu", "cpu_version", "cpu_count", "cpu_speed")
+
+
+@functools.lru_cache(maxsize=1)
+def fingerprint(cache_dir=CACHE_DIR):
+    """The host and CPU of this computer.
+
+    Parameters
+    ----------
+    cache_dir : pathlib.Path = ~/.seamm.d/timing/hosts
+        The directory with the cached fingerprints, or None to always probe
+        the CPU.
+
+    Returns
+    -------
+    dict(str, str)
+        The node (host) name, architecture, py-cpuinfo version, number of
+        CPUs and advertised speed. Anything that cannot be found is "".
+    """
+    node = platform.node()
+    path = None
+    if cache_dir is not None:
+        path = Path(cache_dir).expanduser() / f"{node}.json"
+        try:
+            result = json.loads(path.read_text())
+            if tuple(result) == FIELDS:
+                return result
+        except Exception:
+            pass
+
+    result = dict.fromkeys(FIELDS, "")
+    result["node"] = node
+    try:
+        from cpuinfo import get_cpu_info
+
+        tmp = get_cpu_info()
+    except Exception as e:
+        logger.debug(f"Could not get the CPU information: {e}")
+        tmp = {}
+    if "arch" in tmp:
+        result["cpu"] = tmp["arch"]
+    if "cpuinfo_version_string" in tmp:
+        result["cpu_version"] = tmp["cpuinfo_version_string"]
+    if "count" in tmp:
+        result["cpu_count"] = str(tmp["count"])
+    if "hz_advertized_friendly" in tmp:
+        result["cpu_speed"] = tmp["hz_advertized_friendly"]
+
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}")
+            tmp_path.write_text(json.dumps(result))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Could not save the CPU information to {path}: {e}")
+
+    return result
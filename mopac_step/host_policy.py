@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+
+"""The measured best settings for running MOPAC on this host.
+
+`python -m mopac_step benchmark` times MOPAC on a ladder of system sizes with
+different numbers of threads, with and without MOZYME, and writes what it
+finds to ~/.seamm.d/mopac/policy/<host>.json. The policy gives, for each
+size, the number of threads beyond which adding threads does not help
+noticeably, and the number of atoms above which MOZYME is faster than the
+conventional method.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+import platform
+import threading
+
+logger = logging.getLogger(__name__)
+
+POLICY_DIR = Path("~/.seamm.d/mopac/policy")
+
+# Use more threads only if that is measured to be this much faster
+SPEEDUP = 1.1
+
+# The loaded policies: path -> (modification time, policy)
+_cache = {}
+_lock = threading.Lock()
+
+
+def policy_path(host=None, directory=POLICY_DIR):
+    """The path to the policy for a host, by default this one."""
+    if host is None:
+        host = platform.node()
+    return Path(directory).expanduser() / f"{host}.json"
+
+
+class HostPolicy(object):
+    """The number of threads and when to use MOZYME on a host.
+
+    Parameters
+    ----------
+    host : str = None
+        The host, by default this one.
+    threads : [(int, int)] = []
+        The number of basis functions and the best number of threads for the
+        conventional method, in order of size.
+    mozyme_threads : [(int, int)] = []
+        The same for MOZYME.
+    mozyme_atoms : int = None
+        The smallest number of atoms for which MOZYME is faster, or None if
+        it was never faster.
+    timings : [dict] = []
+        The measurements the policy was made from.
+    """
+
+    def __init__(
+        self, host=None, threads=[], mozyme_threads=[], mozyme_atoms=None, timings=[]
+    ):
+        self.host = platform.node() if host is None else host
+        self.threads = [tuple(x) for x in threads]
+        self.mozyme_threads = [tuple(x) for x in mozyme_threads]
+        self.mozyme_atoms = mozyme_atoms
+        self.timings = list(timings)
+
+    @classmethod
+    def from_timings(cls, timings, host=None):
+        """Work out the policy from benchmark timings.
+
+        Parameters
+        ----------
+        timings : [dict]
+            Each with the number of atoms "n_atoms", basis functions
+            "n_basis", "threads", "mozyme" and wall time "time" in seconds,
+            which is None if the calculation failed.
+        host : str = None
+            The host, by default this one.
+
+        Returns
+        -------
+        HostPolicy
+        """
+        # (mozyme, n_basis) -> {threads: time}
+        times = {}
+        atoms = {}
+        for row in timings:
+            if row["time"] is None:
+                continue
+            key = (row["mozyme"], row["n_basis"])
+            times.setdefault(key, {})[row["threads"]] = row["time"]
+            atoms[row["n_basis"]] = row["n_atoms"]
+
+        threads = {False: [], True: []}
+        fastest = {}
+        for (mozyme, n_basis), by_threads in sorted(times.items()):
+            best = None
+            for n in sorted(by_threads):
+                if best is None or by_threads[n] * SPEEDUP < by_threads[best]:
+                    best = n
+            threads[mozyme].append((n_basis, best))
+            fastest[(mozyme, n_basis)] = min(by_threads.values())
+
+        # MOZYME from the smallest size at which it is clearly faster from then
+        # on, since it is slightly less accurate.
+        mozyme_atoms = None
+        for n_basis in sorted(atoms, reverse=True):
+            conventional = fastest.get((False, n_basis))
+            mozyme = fastest.get((True, n_basis))
+            if conventional is None or mozyme is None:
+                break
+            if mozyme * SPEEDUP >= conventional:
+                break
+            mozyme_atoms = atoms[n_basis]
+
+        return cls(
+            host=host,
+            threads=threads[False],
+            mozyme_threads=threads[True],
+            mozyme_atoms=mozyme_atoms,
+            timings=timings,
+        )
+
+    @classmethod
+    def load(cls, path=None):
+        """The policy for this host, if it has been benchmarked.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path = None
+            The policy file, by default the one for this host.
+
+        Returns
+        -------
+        HostPolicy or None
+        """
+        path = policy_path() if path is None else Path(path).expanduser()
+        with _lock:
+            try:
+                mtime = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                return None
+            cached = _cache.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            try:
+                data = json.loads(path.read_text())
+                result = cls(**data)
+            except Exception as e:
+                logger.warning(f"Could not read the MOPAC policy {path}: {e}")
+                result = None
+            _cache[path] = (mtime, result)
+            return result
+
+    def save(self, path=None):
+        """Write the policy, by default to the file for its host.
+
+        Returns
+        -------
+        pathlib.Path
+            The file written.
+        """
+        path = policy_path(self.host) if path is None else Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "host": self.host,
+            "threads": self.threads,
+            "mozyme_threads": self.mozyme_threads,
+            "mozyme_atoms": self.mozyme_atoms,
+            "timings": self.timings,
+        }
+        tmp = path.with_name(f".{path.name}.{os.getpid()}")
+        tmp.write_text(json.dumps(data, indent=4))
+        os.replace(tmp, path)
+        return path
+
+    def threads_for(self, n_basis, mozyme=False):
+        """The number of threads to use for a system.
+
+        Parameters
+        ----------
+        n_basis : int
+            The number of basis functions.
+        mozyme : bool = False
+            Whether MOZYME is used.
+
+        Returns
+        -------
+        int or None
+            The best number of threads measured for the nearest size at least
+            as large, or None if there are no measurements.
+        """
+        ladder = self.mozyme_threads if mozyme else self.threads
+        if len(ladder) == 0:
+            return None
+        for size, threads in ladder:
+            if size >= n_basis:
+                return threads
+        return ladder[-1][1]
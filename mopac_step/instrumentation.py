@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+"""Timers for the phases of a MOPAC step, and an optional profiler.
+
+For small molecules the Python side of a step, e.g. writing the structure,
+generating SMILES, parsing the AUX file and storing the results, can take
+longer than MOPAC itself. The phases of a step are timed with nested timers:
+
+    with instrumentation.phase("analyze"):
+        ...
+        with instrumentation.phase("parse_aux"):
+            ...
+
+Timers are only recorded while a PhaseTimer is active, which the MOPAC step
+starts for each run, so phase() costs almost nothing otherwise. The times are
+written as JSON lines to timings.jsonl in the step directory, one line per
+phase, with its nesting.
+
+The step can also be profiled, with cProfile or pyinstrument if it is
+installed, writing profile.prof or profile.html to the step directory.
+"""
+
+import contextlib
+import cProfile
+import json
+import logging
+from pathlib import Path
+import threading
+import time
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+# The active timer, for each thread
+_active = threading.local()
+
+
+class PhaseTimer(object):
+    """Nested timers for the phases of a step.
+
+    Parameters
+    ----------
+    step : str
+        The name of the step, written with each phase.
+    """
+
+    def __init__(self, step=""):
+        self.step = step
+        self.records = []
+        self._stack = []
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_active, "timer", None)
+        _active.timer = self
+        return self
+
+    def __exit__(self, *args):
+        _active.timer = self._previous
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time a phase, nested within any phase already being timed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase.
+        """
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - t0
+            self._stack.pop()
+            self.records.append(
+                {
+                    "step": self.step,
+                    "phase": path,
+                    "depth": len(self._stack),
+                    "seconds": round(seconds, 6),
+                }
+            )
+
+    def totals(self, depth=None):
+        """The total time in each phase.
+
+        Parameters
+        ----------
+        depth : int = None
+            Only the phases at this depth, e.g. 0 for the outermost.
+
+        Returns
+        -------
+        dict(str, float)
+            The phase, including the phases it is nested in, and its time.
+        """
+        result = {}
+        for record in self.records:
+            if depth is None or record["depth"] == depth:
+                name = record["phase"]
+                result[name] = result.get(name, 0.0) + record["seconds"]
+        return result
+
+    def write(self, path):
+        """Append the times of the phases to a file, as JSON lines.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The file, usually timings.jsonl in the step directory.
+        """
+        try:
+            with Path(path).open("a") as fd:
+                for record in self.records:
+                    fd.write(json.dumps(record) + "\n")
+        except Exception as e:
+            logger.debug(f"Could not write the timings to {path}: {e}")
+
+
+def phase(name):
+    """Time a phase if a PhaseTimer is active, otherwise do nothing.
+
+    Parameters
+    ----------
+    name : str
+        The name of the phase.
+
+    Returns
+    -------
+    context manager
+    """
+    timer = getattr(_active, "timer", None)
+    if timer is None:
+        return contextlib.nullcontext()
+    return timer.phase(name)
+
+
+def timed(iterable, name):
+    """Time getting each item from an iterable, e.g. a lazy parser.
+
+    Parameters
+    ----------
+    iterable : iterable
+        The items.
+    name : str
+        The name of the phase.
+
+    Yields
+    ------
+    object
+        The items.
+    """
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+@contextlib.contextmanager
+def profile(profiler, directory):
+    """Profile the code in the context.
+
+    Parameters
+    ----------
+    profiler : str
+        "none", "cProfile" or "pyinstrument".
+    directory : str or pathlib.Path
+        Where to write profile.prof or profile.html.
+    """
+    if profiler == "cProfile":
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(Path(directory) / "profile.prof")
+    elif profiler == "pyinstrument":
+        if pyinstrument is None:
+            logger.warning("pyinstrument is not installed, so not profiling.")
+            yield
+            return
+        prof = pyinstrument.Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            (Path(directory) / "profile.html").write_text(prof.output_html())
+    else:
+        yield
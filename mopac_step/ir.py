@@ -8,6 +8,7 @@ from pathlib import Path
 import textwrap
 import traceback
 
+import numpy as np
 from tabulate import tabulate
 
 import mopac_step
@@ -30,6 +31,19 @@ class IR(mopac_step.Energy):
         super().__init__(flowchart=flowchart, title=title, extension=extension)
 
         self._calculation = "vibrations"
+        self._aux_properties.update(
+            {
+                "NORMAL_MODE_SYMMETRY_LABELS",
+                "ORIENTATION_ATOM_X",
+                "PRI_MOM_OF_I",
+                "ROTAT_CONSTS",
+                "VIB._EFF_MASS",
+                "VIB._FREQ",
+                "VIB._RED_MASS",
+                "VIB._TRAVEL",
+                "VIB._T_DIP",
+            }
+        )
         self._model = None
         self._metadata = mopac_step.metadata
         self.parameters = mopac_step.IRParameters()
@@ -124,10 +138,11 @@ class IR(mopac_step.Energy):
                 raise NotImplementedError(
                     "Thermodynamics cannot yet handle periodicity"
                 )
-            xyz = []
-            it = iter(data["ORIENTATION_ATOM_X"])
-            for x in it:
-                xyz.append([float(x), float(next(it)), float(next(it))])
+            xyz = (
+                np.asarray(data["ORIENTATION_ATOM_X"], dtype=float)
+                .reshape(-1, 3)
+                .tolist()
+            )
 
             if P["structure handling"] != "Discard the structure":
                 configuration.atoms.set_coordinates(xyz, fractionals=False)
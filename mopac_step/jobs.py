@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""Run MOPAC steps concurrently.
+
+MOPAC.run() waits for MOPAC to finish, so independent MOPAC steps, such as
+the same molecule with several Hamiltonians, run one after another.
+MOPAC.submit() instead prepares the input, starts MOPAC in the background and
+returns a MOPACJob at once. Calling result() on the job waits for MOPAC and
+then analyzes the results, in the calling thread, so that the database and
+printing are only used from one thread:
+
+    jobs = [node.submit() for node in nodes]
+    for job in jobs:
+        job.result()
+
+A JobQueue limits how many MOPAC processes run at once.
+"""
+
+import concurrent.futures
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# The queue shared by the MOPAC steps
+_queue = None
+_lock = threading.Lock()
+
+
+def queue(max_jobs=None):
+    """The queue shared by the MOPAC steps.
+
+    Parameters
+    ----------
+    max_jobs : int = None
+        The most MOPAC processes to run at once, or None to leave the limit
+        as it is. The limit starts at 1.
+
+    Returns
+    -------
+    JobQueue
+    """
+    global _queue
+    with _lock:
+        if _queue is None:
+            _queue = JobQueue()
+        if max_jobs is not None:
+            _queue.max_jobs = max_jobs
+    return _queue
+
+
+class JobQueue(object):
+    """Run functions in background threads, a limited number at a time.
+
+    Parameters
+    ----------
+    max_jobs : int = 1
+        The most functions to run at once.
+    """
+
+    def __init__(self, max_jobs=1):
+        self._max_jobs = max(1, int(max_jobs))
+        self.running = 0
+        self._condition = threading.Condition()
+
+    @property
+    def max_jobs(self):
+        """The most functions to run at once."""
+        return self._max_jobs
+
+    @max_jobs.setter
+    def max_jobs(self, value):
+        with self._condition:
+            self._max_jobs = max(1, int(value))
+            self._condition.notify_all()
+
+    def submit(self, function, *args, **kwargs):
+        """Run a function once fewer than max_jobs are running.
+
+        Parameters
+        ----------
+        function : callable
+            The function to run.
+        args, kwargs
+            The arguments for the function.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The result of the function.
+        """
+        future = concurrent.futures.Future()
+        thread = threading.Thread(
+            target=self._run,
+            args=(future, function, args, kwargs),
+            name="mopac-job",
+            daemon=True,
+        )
+        thread.start()
+        return future
+
+    def _run(self, future, function, args, kwargs):
+        """Wait for a free slot, then run the function."""
+        with self._condition:
+            self._condition.wait_for(lambda: self.running < self._max_jobs)
+            self.running += 1
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            with self._condition:
+                self.running -= 1
+                self._condition.notify_all()
+
+
+class MOPACJob(object):
+    """The handle for a MOPAC step running in the background.
+
+    Parameters
+    ----------
+    node : mopac_step.MOPAC
+        The step.
+    stages : generator
+        The rest of the step, waiting for the results of MOPAC.
+    future : concurrent.futures.Future = None
+        The results of MOPAC, or None if MOPAC did not need to run.
+    finish : callable = None
+        Called when the step has finished, with no arguments.
+    next_node : seamm.Node = None
+        The next node, if the step has already finished.
+    """
+
+    def __init__(self, node, stages=None, future=None, finish=None, next_node=None):
+        self.node = node
+        self._stages = stages
+        self._future = future
+        self._finish = finish
+        self._next_node = next_node
+        self._finished = stages is None
+
+    def done(self):
+        """Whether MOPAC has finished, so result() will not wait for it."""
+        return self._finished or self._future is None or self._future.done()
+
+    def result(self, timeout=None):
+        """Wait for MOPAC and analyze the results, once.
+
+        Parameters
+        ----------
+        timeout : float = None
+            The most seconds to wait for MOPAC, or None to wait until done.
+
+        Returns
+        -------
+        seamm.Node
+            The next node in the flowchart, as returned by run().
+        """
+        if self._finished:
+            return self._next_node
+        try:
+            try:
+                value = self._future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                raise
+            except BaseException as e:
+                self._finished = True
+                self._stages.throw(e)
+            self._finished = True
+            try:
+                self._stages.send(value)
+            except StopIteration as e:
+                self._next_node = e.value
+            else:
+                raise RuntimeError("The MOPAC step did not finish.")
+        finally:
+            if self._finished and self._finish is not None:
+                self._finish()
+                self._finish = None
+        return self._next_node
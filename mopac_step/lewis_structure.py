@@ -3,11 +3,9 @@
 """Setup and run MOPAC for the Lewis structure"""
 
 import calendar
-import configparser
 import datetime
 import json  # noqa: F401
 import logging
-from pathlib import Path
 import pprint
 import os
 import string
@@ -16,6 +14,7 @@ import textwrap
 from tabulate import tabulate
 
 import mopac_step
+from mopac_step import executor_config
 import seamm
 import seamm_util.printing as printing
 from seamm_util.printing import FormattedText as __
@@ -160,17 +159,8 @@ class LewisStructure(mopac_step.MOPACBase):
 
         executor = self.flowchart.executor
 
-        # Read configuration file for MOPAC
-        ini_dir = Path(seamm_options["root"]).expanduser()
-        full_config = configparser.ConfigParser()
-        full_config.read(ini_dir / "mopac.ini")
-        executor_type = executor.name
-        if executor_type not in full_config:
-            raise RuntimeError(
-                f"No section for '{executor_type}' in MOPAC ini file "
-                f"({ini_dir / 'mopac.ini'})"
-            )
-        config = dict(full_config.items(executor_type))
+        # The configuration for MOPAC with this executor, from mopac.ini
+        config = executor_config.resolve(executor.name, seamm_options["root"])
 
         return_files = ["mopac.arc", "mopac.out", "mopac.aux"]
         result = executor.run(
@@ -206,11 +196,9 @@ class LewisStructure(mopac_step.MOPACBase):
         """Read the results from the Lewis calculation and process."""
         _, configuration = self.get_system_configuration(None)
 
-        # Split the aux files into sections for each step
+        # There is only one section in the aux file
         filename = "mopac.aux"
-        with open(os.path.join(self.directory, filename), mode="r") as fd:
-            lines_aux = fd.read().splitlines()
-        data = self.parse_aux(lines_aux[2:-1])
+        data = next(self.read_aux(os.path.join(self.directory, filename)), {})
 
         # Add main citation for MOPAC
         if "MOPAC_VERSION" in data:
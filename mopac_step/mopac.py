@@ -3,29 +3,28 @@
 """Setup and run MOPAC"""
 
 import calendar
-import configparser
-import csv
+import concurrent.futures
 from datetime import datetime, timezone
 import importlib
+import itertools
 import logging
 import os
 import os.path
 from pathlib import Path
-import platform
 import pprint
 import shutil
 import string
 import time
 
-from cpuinfo import get_cpu_info
-
 import molsystem
 import seamm
 import seamm_exec
-from seamm_util import Configuration
 import seamm_util.printing as printing
 from seamm_util.printing import FormattedText as __
 import mopac_step
+from mopac_step import checkpoint, densities, executor_config, hardware
+from mopac_step import instrumentation, jobs, mopactools_backend, result_cache
+from mopac_step import retention
 
 logger = logging.getLogger(__name__)
 job = printing.getPrinter()
@@ -37,6 +36,32 @@ csv_file = resources / "properties.csv"
 molsystem.add_properties_from_file(csv_file)
 
 
+def _format_time(t):
+    """A time in seconds as e.g. "5.2 s", "3.5 minutes" or "2.1 hours"."""
+    if t < 60:
+        return f"{t:.1f} s"
+    if t < 3600:
+        return f"{t / 60:.1f} minutes"
+    return f"{t / 3600:.1f} hours"
+
+
+def _with_timer(timer, stages):
+    """The stages of a step, with its timer active except between stages."""
+    value = None
+    while True:
+        with timer:
+            try:
+                work = stages.send(value)
+            except StopIteration as e:
+                return e.value
+        try:
+            value = yield work
+        except BaseException as e:
+            with timer:
+                stages.throw(e)
+            raise
+
+
 class MOPAC(mopac_step.MOPACBase):
     def __init__(
         self,
@@ -63,51 +88,18 @@ class MOPAC(mopac_step.MOPACBase):
         self._lattice_shear = True
         self._lattice_couple = "none"
         self._input_only = False
+        self._configurations = None
+        self._t_mopac = None  # The time for MOPAC, until the step finishes
 
         super().__init__(
             flowchart=flowchart, title=title, extension=extension, logger=logger
         )
 
         # Set up the timing information
-        self._timing_data = []
-        self._timing_path = Path("~/.seamm.d/timing/mopac.csv").expanduser()
-        self._timing_header = [
-            "node",  # 0
-            "cpu",  # 1
-            "cpu_version",  # 2
-            "cpu_count",  # 3
-            "cpu_speed",  # 4
-            "date",  # 5
-            "H_SMILES",  # 6
-            "ISOMERIC_SMILES",  # 7
-            "formula",  # 8
-            "net_charge",  # 9
-            "spin_multiplicity",  # 10
-            "keywords",  # 11
-            "nproc",  # 12
-            "time",  # 13
-        ]
-        try:
-            self._timing_path.parent.mkdir(parents=True, exist_ok=True)
-
-            self._timing_data = 14 * [""]
-            self._timing_data[0] = platform.node()
-            tmp = get_cpu_info()
-            if "arch" in tmp:
-                self._timing_data[1] = tmp["arch"]
-            if "cpuinfo_version_string" in tmp:
-                self._timing_data[2] = tmp["cpuinfo_version_string"]
-            if "count" in tmp:
-                self._timing_data[3] = str(tmp["count"])
-            if "hz_advertized_friendly" in tmp:
-                self._timing_data[4] = tmp["hz_advertized_friendly"]
-
-            if not self._timing_path.exists():
-                with self._timing_path.open("w", newline="") as fd:
-                    writer = csv.writer(fd)
-                    writer.writerow(self._timing_header)
-        except Exception:
-            self._timing_data = None
+        # The columns are mopac_step.timing_store.COLUMNS
+        self._timing_store = mopac_step.TimingStore()
+        # The hardware (0-4) is only found when the timing is written
+        self._timing_data = 14 * [""]
 
     @property
     def input_only(self):
@@ -118,6 +110,40 @@ class MOPAC(mopac_step.MOPACBase):
     def input_only(self, value):
         self._input_only = value
 
+    @property
+    def configurations(self):
+        """The configurations to run as a batch, or None for the current one."""
+        return self._configurations
+
+    @configurations.setter
+    def configurations(self, value):
+        self._configurations = None if value is None else list(value)
+
+    def batch_configurations(self, system, configuration):
+        """The configurations to run, in order.
+
+        By default only the current configuration is run. A batch of
+        configurations is run in one MOPAC job if they have been given with
+        `configurations`, or if the batch option asks for all the
+        configurations of the system.
+
+        Parameters
+        ----------
+        system : molsystem._System
+            The current system.
+        configuration : molsystem._Configuration
+            The current configuration.
+
+        Returns
+        -------
+        [molsystem._Configuration]
+        """
+        if self.configurations is not None and len(self.configurations) > 0:
+            return self.configurations
+        if self.options.get("batch", "current configuration") == "all configurations":
+            return system.configurations
+        return [configuration]
+
     def description_text(self, P=None):
         """Return a short description of this step.
 
@@ -141,27 +167,494 @@ class MOPAC(mopac_step.MOPACBase):
         return text
 
     def run(self, printer=printer):
-        """Run MOPAC"""
-        # Create the directory
+        """Run MOPAC, timing the phases of the step.
+
+        The time for each phase is appended to timings.jsonl in the step
+        directory, and recorded with the timing of MOPAC itself.
+        """
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._t_mopac = None
+        timer = instrumentation.PhaseTimer(step=".".join(str(e) for e in self._id))
+        profiler = self.options.get("profile", "none")
+        try:
+            with instrumentation.profile(profiler, directory):
+                stages = _with_timer(timer, self._stages(printer))
+                try:
+                    work = next(stages)
+                    while True:
+                        # Time the work as it is in the background for submit()
+                        with timer:
+                            result = work()
+                        work = stages.send(result)
+                except StopIteration as e:
+                    return e.value
+        finally:
+            self._finish_timing(timer)
+
+    def submit(self, printer=printer):
+        """Start the step, running MOPAC in the background.
+
+        The input is written and MOPAC started, then a handle is returned
+        without waiting for MOPAC to finish. The results are analyzed when
+        result() is called on the handle, which returns the next node as
+        run() does. Steps that are independent can thus run at the same time,
+        up to the limit given by the --max-jobs option.
+
+        Returns
+        -------
+        mopac_step.MOPACJob
+            The handle for the step.
+        """
         directory = Path(self.directory)
         directory.mkdir(parents=True, exist_ok=True)
 
+        self._t_mopac = None
+        timer = instrumentation.PhaseTimer(step=".".join(str(e) for e in self._id))
+        stages = _with_timer(timer, self._stages(printer))
+        try:
+            work = next(stages)
+        except StopIteration as e:
+            # Nothing to run, e.g. the step finished previously
+            self._finish_timing(timer)
+            return mopac_step.MOPACJob(self, next_node=e.value)
+        except BaseException:
+            self._finish_timing(timer)
+            raise
+
+        def run_work():
+            with timer:
+                return work()
+
+        future = jobs.queue(self._max_jobs()).submit(run_work)
+        return mopac_step.MOPACJob(
+            self, stages, future, finish=lambda: self._finish_timing(timer)
+        )
+
+    def _stages(self, printer=printer):
+        """Run MOPAC, in stages.
+
+        This is a generator which yields a function that runs MOPAC, if it
+        needs to be run, and is sent the result of the function. The rest of
+        the step then analyzes the results, returning the next node.
+        """
+        directory = Path(self.directory)
+
+        # Each run is timed afresh, unless it turns out not to be timeable
+        self._timing_data = 14 * [""]
+
         next_node = super().run(printer)
 
         system, configuration = self.get_system_configuration(None)
-        n_atoms = configuration.n_atoms
-        if n_atoms == 0:
-            self.logger.error("MOPAC run(): there is no structure!")
-            raise RuntimeError("MOPAC run(): there is no structure!")
+        configurations = self.batch_configurations(system, configuration)
+        for item in configurations:
+            if item.n_atoms == 0:
+                self.logger.error("MOPAC run(): there is no structure!")
+                raise RuntimeError("MOPAC run(): there is no structure!")
+        # The threads are chosen for the largest configuration
+        largest = max(configurations, key=lambda x: x.n_atoms)
+        n_atoms = largest.n_atoms
 
         # Print our header to the main output
         printer.normal(self.header)
         printer.normal("")
+        if len(configurations) > 1:
+            printer.normal(
+                __(
+                    f"Running a batch of {len(configurations)} configurations of "
+                    f"{system.name}.",
+                    indent=self.indent + 4 * " ",
+                )
+            )
+            printer.normal("")
+            # Timings are recorded for single configurations
+            self._timing_data = None
 
         # Access the options
         options = self.options
         seamm_options = self.global_options
 
+        # Work through the subflowchart to find out what to do, for each
+        # configuration in turn, since the substeps use the current one.
+        text = ""
+        all_keywords = []
+        calculations = []
+        input_starts = []  # Where each calculation starts in the input file
+        batch = []  # Each configuration and the number of calculations per substep
+        # The structure is written once and reused by all the substeps.
+        with instrumentation.phase("input"), self.structure_cache():
+            try:
+                for item in configurations:
+                    if len(configurations) > 1:
+                        system.configuration = item
+                    part, counts, keywords, item_calculations, starts = (
+                        self._configuration_input(system, item)
+                    )
+                    input_starts.extend(len(text) + start for start in starts)
+                    text += part
+                    all_keywords.extend(keywords)
+                    calculations.extend(item_calculations)
+                    batch.append((item, counts))
+                structure_lines, _ = self.mopac_structure()
+            finally:
+                # Other steps may run while MOPAC does, so restore the current
+                # configuration now rather than after the analysis.
+                system.configuration = configuration
+        n_calculations = batch[0][1]
+
+        # Check for successful run, don't rerun
+        output = ""  # Text output to print
+        in_process = None  # Results when run in-process with mopactools
+        success = directory / "success.dat"
+        if success.exists():
+            self._timing_data = None
+        else:
+            # The input as the substeps give it, which identifies the run
+            source = text
+
+            # Start the SCF from the density of the previous calculation, or
+            # of an earlier step on the same structure.
+            if options.get("reuse_density", "yes") == "yes":
+                densities.chain(calculations)
+                if len(batch) == 1:
+                    self._reuse_density(calculations, structure_lines)
+
+            # Have MOPAC write restart files regularly, so that long
+            # calculations can be resumed if the job is interrupted.
+            resume = options.get("resume", "yes") == "yes" and len(batch) == 1
+            if resume:
+                interval = options.get("restart_interval", "600")
+                for keywords, _ in calculations:
+                    if checkpoint.restartable(keywords):
+                        densities.add_keyword(keywords, f"DUMP={interval}")
+
+            text, input_starts = densities.rewrite(text, input_starts, calculations)
+            all_keywords = [" ".join(keywords) for keywords, _ in calculations]
+
+            # Input files
+            files = {"mopac.dat": text}
+            self.logger.debug("mopac.dat:\n" + files["mopac.dat"])
+            for filename in files:
+                path = directory / filename
+                path.write_text(files[filename])
+
+            if self.input_only:
+                self._timing_data = None
+            elif self._can_run_in_process(calculations):
+                self._timing_data = None
+                in_process = []
+                first = 0
+                for item, counts in batch:
+                    last = first + sum(counts)
+                    in_process.extend(
+                        self._run_in_process(calculations[first:last], item)
+                    )
+                    first = last
+            else:
+                # Get the computational environment and set limits
+                ce = seamm_exec.computational_environment()
+
+                n_cores = ce["NTASKS"]
+                if seamm_options["ncores"] != "available":
+                    n_cores = min(n_cores, int(seamm_options["ncores"]))
+                n_available = n_cores
+                # Currently, on the Mac, it is not clear that any parallelism helps
+                # much.
+
+                n_hydrogens = largest.atoms.get_n_atoms("atno", "==", 1)
+                n_basis = (n_atoms - n_hydrogens) * 4 + n_hydrogens
+                predictor = mopac_step.TimingPredictor.load(self._timing_store)
+                if options["ncores"] == "default":
+                    # Use the number of threads measured to be best on this
+                    # machine by the benchmark, or that was fastest for similar
+                    # calculations. Without either run serial, since MOPAC
+                    # often gets little benefit from parallel.
+                    tmp = None
+                    policy = mopac_step.HostPolicy.load()
+                    if policy is not None:
+                        mozyme = any("MOZYME" in k.split() for k in all_keywords)
+                        tmp = policy.threads_for(n_basis, mozyme=mozyme)
+                    if tmp is None:
+                        tmp = predictor.best_threads(n_basis, all_keywords, n_cores)
+                    if tmp is None:
+                        tmp = 1
+                else:
+                    tmp = int(options["ncores"])
+                if tmp < n_cores:
+                    n_cores = tmp
+                if n_cores < 1:
+                    n_cores = 1
+                ce["NTASKS"] = n_cores
+
+                output = (
+                    f"MOPAC will use {n_cores} threads for {n_atoms} atoms with "
+                    f"{n_basis} basis functions."
+                )
+                t_predicted = predictor.predict(n_basis, all_keywords, n_cores)
+                if t_predicted is not None:
+                    output += f" It should take about {_format_time(t_predicted)}."
+                output = __(output, indent=8 * " ")
+
+                env = {
+                    "OMP_NUM_THREADS": str(n_cores),
+                }
+
+                executor = self.flowchart.executor
+
+                # The configuration for MOPAC with this executor, from mopac.ini
+                config = executor_config.resolve(executor.name, seamm_options["root"])
+
+                # Use the matching version of the seamm-mopac image by default.
+                config["version"] = self.version
+
+                return_files = [
+                    "mopac.arc",
+                    "mopac.out",
+                    "mopac.aux",
+                    "mopac.den",
+                    "stdout.txt",
+                    "stderr.txt",
+                ]
+
+                if self._timing_data is not None:
+                    with instrumentation.phase("smiles"):
+                        try:
+                            self._timing_data[6] = configuration.to_smiles(
+                                canonical=True, hydrogens=True
+                            )
+                        except Exception:
+                            self._timing_data[6] = ""
+                        try:
+                            self._timing_data[7] = configuration.isomeric_smiles
+                        except Exception:
+                            self._timing_data[7] = ""
+                        try:
+                            self._timing_data[8] = configuration.formula[0]
+                        except Exception:
+                            self._timing_data[7] = ""
+                        try:
+                            self._timing_data[9] = str(configuration.charge)
+                        except Exception:
+                            self._timing_data[9] = ""
+                        try:
+                            self._timing_data[10] = str(configuration.spin_multiplicity)
+                        except Exception:
+                            self._timing_data[10] = ""
+
+                    self._timing_data[11] = " && ".join(all_keywords)
+                    self._timing_data[5] = datetime.now(timezone.utc).isoformat()
+
+                cmd = ["{code}", "mopac.dat", ">", "stdout.txt", "2>", "stderr.txt"]
+
+                # Calculations that do not use the previous structure are
+                # independent, so can be run at the same time.
+                groups = self._independent_inputs(text, input_starts, calculations)
+                if options.get("parallel_jobs", "default") == "default":
+                    n_jobs = max(1, n_available // n_cores)
+                else:
+                    n_jobs = int(options["parallel_jobs"])
+                n_jobs = min(n_jobs, len(groups))
+                if n_jobs > 1:
+                    # The time for several MOPAC processes running at once is
+                    # not that of one with n_cores threads, so would mislead
+                    # the predictions.
+                    self._timing_data = None
+
+                # An identical calculation may already have been run
+                cache = self._result_cache()
+                key = None
+                if cache is not None:
+                    identity = result_cache.identity(config)
+                    if identity is None:
+                        self.logger.info(
+                            "Not using the cache of MOPAC results since the MOPAC "
+                            "executable could not be found."
+                        )
+                    else:
+                        # The density read by OLDENS is also an input
+                        inputs = []
+                        if any("OLDENS" in keywords for keywords, _ in calculations):
+                            inputs.append(directory / "mopac.den")
+                        key = cache.key(text, {**config, "mopac": identity}, inputs)
+                if key is not None and cache.get(key, directory) is not None:
+                    printer.normal(
+                        __(
+                            "Using the cached results of an identical MOPAC "
+                            "calculation.",
+                            indent=8 * " ",
+                        )
+                    )
+                    result = {
+                        "mopac.out": {"data": (directory / "mopac.out").read_text()}
+                    }
+                else:
+                    # Carry on from where an interrupted run stopped
+                    progress = checkpoint.Checkpoint(directory) if resume else None
+                    resumed = None
+                    if progress is not None:
+                        resumed = progress.resume(source)
+                        if resumed is not None:
+                            files["mopac.dat"] = self._remaining_input(
+                                progress, text, input_starts, calculations, *resumed
+                            )
+                            if files["mopac.dat"] is None:
+                                resumed = None
+                                files["mopac.dat"] = text
+                        if resumed is None:
+                            progress.start(source)
+                        else:
+                            (directory / "mopac.dat").write_text(files["mopac.dat"])
+                            n_jobs = 1
+                            # The time for part of the run would mislead
+                            self._timing_data = None
+                            printer.normal(
+                                __(
+                                    f"Resuming the interrupted MOPAC run, with "
+                                    f"{resumed[0]} of {len(calculations)} "
+                                    "calculations already finished.",
+                                    indent=8 * " ",
+                                )
+                            )
+
+                    if n_jobs > 1:
+                        printer.normal(
+                            __(
+                                f"Running {len(groups)} independent parts of the "
+                                f"calculation, {n_jobs} at a time.",
+                                indent=8 * " ",
+                            )
+                        )
+
+                    def execute():
+                        """Run MOPAC, which may be in another thread."""
+                        if files["mopac.dat"] == "":
+                            # Only the analysis was interrupted
+                            return {"mopac.out": {"data": ""}}, 0.0
+                        t0 = time.time_ns()
+                        with instrumentation.phase("executor"):
+                            if n_jobs > 1:
+                                result = self._run_parallel(
+                                    executor,
+                                    groups,
+                                    n_jobs,
+                                    cmd=cmd,
+                                    config=config,
+                                    return_files=return_files,
+                                    env=env,
+                                )
+                            else:
+                                # Follow the progress of optimizations in the AUX file
+                                with mopac_step.AuxTail(
+                                    directory / "mopac.aux",
+                                    status=directory / "progress.json",
+                                ):
+                                    result = executor.run(
+                                        cmd=cmd,
+                                        config=config,
+                                        directory=self.directory,
+                                        files=files,
+                                        return_files=return_files,
+                                        in_situ=True,
+                                        shell=True,
+                                        env=env,
+                                    )
+                        return result, (time.time_ns() - t0) / 1.0e9
+
+                    # Run MOPAC now, or hand it to the caller to run later
+                    result, t = yield execute
+                    if self._timing_data is not None:
+                        self._timing_data[13] = f"{t:.3f}"
+                        self._timing_data[12] = str(n_cores)
+                        # Recorded with the phases once the step has finished
+                        self._t_mopac = t
+
+                    if result and progress is not None:
+                        progress.finish()
+                        result["mopac.out"]["data"] = (
+                            directory / "mopac.out"
+                        ).read_text()
+
+                    # Only keep runs that finished, not e.g. ones that timed out
+                    if (
+                        result
+                        and key is not None
+                        and "MOPAC DONE" in result["mopac.out"]["data"][-500:]
+                    ):
+                        # The density is kept for later steps, see below
+                        cache.put(
+                            key,
+                            directory,
+                            ["mopac.out", "mopac.aux", "mopac.arc", "mopac.den"],
+                        )
+
+                if not result:
+                    self.logger.error("There was an error running MOPAC")
+                    return None
+
+                self.logger.debug("\n" + pprint.pformat(result))
+
+                self.logger.debug(
+                    "\n\nOutput from MOPAC\n\n" + result["mopac.out"]["data"] + "\n\n"
+                )
+
+        # Ran successfully, put out the success file. In-process runs have no
+        # files to analyze again, so are simply rerun.
+        if in_process is None:
+            success.write_text("success")
+
+        if not self.input_only:
+            # Analyze the results
+            with instrumentation.phase("analyze"):
+                if len(batch) > 1:
+                    self.analyze_batch(
+                        system, batch, output=output, in_process=in_process
+                    )
+                else:
+                    self.analyze(
+                        n_calculations=n_calculations,
+                        output=output,
+                        in_process=in_process,
+                    )
+
+            # Keep the final density for later steps on the same structure
+            if len(batch) == 1 and options.get("reuse_density", "yes") == "yes":
+                structure_lines, _ = self.mopac_structure()
+                densities.registry.add(
+                    structure_lines, calculations[-1][0], directory / "mopac.den"
+                )
+
+            # The output files are only read again if the flowchart is rerun
+            if in_process is None:
+                with instrumentation.phase("retention"):
+                    self._retain_files(options.get("mopac_files", "keep"))
+
+        # Close the reference handler, which should force it to close the
+        # connection.
+        self.references = None
+
+        return next_node
+
+    def _configuration_input(self, system, configuration):
+        """The MOPAC input for the calculations on one configuration.
+
+        The configuration must be the current configuration of the system,
+        since the substeps work on the current configuration.
+
+        Parameters
+        ----------
+        system : molsystem._System
+            The system.
+        configuration : molsystem._Configuration
+            The configuration.
+
+        Returns
+        -------
+        str, [int], [str], [([str], str)], [int]
+            The input, the number of calculations for each substep, the
+            keywords and the keywords and structure of each calculation, and
+            where each calculation starts in the input.
+        """
         extra_keywords = ["AUX(MOS=10,XP,XS,PRECISION=3)"]
 
         # Always add the charge since that will cause MOZYME, if used, to check.
@@ -234,19 +727,24 @@ class MOPAC(mopac_step.MOPACBase):
         text = ""
         n_calculations = []
         all_keywords = []
+        calculations = []
+        input_starts = []  # Where each calculation starts in the input file
         while node:
             node.parent = self
             inputs = node.get_input()
             n_calculations.append(len(inputs))
             for keywords, structure, comment in inputs:
+                input_starts.append(len(text))
                 lines = []
                 if "OLDGEO" not in keywords:
-                    structure_lines, symlines = self.mopac_structure()
+                    with instrumentation.phase("structure"):
+                        structure_lines, symlines = self.mopac_structure()
                     if symlines != "" and "SYMMETRY" not in extra_keywords:
                         extra_keywords.append("SYMMETRY")
                 else:
                     symlines = ""
                 all_keywords.append(" ".join(keywords + extra_keywords))
+                calculations.append((keywords + extra_keywords, structure))
                 lines.append(" ".join(keywords + extra_keywords))
                 lines.append(system.name)
                 if comment is None:
@@ -268,187 +766,7 @@ class MOPAC(mopac_step.MOPACBase):
                     text += "\n"
             node = node.next()
 
-        # Check for successful run, don't rerun
-        output = ""  # Text output to print
-        success = directory / "success.dat"
-        if success.exists():
-            self._timing_data = None
-        else:
-            # Input files
-            files = {"mopac.dat": text}
-            self.logger.debug("mopac.dat:\n" + files["mopac.dat"])
-            for filename in files:
-                path = directory / filename
-                path.write_text(files[filename])
-
-            if self.input_only:
-                self._timing_data = None
-            else:
-                # Get the computational environment and set limits
-                ce = seamm_exec.computational_environment()
-
-                n_cores = ce["NTASKS"]
-                if seamm_options["ncores"] != "available":
-                    n_cores = min(n_cores, int(seamm_options["ncores"]))
-                # Currently, on the Mac, it is not clear that any parallelism helps
-                # much.
-
-                n_hydrogens = configuration.atoms.get_n_atoms("atno", "==", 1)
-                n_basis = (n_atoms - n_hydrogens) * 4 + n_hydrogens
-                if options["ncores"] == "default":
-                    # Since it is the matrix diagonalization, work out rough
-                    # size of matrix
-
-                    # Wild guess!
-                    # tmp = max(1, int(pow(n_basis / 1000, 3)))
-                    # if tmp < n_cores:
-                    #     n_cores = tmp
-
-                    # It appears that MOPAC gets little benefit from parallel,
-                    # so run serial
-                    tmp = 1
-                else:
-                    tmp = int(options["ncores"])
-                if tmp < n_cores:
-                    n_cores = tmp
-                if n_cores < 1:
-                    n_cores = 1
-                ce["NTASKS"] = n_cores
-
-                output = (
-                    f"MOPAC will use {n_cores} threads for {n_atoms} atoms with "
-                    f"{n_basis} basis functions."
-                )
-                output = __(output, indent=8 * " ")
-
-                env = {
-                    "OMP_NUM_THREADS": str(n_cores),
-                }
-
-                executor = self.flowchart.executor
-
-                # Read configuration file for MOPAC if it exists
-                executor_type = executor.name
-                full_config = configparser.ConfigParser()
-                ini_dir = Path(seamm_options["root"]).expanduser()
-                path = ini_dir / "mopac.ini"
-                # If the config file doesn't exists, get the default
-                if not path.exists():
-                    resources = importlib.resources.files("mopac_step") / "data"
-                    ini_text = (resources / "mopac.ini").read_text()
-                    txt_config = Configuration(path)
-                    txt_config.from_string(ini_text)
-
-                    # Work out the conda info needed
-                    txt_config.set_value("local", "conda", os.environ["CONDA_EXE"])
-                    txt_config.set_value("local", "conda-environment", "seamm-mopac")
-                    txt_config.save()
-
-                full_config.read(ini_dir / "mopac.ini")
-
-                # Getting desperate! Look for an executable in the path
-                if executor_type not in full_config:
-                    path = shutil.which("mopac")
-                    if path is None:
-                        raise RuntimeError(
-                            f"No section for '{executor_type}' in MOPAC ini file "
-                            f"({ini_dir / 'mopac.ini'}), nor in the defaults, nor "
-                            "in the path!"
-                        )
-                    else:
-                        txt_config = Configuration(path)
-                        txt_config.add_section(executor_type)
-                        txt_config.set_value(executor_type, "installation", "local")
-                        txt_config.set_value(executor_type, "code", str(path))
-                        txt_config.save()
-                        full_config.read(ini_dir / "mopac.ini")
-
-                config = dict(full_config.items(executor_type))
-
-                # Use the matching version of the seamm-mopac image by default.
-                config["version"] = self.version
-
-                return_files = [
-                    "mopac.arc",
-                    "mopac.out",
-                    "mopac.aux",
-                    "stdout.txt",
-                    "stderr.txt",
-                ]
-
-                if self._timing_data is not None:
-                    try:
-                        self._timing_data[6] = configuration.to_smiles(
-                            canonical=True, hydrogens=True
-                        )
-                    except Exception:
-                        self._timing_data[6] = ""
-                    try:
-                        self._timing_data[7] = configuration.isomeric_smiles
-                    except Exception:
-                        self._timing_data[7] = ""
-                    try:
-                        self._timing_data[8] = configuration.formula[0]
-                    except Exception:
-                        self._timing_data[7] = ""
-                    try:
-                        self._timing_data[9] = str(configuration.charge)
-                    except Exception:
-                        self._timing_data[9] = ""
-                    try:
-                        self._timing_data[10] = str(configuration.spin_multiplicity)
-                    except Exception:
-                        self._timing_data[10] = ""
-
-                    self._timing_data[11] = " && ".join(all_keywords)
-                    self._timing_data[5] = datetime.now(timezone.utc).isoformat()
-
-                t0 = time.time_ns()
-
-                result = executor.run(
-                    cmd=["{code}", "mopac.dat", ">", "stdout.txt", "2>", "stderr.txt"],
-                    config=config,
-                    directory=self.directory,
-                    files=files,
-                    return_files=return_files,
-                    in_situ=True,
-                    shell=True,
-                    env=env,
-                )
-
-                t = (time.time_ns() - t0) / 1.0e9
-                if self._timing_data is not None:
-                    self._timing_data[13] = f"{t:.3f}"
-                    self._timing_data[12] = str(n_cores)
-                    try:
-                        with self._timing_path.open("a", newline="") as fd:
-                            writer = csv.writer(fd)
-                            writer.writerow(self._timing_data)
-                    except Exception:
-                        pass
-
-                if not result:
-                    self.logger.error("There was an error running MOPAC")
-                    return None
-
-                self.logger.debug("\n" + pprint.pformat(result))
-
-                self.logger.debug(
-                    "\n\nOutput from MOPAC\n\n" + result["mopac.out"]["data"] + "\n\n"
-                )
-
-        # Ran successfully, put out the success file
-        success.write_text("success")
-
-        if not self.input_only:
-            # Analyze the results
-            self.analyze(n_calculations=n_calculations, output=output)
-
-        # Close the reference handler, which should force it to close the
-        # connection.
-        self.references = None
-
-        return next_node
+        return text, n_calculations, all_keywords, calculations, input_starts
 
     def set_id(self, node_id):
         """Set the id for node to a given tuple"""
@@ -457,95 +775,141 @@ class MOPAC(mopac_step.MOPACBase):
 
         return super().set_id(node_id)
 
-    def analyze(self, indent="", lines=[], n_calculations=None, output=""):
+    def analyze(
+        self, indent="", lines=[], n_calculations=None, output="", in_process=None
+    ):
         """Read the results from MOPAC calculations and analyze them,
         putting key results into variables for subsequent use by
         other stages
-        """
-
-        # Split the aux files into sections for each step
-        filename = "mopac.aux"
-        with open(os.path.join(self.directory, filename), mode="r") as fd:
-            lines_aux = fd.read().splitlines()
-
-        # Find the sections in the file corresponding to sub-tasks
-        # MOPAC keeps cumulative times, so fix them
-        t_total = 0.0
-        aux_data = []
-        start = 0
-        lineno = 0
-        section = 0
-        for line in lines_aux:
-            if "END OF MOPAC FILE" in line or "END OF MOPAC PROGRAM" in line:
-                self.logger.debug("\nAUX file section {}".format(section))
-                self.logger.debug("------------------")
-
-                tmp_data = self.parse_aux(lines_aux[start:lineno])
-                if "CPU_TIME" in tmp_data:
-                    tmp = tmp_data["CPU_TIME"]
-                    tmp_data["CPU_TIME"] = tmp - t_total
-                    t_total = tmp
-                aux_data.append(tmp_data)
-
-                self.logger.debug(pprint.pformat(tmp_data, width=170, compact=True))
-            lineno += 1
-            if "START OF MOPAC FILE" in line:
-                section += 1
-                start = lineno
 
-        # Split the output file into sections for each step
-        filename = "mopac.out"
-        with open(os.path.join(self.directory, filename), mode="r") as fd:
-            lines = fd.read().splitlines()
-
-        # Find the sections in the file corresponding to sub-tasks
-        out = []
-        start = 0
-        lineno = 0
-        for line in lines:
-            if "** Cite this program as:" in line or "Digital Object Ident" in line:
-                if lineno == 5:
-                    continue
-                out.append(lines[start : lineno - 5])
-                start = lineno - 6
-            lineno += 1
-        out.append(lines[start:])
-
-        for data in aux_data:
-            # Add main citation for MOPAC
-            if "MOPAC_VERSION" in data:
-                # like MOPAC2016.20.191M
-                release, version = data["MOPAC_VERSION"].split(".", maxsplit=1)
-                try:
-                    t = datetime.strptime(version[0:-1], "%y.%j")
-                    year = t.year
-                    month = t.month
-                    template = string.Template(self._bibliography["Stewart_2016"])
-                    month = calendar.month_abbr[int(month)].lower()
-                    citation = template.substitute(
-                        month=month, version=version, year=year, release=release
-                    )
-                    self.references.cite(
-                        raw=citation,
-                        alias="mopac",
-                        module="mopac_step",
-                        level=1,
-                        note="The principle MOPAC citation.",
-                    )
-                except Exception:
-                    self.references.cite(
-                        raw=self._bibliography["stewart_james_j_p_2022_6811510"],
-                        alias="mopac",
-                        module="mopac_step",
-                        level=1,
-                        note="The principle MOPAC citation.",
+        If the calculations were run in-process, in_process is a list of the
+        data and output text for each, which are used instead of the files.
+        """
+        wanted = set()
+        aux_sections, out = self._open_results(wanted, in_process)
+        try:
+            self._analyze_configuration(
+                aux_sections, out, wanted, n_calculations, output=output
+            )
+        finally:
+            aux_sections.close()
+            if in_process is None:
+                out.close()
+
+    def analyze_batch(self, system, batch, output="", in_process=None):
+        """Analyze the results for a batch of configurations.
+
+        Each configuration is made the current configuration of the system in
+        turn, and the substeps analyze its part of the results. The results
+        are stored in the database in one transaction, rather than committing
+        after each property of each configuration.
+
+        Parameters
+        ----------
+        system : molsystem._System
+            The system.
+        batch : [(molsystem._Configuration, [int])]
+            The configurations, in the order of the calculations, and the
+            number of calculations for each substep.
+        output : str
+            Text to print with the results of the first substep.
+        in_process : [(dict, str)] = None
+            The data and output for each calculation if run in-process.
+        """
+        current = system.configuration
+        system_db = system.system_db
+        deferred = system_db.deferred_commit
+        system_db.deferred_commit = True
+
+        wanted = set()
+        aux_sections, out = self._open_results(wanted, in_process)
+        state = {}
+        try:
+            for configuration, n_calculations in batch:
+                system.configuration = configuration
+                printer.normal(
+                    __(
+                        f"Configuration {configuration.name}",
+                        indent=self.indent + 4 * " ",
                     )
-                break
-
+                )
+                self._analyze_configuration(
+                    aux_sections,
+                    out,
+                    wanted,
+                    n_calculations,
+                    output=output,
+                    state=state,
+                )
+                output = ""
+        finally:
+            system.configuration = current
+            aux_sections.close()
+            if in_process is None:
+                out.close()
+            if not deferred:
+                system_db.deferred_commit = False
+                system_db.commit_transaction()
+
+    def _open_results(self, wanted, in_process=None):
+        """The sections of the AUX and output files to analyze.
+
+        Parameters
+        ----------
+        wanted : set(str)
+            The properties to parse from the AUX file, which may be changed
+            between reading sections.
+        in_process : [(dict, str)] = None
+            The data and output for each calculation if run in-process.
+
+        Returns
+        -------
+        generator, mopac_step.OutIndex or [mopac_step.OutSection]
+            The sections of the AUX file and the output file.
+        """
+        if in_process is not None:
+            aux_sections = (data for data, _ in in_process)
+            out = [
+                mopac_step.OutSection(text.encode(), 0, len(text.encode()))
+                for _, text in in_process
+            ]
+            return aux_sections, out
+        return self._read_results(wanted)
+
+    def _analyze_configuration(
+        self, aux_sections, out, wanted, n_calculations, output="", state=None
+    ):
+        """Analyze the results of the substeps for the current configuration.
+
+        Parameters
+        ----------
+        aux_sections : generator
+            The remaining sections of the AUX file.
+        out : mopac_step.OutIndex or [mopac_step.OutSection]
+            All the sections of the output file.
+        wanted : set(str)
+            The properties to parse from the AUX file, updated for each substep.
+        n_calculations : [int]
+            The number of calculations for each substep.
+        output : str
+            Text to print with the results of the first substep.
+        state : dict = None
+            Where the previous configurations in a batch finished, which is
+            updated for the next configuration.
+        """
+        if state is None:
+            state = {}
         # Loop through our subnodes. Get the first real node
         node = self.subflowchart.get_node("1").next()
-        first = 0
+        first = state.get("first", 0)
         n_node = 0
+        # MOPAC keeps cumulative times, so fix them. If independent parts were
+        # run separately, the time starts again at the start of each part.
+        t_total = 0.0
+        t_last = state.get("t_last", 0.0)
+        data = {}
+        section = first
+        cited = state.get("cited", False)
         while node:
             # Print the header for the node
             for value in node.description:
@@ -556,13 +920,36 @@ class MOPAC(mopac_step.MOPACBase):
                     output = ""
 
             last = first + n_calculations[n_node]
+            wanted.clear()
+            wanted.update(
+                getattr(node, "aux_properties", mopac_step.metadata["results"])
+            )
+            # Needed here for the timings and citation
+            wanted.update(("CPU_TIME", "MOPAC_VERSION"))
+            data_sections = []
+            # The AUX file is parsed lazily, as each section is read
+            sections = itertools.islice(aux_sections, n_calculations[n_node])
+            for data in instrumentation.timed(sections, "parse_aux"):
+                section += 1
+                self.logger.debug("\nAUX file section {}".format(section))
+                self.logger.debug("------------------")
+                if "CPU_TIME" in data:
+                    tmp = data["CPU_TIME"]
+                    if tmp >= t_last:
+                        data["CPU_TIME"] = tmp - t_last
+                    t_last = tmp
+                    t_total += data["CPU_TIME"]
+                self.logger.debug(pprint.pformat(data, width=170, compact=True))
+
+                if not cited:
+                    cited = self._cite_mopac(data)
+                data_sections.append(data)
+
             if last > len(out):
                 logger.error("Could not find the MOPAC output for subjob {last + 1}/")
-                node.analyze(data_sections=aux_data[first:last], out_sections=[])
+                node.analyze(data_sections=data_sections, out_sections=[])
             else:
-                node.analyze(
-                    data_sections=aux_data[first:last], out_sections=out[first:last]
-                )
+                node.analyze(data_sections=data_sections, out_sections=out[first:last])
             first = last
 
             printer.normal("")
@@ -570,6 +957,463 @@ class MOPAC(mopac_step.MOPACBase):
             node = node.next()
             n_node += 1
 
-        if n_node > 1 and "CPU_TIME" in aux_data[-1]:
+        state.update(first=first, t_last=t_last, cited=cited)
+
+        if n_node > 1 and "CPU_TIME" in data:
             text = f"MOPAC took a total of {t_total:.2f} s."
             printer.normal(str(__(text, **data, indent=self.indent)))
+
+    def _retain_files(self, policy):
+        """Compress or remove mopac.out and mopac.aux once they are analyzed.
+
+        Parameters
+        ----------
+        policy : str
+            "keep" to leave the files as they are, "compress" to compress
+            them, or "minimal" to compress mopac.out and remove mopac.aux once
+            the sidecar holds all of it.
+        """
+        if policy == "keep":
+            return
+        directory = Path(self.directory)
+        aux = directory / "mopac.aux"
+        retention.compress(directory / "mopac.out")
+        # The AUX file may have been compressed by an earlier run
+        source = retention.locate(aux)
+        if not source.exists():
+            return
+
+        if policy == "minimal":
+            # The analysis only parses the properties it uses, so parse the
+            # rest into the sidecar before removing the AUX file.
+            with mopac_step.AuxCache(aux, as_arrays=True) as sidecar:
+                full = sidecar.open() and sidecar.full
+            if not full:
+                for _ in self.read_aux(aux, as_arrays=True, cache=True):
+                    pass
+
+        with mopac_step.AuxCache(aux, as_arrays=True) as sidecar:
+            cached = sidecar.open()
+            if policy == "minimal" and cached and sidecar.full:
+                source.unlink()
+            elif source == aux:
+                retention.compress(aux)
+            else:
+                return
+            if cached:
+                sidecar.restamp()
+
+    def _reuse_density(self, calculations, structure_lines):
+        """Start from the density of an earlier step on the same structure.
+
+        The last calculation saves its density for later steps.
+
+        Parameters
+        ----------
+        calculations : [([str], str)]
+            The keywords and structure for each calculation, which are
+            updated.
+        structure_lines : str
+            The structure, as in the input file.
+        """
+        keywords, structure = calculations[0]
+        if "OLDGEO" not in keywords and structure is None:
+            path = densities.registry.get(structure_lines, keywords)
+            density = Path(self.directory) / "mopac.den"
+            if path is not None and path.resolve() != density.resolve():
+                shutil.copyfile(path, density)
+                densities.add_keyword(keywords, "OLDENS")
+                self.logger.info(f"Starting from the density in {path}")
+        densities.add_keyword(calculations[-1][0], "DENOUT")
+
+    def _remaining_input(self, progress, text, starts, calculations, n_done, first):
+        """The input for the calculations an interrupted run did not finish.
+
+        Parameters
+        ----------
+        progress : mopac_step.checkpoint.Checkpoint
+            The progress of the run.
+        text : str
+            The input file for all the calculations.
+        starts : [int]
+            The offset in the text of the start of each calculation.
+        calculations : [([str], str)]
+            The keywords and structure for each calculation.
+        n_done : int
+            The number of calculations that finished.
+        first : int
+            The first calculation of the interrupted run.
+
+        Returns
+        -------
+        str or None
+            The input file, empty if all the calculations finished, or None
+            if the run cannot be resumed.
+        """
+        if n_done >= len(calculations):
+            return ""
+        directory = Path(self.directory)
+        keywords = list(calculations[n_done][0])
+        start = starts[n_done]
+        end = starts[n_done + 1] if n_done + 1 < len(starts) else len(text)
+        lines = text[start:end].split("\n")
+
+        # The restart file may be from any calculation in the interrupted run
+        # that writes one, so is only used if it must be from this one.
+        if (
+            checkpoint.restartable(keywords)
+            and progress.restart.exists()
+            and not any(
+                checkpoint.restartable(k) for k, _ in calculations[first:n_done]
+            )
+        ):
+            # The density is read with the restart file
+            keywords = [k for k in keywords if k != "OLDENS"]
+            keywords.append("RESTART")
+        else:
+            progress.restart.unlink(missing_ok=True)
+            if not (directory / "mopac.den").exists():
+                keywords = [k for k in keywords if k != "OLDENS"]
+
+        if "OLDGEO" in keywords:
+            # Start from the structure at the end of the previous calculation
+            aux = directory / "mopac.aux.done"
+            wanted = {"ATOM_X_OPT", "ATOM_X", "TRANS_VECTS"}
+            sections = self.read_aux(aux, wanted=wanted) if aux.exists() else []
+            data = next(itertools.islice(sections, n_done - 1, None), {})
+            xyz = data.get("ATOM_X_OPT", data.get("ATOM_X", []))
+            xyz = [xyz[i : i + 3] for i in range(0, len(xyz), 3)]
+            tv = data.get("TRANS_VECTS", [])
+            xyz.extend(tv[i : i + 3] for i in range(0, len(tv), 3))
+            structure_lines, symlines = self.mopac_structure()
+            structure = checkpoint.with_coordinates(structure_lines, xyz)
+            if structure is None:
+                self.logger.warning(
+                    "Cannot find the structure to resume the MOPAC run from, so "
+                    "running it again from the start."
+                )
+                return None
+            keywords.remove("OLDGEO")
+            # The keywords, title and comment, then the structure as usual
+            lines = lines[0:3] + [structure]
+            if symlines != "":
+                lines.append(symlines)
+            lines.append("")
+
+        lines[0] = " ".join(keywords)
+        return "\n".join(lines) + text[end:]
+
+    def _independent_inputs(self, text, starts, calculations):
+        """Split the input file into parts that can be run independently.
+
+        A calculation with OLDGEO continues from the structure of the one
+        before, so must be run after it in the same part.
+
+        Parameters
+        ----------
+        text : str
+            The input file.
+        starts : [int]
+            The offset in the text of the start of each calculation.
+        calculations : [([str], str)]
+            The keywords and structure for each calculation.
+
+        Returns
+        -------
+        [str]
+            The input file for each independent part, in order.
+        """
+        groups = []
+        ends = starts[1:] + [len(text)]
+        for start, end, (keywords, _) in zip(starts, ends, calculations):
+            if "OLDGEO" in keywords and len(groups) > 0:
+                groups[-1] += text[start:end]
+            else:
+                groups.append(text[start:end])
+        return groups
+
+    def _run_parallel(self, executor, groups, n_jobs, return_files=[], **kwargs):
+        """Run independent parts of the calculation at the same time.
+
+        Each part is run in its own subdirectory, job_1, job_2, ..., and the
+        output files are then concatenated in order, so that they look as if
+        MOPAC had run all the parts one after another.
+
+        Parameters
+        ----------
+        executor : seamm_exec.Executor
+            The executor for MOPAC.
+        groups : [str]
+            The input file for each part.
+        n_jobs : int
+            The number of parts to run at once.
+        return_files : [str]
+            The files to return and concatenate.
+        kwargs : dict
+            The other arguments for executor.run().
+
+        Returns
+        -------
+        dict or None
+            The output file, or None if any part failed.
+        """
+        directory = Path(self.directory)
+
+        def run_job(n, text):
+            job_directory = directory / f"job_{n + 1}"
+            job_directory.mkdir(parents=True, exist_ok=True)
+            files = {"mopac.dat": text}
+            (job_directory / "mopac.dat").write_text(text)
+            return executor.run(
+                directory=str(job_directory),
+                files=files,
+                return_files=return_files,
+                in_situ=True,
+                shell=True,
+                **kwargs,
+            )
+
+        # The density of an earlier step is used by the first part, and the
+        # density at the end comes from the last part.
+        density = directory / "mopac.den"
+        if density.exists():
+            (directory / "job_1").mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(density, directory / "job_1" / "mopac.den")
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(run_job, range(len(groups)), groups))
+
+        if not all(results):
+            return None
+
+        last = directory / f"job_{len(groups)}" / "mopac.den"
+        if last.exists():
+            shutil.copyfile(last, density)
+
+        # Put the outputs back together in the original order
+        for filename in return_files:
+            if filename == "mopac.den":
+                continue
+            with open(directory / filename, "wb") as fd:
+                for n in range(len(groups)):
+                    path = directory / f"job_{n + 1}" / filename
+                    if path.exists():
+                        with open(path, "rb") as part:
+                            shutil.copyfileobj(part, fd)
+
+        return {
+            "mopac.out": {"data": (directory / "mopac.out").read_text()},
+            "jobs": results,
+        }
+
+    def _finish_timing(self, timer):
+        """Write the times of the phases, and of MOPAC if it was run."""
+        timer.write(Path(self.directory) / "timings.jsonl")
+        if self._t_mopac is not None:
+            self._write_timing(phases=timer.totals())
+            self._t_mopac = None
+
+    def _max_jobs(self):
+        """The most MOPAC processes to run at once, from the options."""
+        value = self.options.get("max_jobs", "default")
+        if value != "default":
+            return int(value)
+        n = seamm_exec.computational_environment()["NTASKS"]
+        if self.global_options.get("ncores", "available") != "available":
+            n = min(n, int(self.global_options["ncores"]))
+        return n
+
+    def _write_timing(self, phases=None):
+        """Record the timing of this run in the timing store.
+
+        The hardware is only described here, the first time it is needed, so
+        that steps which never run MOPAC do not pay for probing the CPU.
+        """
+        phases = {} if phases is None else phases
+        try:
+            host = hardware.fingerprint()
+            self._timing_data[0:5] = [host[key] for key in hardware.FIELDS]
+
+            self._timing_store.add(self._timing_data, phases=phases)
+        except Exception as e:
+            self.logger.debug(f"Could not record the timing: {e}")
+
+    def _result_cache(self):
+        """The cache of MOPAC results, or None if it is turned off.
+
+        Returns
+        -------
+        mopac_step.ResultCache or None
+        """
+        size = self.options.get("result_cache_size", "0")
+        if mopac_step.parse_size(size) <= 0:
+            return None
+        path = self.options.get("result_cache_dir", "default")
+        if path == "default":
+            root = Path(self.global_options["root"]).expanduser()
+            path = root / "cache" / "mopac"
+        return mopac_step.ResultCache(path, max_size=size)
+
+    def _can_run_in_process(self, calculations):
+        """Whether the calculations can and should be run with mopactools.
+
+        Parameters
+        ----------
+        calculations : [([str], str)]
+            The keywords and structure for each calculation.
+
+        Returns
+        -------
+        bool
+        """
+        if self.options.get("backend", "executable") != "mopactools":
+            return False
+        if not mopactools_backend.available():
+            self.logger.warning(
+                "mopactools is not installed, so running the MOPAC executable."
+            )
+            return False
+        for keywords, structure in calculations:
+            if structure is not None:
+                self.logger.info(
+                    "Running the MOPAC executable since the calculation has its "
+                    "own structure."
+                )
+                return False
+            bad = mopactools_backend.unsupported(keywords)
+            if len(bad) > 0:
+                self.logger.info(
+                    "Running the MOPAC executable since mopactools cannot handle "
+                    f"{', '.join(bad)}"
+                )
+                return False
+        return True
+
+    def _run_in_process(self, calculations, configuration):
+        """Run the calculations in-process with mopactools.
+
+        Parameters
+        ----------
+        calculations : [([str], str)]
+            The keywords and structure for each calculation.
+        configuration : molsystem.Configuration
+            The configuration to calculate.
+
+        Returns
+        -------
+        [(dict, str)]
+            The data, keyed as in the AUX file, and a note for the output for
+            each calculation.
+        """
+        results = []
+        xyz = None
+        lattice = None
+        for keywords, _ in calculations:
+            if "OLDGEO" not in keywords:
+                xyz = None
+                lattice = None
+            data, _ = mopactools_backend.calculate(
+                configuration,
+                keywords,
+                xyz=xyz,
+                lattice=lattice,
+                lattice_opt=getattr(self, "_lattice_opt", False),
+            )
+            # Follow-up calculations start from the final structure
+            if "ATOM_X_OPT" in data:
+                xyz = data["ATOM_X_OPT"].reshape(-1, 3)
+            if "TRANS_VECTS" in data:
+                lattice = data["TRANS_VECTS"].reshape(3, 3)
+            results.append((data, mopactools_backend.output_text(keywords)))
+        return results
+
+    def _read_results(self, wanted):
+        """Open the AUX and output files from MOPAC for analysis.
+
+        Parameters
+        ----------
+        wanted : set(str)
+            The properties to parse from the AUX file, which may be changed
+            between reading sections.
+
+        Returns
+        -------
+        generator, mopac_step.OutIndex
+            The sections of the AUX file and the output file.
+        """
+        # The aux file is parsed lazily, one section per sub-task, as the
+        # subnodes need them. Numerical arrays are returned as NumPy arrays.
+        # Only the properties that each subnode uses are parsed, so the set of
+        # wanted properties is updated for each subnode before reading its
+        # sections. The parsed sections are kept in a sidecar file, so that
+        # rerunning the flowchart on a finished job need not parse them again.
+        aux_sections = self.read_aux(
+            os.path.join(self.directory, "mopac.aux"),
+            as_arrays=True,
+            wanted=wanted,
+            cache=True,
+        )
+
+        # Split the output file into sections for each step
+        with instrumentation.phase("sectioning"):
+            out = self.read_output_sections(os.path.join(self.directory, "mopac.out"))
+        return aux_sections, out
+
+    def read_output_sections(self, path):
+        """Split the MOPAC output file into the sections for each calculation.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The output file, normally mopac.out.
+
+        Returns
+        -------
+        mopac_step.OutIndex
+            The sections, as lazy views of the lines in the file. Close it when
+            finished with the sections.
+        """
+        return mopac_step.OutIndex(path)
+
+    def _cite_mopac(self, data):
+        """Add the main citation for MOPAC, if the version is in the data.
+
+        Parameters
+        ----------
+        data : dict
+            The data from a section of the AUX file.
+
+        Returns
+        -------
+        bool
+            Whether the citation was added.
+        """
+        if "MOPAC_VERSION" in data:
+            # like MOPAC2016.20.191M
+            release, version = data["MOPAC_VERSION"].split(".", maxsplit=1)
+            try:
+                t = datetime.strptime(version[0:-1], "%y.%j")
+                year = t.year
+                month = t.month
+                template = string.Template(self._bibliography["Stewart_2016"])
+                month = calendar.month_abbr[int(month)].lower()
+                citation = template.substitute(
+                    month=month, version=version, year=year, release=release
+                )
+                self.references.cite(
+                    raw=citation,
+                    alias="mopac",
+                    module="mopac_step",
+                    level=1,
+                    note="The principle MOPAC citation.",
+                )
+            except Exception:
+                self.references.cite(
+                    raw=self._bibliography["stewart_james_j_p_2022_6811510"],
+                    alias="mopac",
+                    module="mopac_step",
+                    level=1,
+                    note="The principle MOPAC citation.",
+                )
+            return True
+        return False
@@ -2,9 +2,14 @@
 
 """Setup and run MOPAC"""
 
+import collections
+import contextlib
+import functools
 import logging
 import re
 
+import numpy as np
+
 import seamm
 import seamm_util.printing as printing
 import mopac_step
@@ -13,6 +18,56 @@ logger = logging.getLogger(__name__)
 job = printing.getPrinter()
 printer = printing.getPrinter("mopac")
 
+# Fortran writes double precision exponents with a D
+_D_TO_E = str.maketrans("Dd", "Ee")
+
+# How to handle a key in the AUX file, from parsing e.g. "ATOM_X:ANGSTROMS[0009]"
+#     name: the name of the property, e.g. ATOM_X
+#     units: the units in the key, or None
+#     size: the number of values for an array, or None for a single value
+#     kind: the type of the values, "float", "integer" or "string"
+#     scalar: whether the property is a scalar, even if written as an array
+#     accumulate: whether the values are appended to a list, one per cycle
+#     metadata_units: the units of the property in the metadata, or None
+#     known: whether the property is in the metadata
+_AuxKey = collections.namedtuple(
+    "_AuxKey", "name units size kind scalar accumulate metadata_units known"
+)
+
+# The names of unknown properties that have been warned about
+_unknown_properties = set()
+
+# A line of the structure: the element, then each coordinate and its flag
+_STRUCTURE_LINE = "%-2s % 12.8f %d % 12.8f %d % 12.8f %d\n"
+
+
+def _format_structure(elements, xyz, flags):
+    """The lines of the structure for the input file.
+
+    The values are interleaved and formatted with one format string for the
+    whole structure, which is much faster than formatting each line.
+
+    Parameters
+    ----------
+    elements : [str]
+        The element of each atom, or "Tv" for a translation vector.
+    xyz : numpy.ndarray
+        The coordinates, n x 3.
+    flags : numpy.ndarray
+        The optimization flag for each coordinate, 1 to optimize or 0, n x 3.
+
+    Returns
+    -------
+    str
+    """
+    n = len(elements)
+    values = [None] * (7 * n)
+    values[0::7] = elements
+    for i in range(3):
+        values[2 * i + 1 :: 7] = xyz[:, i].tolist()
+        values[2 * i + 2 :: 7] = flags[:, i].tolist()
+    return (_STRUCTURE_LINE * n) % tuple(values)
+
 
 class MOPACBase(seamm.Node):
     def __init__(
@@ -27,6 +82,8 @@ class MOPACBase(seamm.Node):
 
         logger.debug("Creating MOPACBase {}".format(self))
 
+        self._structure_cache = None  # The structures, while building the input
+
         super().__init__(
             flowchart=flowchart, title=title, extension=extension, logger=logger
         )
@@ -92,37 +149,175 @@ class MOPACBase(seamm.Node):
             help="Maximum number of atoms to print charges, etc.",
         )
 
+        parser.add_argument(
+            parser_name,
+            "--parallel-jobs",
+            default="default",
+            help=(
+                "How many independent parts of a calculation, e.g. the strained "
+                "cells for force constants, to run at once. By default as many "
+                "as the cores allow."
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--backend",
+            default="executable",
+            choices=["executable", "mopactools"],
+            help=(
+                "Run the MOPAC executable, or run in-process using mopactools "
+                "when possible"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--batch",
+            default="current configuration",
+            choices=["current configuration", "all configurations"],
+            help=(
+                "Run only the current configuration, or all the configurations of "
+                "the system together in one MOPAC job"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--result-cache-size",
+            default="0",
+            help=(
+                "The maximum size of the cache of MOPAC results, which are reused "
+                "for identical calculations, e.g. '500 MB'. 0, the default, turns "
+                "the cache off."
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--result-cache-dir",
+            default="default",
+            help="The directory for the cache of MOPAC results, by default in ~/SEAMM",
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--reuse-density",
+            default="yes",
+            choices=["yes", "no"],
+            help=(
+                "Start the SCF from the density of the previous calculation on the "
+                "same structure"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--resume",
+            default="yes",
+            choices=["yes", "no"],
+            help="Resume MOPAC runs that were interrupted, e.g. by a time limit",
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--restart-interval",
+            default="600",
+            help=(
+                "How often, in seconds, MOPAC writes the files to restart long "
+                "calculations from"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--mopac-files",
+            default="keep",
+            choices=["keep", "compress", "minimal"],
+            help=(
+                "What to do with mopac.out and mopac.aux after a successful run: "
+                "keep them, compress them, or compress mopac.out and remove "
+                "mopac.aux once all of it is parsed into mopac.aux.npz"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--max-jobs",
+            default="default",
+            help=(
+                "The most MOPAC steps submitted to run in the background at once, "
+                "by default the number of cores available"
+            ),
+        )
+
+        parser.add_argument(
+            parser_name,
+            "--profile",
+            default="none",
+            choices=["none", "cProfile", "pyinstrument"],
+            help="Profile each MOPAC step, writing the profile to its directory",
+        )
+
         return result
 
+    @contextlib.contextmanager
+    def structure_cache(self):
+        """Reuse the structure for the input while it cannot change.
+
+        While building the input each substep asks for the structure, which
+        for large systems is slow to write. Within this context the structure
+        is kept for each configuration, version and cell, and reused. The
+        coordinates can be changed without changing the version, so the
+        context must not include anything that moves atoms, e.g. analysis.
+        """
+        previous = self._structure_cache
+        self._structure_cache = {}
+        try:
+            yield
+        finally:
+            self._structure_cache = previous
+
     def mopac_structure(self):
-        """Create the input for the structure."""
+        """Create the input for the structure.
+
+        Returns
+        -------
+        str, str
+            The lines for the atoms and any translation vectors, and the
+            symmetry lines coupling the translation vectors.
+        """
         _, configuration = self.get_system_configuration(None)
 
-        structure = ""
+        cache = self._structure_cache
+        if cache is not None:
+            key = (
+                configuration.id,
+                configuration.version,
+                configuration.periodicity,
+                self._lattice_opt,
+                getattr(self, "_lattice_shear", None),
+                getattr(self, "_lattice_couple", None),
+            )
+            if configuration.periodicity == 3:
+                key += tuple(configuration.cell.parameters)
+            if key in cache:
+                return cache[key]
+
         atoms = configuration.atoms
-        elements = atoms.symbols
-        coordinates = atoms.get_coordinates(fractionals=False, in_cell=True)
+        elements = list(atoms.symbols)
+        xyz = np.array(
+            atoms.get_coordinates(fractionals=False, in_cell=True), dtype=float
+        ).reshape(-1, 3)
+        flags = np.ones(xyz.shape, dtype=int)
         if "freeze" in atoms:
-            freeze = atoms["freeze"]
-        else:
-            freeze = [""] * len(elements)
-        for element, xyz, frz in zip(elements, coordinates, freeze):
-            x, y, z = xyz
-            line = "{:2} {: 12.8f} {:d} {: 12.8f} {:d} {: 12.8f} {:d}\n".format(
-                element,
-                x,
-                0 if "x" in frz else 1,
-                y,
-                0 if "y" in frz else 1,
-                z,
-                0 if "z" in frz else 1,
-            )
-            structure += line
+            freeze = np.array([f or "" for f in atoms["freeze"]], dtype=str)
+            for i, axis in enumerate("xyz"):
+                flags[:, i] = np.char.find(freeze, axis) < 0
 
         symlines = ""
         if configuration.periodicity == 3:
             # The three translation vectors
-            element = "Tv"
             uvw = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
             XYZ = configuration.cell.to_cartesians(uvw)
             n = configuration.n_atoms
@@ -150,13 +345,14 @@ class MOPACBase(seamm.Node):
                     symlines += f"    {tv2} 15 {tv3}\n"
             else:
                 freeze = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-            for xyz, frz in zip(XYZ, freeze):
-                x, y, z = xyz
-                fx, fy, fz = frz
-                line = f"{element:2} {x: 12.8f} {fx} {y: 12.8f} {fy} {z: 12.8f} {fz}\n"
-                structure += line
+            elements.extend(3 * ["Tv"])
+            xyz = np.concatenate((xyz, np.array(XYZ, dtype=float).reshape(3, 3)))
+            flags = np.concatenate((flags, np.array(freeze, dtype=int)))
 
-        return structure, symlines
+        result = _format_structure(elements, xyz, flags), symlines
+        if cache is not None:
+            cache[key] = result
+        return result
 
     def parse_arc(self, filename="mopac.arc"):
         """Digest the ARC file and get the coordinates.
@@ -196,79 +392,200 @@ class MOPACBase(seamm.Node):
                                 xyz.append([float(x), float(y), float(z)])
         return xyz, cell_vectors
 
-    def parse_aux(self, lines):
-        """Digest a section of the aux file"""
+    def read_aux(self, path, as_arrays=False, wanted=None, cache=False):
+        """Parse an AUX file one section at a time.
 
-        properties = mopac_step.metadata["results"]
-        trans = str.maketrans("Dd", "Ee")
+        MOPAC writes one section, delimited by "START OF MOPAC FILE" and
+        "END OF MOPAC FILE", for each calculation in the input. The file is
+        memory-mapped and indexed, and each section is parsed as it is
+        needed, decoding only the wanted properties. See AuxIndex.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The AUX file.
+        as_arrays : bool = False
+            Return numerical arrays as NumPy arrays rather than lists. See
+            parse_aux().
+        wanted : set(str) = None
+            The properties to parse, or None for all. See parse_aux(). The set
+            is consulted as each section is read, so it may be changed between
+            sections to suit the step that will use them.
+        cache : bool = False
+            Load the sections from the sidecar next to the AUX file when it is
+            up to date and holds the wanted properties, and rewrite the sidecar
+            if any sections have to be parsed. See AuxCache.
+
+        Yields
+        ------
+        dict
+            The parsed data for each complete section, in order. A final
+            section without an end marker, e.g. from a job that was killed, is
+            ignored.
+        """
+        if not cache:
+            yield from self._read_aux(path, as_arrays=as_arrays, wanted=wanted)
+            return
+
+        with mopac_step.AuxCache(path, as_arrays=as_arrays) as sidecar:
+            sidecar.open()
+            # The wanted properties for the sections taken from the sidecar
+            used = []
+            sections = None
+            n_parsed = 0
+            try:
+                while True:
+                    current = None if wanted is None else set(wanted)
+                    n = len(used)
+                    if sections is None and sidecar.covers(n, current):
+                        data = sidecar.get(n, current)
+                        used.append(current)
+                    elif sections is None and sidecar.complete and n == len(sidecar):
+                        break
+                    else:
+                        if sections is None:
+                            # Parse the rest of the file, and rewrite the sidecar
+                            sections = self._read_aux(
+                                path, as_arrays=as_arrays, wanted=wanted, skip=len(used)
+                            )
+                            sidecar.begin()
+                            for i, tmp in enumerate(used):
+                                sidecar.append(sidecar.get(i, tmp), tmp)
+                        data = next(sections, None)
+                        if data is None:
+                            break
+                        sidecar.append(data, current)
+                        n_parsed += 1
+                    yield data
+            except GeneratorExit:
+                # Closed early, but keep what has been parsed. The caller often
+                # takes exactly the sections in the file, in which case the
+                # sidecar is complete.
+                if n_parsed > 0:
+                    complete = False
+                    try:
+                        data = next(sections, None)
+                        if data is None:
+                            complete = True
+                        else:
+                            sidecar.append(data, current)
+                    except Exception as e:
+                        self.logger.debug(f"Could not parse {path}: {e}")
+                    sidecar.commit(complete=complete)
+                raise
+            finally:
+                if sections is not None:
+                    sections.close()
+            if n_parsed > 0:
+                sidecar.commit(complete=True)
+
+    def _read_aux(self, path, as_arrays=False, wanted=None, skip=0):
+        """Parse the sections of an AUX file. See read_aux().
+
+        Parameters
+        ----------
+        skip : int = 0
+            The number of sections to pass over without parsing them.
+        """
+        with mopac_step.AuxIndex(path) as index:
+            for section in range(skip, len(index)):
+                yield self.parse_aux(
+                    index.lines(section, wanted=wanted),
+                    as_arrays=as_arrays,
+                    wanted=wanted,
+                )
+
+    def parse_aux(self, lines, as_arrays=False, wanted=None):
+        """Digest a section of the aux file
+
+        Parameters
+        ----------
+        lines : iterable of str
+            The lines of the section. This may be a list, or an iterator such
+            as an open file, in which case the lines are consumed as they are
+            parsed.
+        as_arrays : bool = False
+            If True, arrays of properties whose type in metadata["results"] is
+            float or integer are decoded directly into float64 or int64 NumPy
+            arrays rather than lists of Python numbers. Scalars are still
+            returned as Python numbers.
+        wanted : set(str) = None
+            The names of the properties to parse, or None for all. The lines of
+            any other property are skipped without being split or converted.
+
+        Returns
+        -------
+        dict
+            The values in the section, keyed by the AUX names.
+        """
 
         data = {}
-        lineno = -1
-        nlines = len(lines)
+        lines = iter(lines)
+        # One line of lookahead, needed for the MO occupancy workaround
+        pushed_back = None
 
         spin_polarized = False
 
         while True:
-            lineno += 1
-            if lineno >= nlines:
-                break
-            line = lines[lineno].strip()
+            if pushed_back is not None:
+                line, pushed_back = pushed_back, None
+            else:
+                line = next(lines, None)
+                if line is None:
+                    break
+            line = line.strip()
+            if line == "":
+                continue
             if "END OF MOPAC PROGRAM" in line:
                 continue
             if "END OF MOPAC FILE" in line:
                 continue
+            if "START OF MOPAC FILE" in line:
+                continue
             if line[0] == "#":
                 continue
             if "=" not in line:
                 raise RuntimeError("Problem parsing MOPAC aux file: '" + line + "'")
             key, rest = line.split("=", maxsplit=1)
-            if key[-1] == "]":
-                name, size = key[0:-1].split("[")
-                size = int(size.lstrip("0"))
-                if ":" in name:
-                    name, units = name.split(":")
-
-                if name not in properties:
-                    logger.warning("Property '{}' not recognized.".format(name))
-                    kind = "string"
-                else:
-                    kind = properties[name]["type"]
-                    if "units" in properties[name]:
-                        data[name + ",units"] = properties[name]["units"]
-
+            name, units, size, kind, scalar, accumulate, metadata_units, known = (
+                _aux_key(key)
+            )
+            if not known and (wanted is None or name in wanted):
+                _warn_unknown(name)
+            if size is not None:
                 if name == "NUM_ALPHA_ELECTRONS":
                     spin_polarized = True
 
+                if wanted is not None and name not in wanted:
+                    # Skip the values, which run up to the next key
+                    while True:
+                        if pushed_back is not None:
+                            line, pushed_back = pushed_back, None
+                        else:
+                            line = next(lines, None)
+                            if line is None:
+                                break
+                        if "=" in line or "OF MOPAC" in line:
+                            pushed_back = line
+                            break
+                    continue
+
+                if metadata_units is not None:
+                    data[name + ",units"] = metadata_units
+
                 # Bug workaround
                 # Sometimes MOPAC does not write out the MO occupancies
                 if name == "MOLECULAR_ORBITAL_OCCUPANCIES":
-                    tmp_line = lines[lineno + 1].strip()
-                    if tmp_line[0].isalpha():
-                        continue
+                    pushed_back = next(lines, None)
+                    if pushed_back is not None:
+                        tmp_line = pushed_back.strip()
+                        if tmp_line != "" and tmp_line[0].isalpha():
+                            continue
                 # end of workaround
 
                 # Check for floating point numbers run together
                 if kind == "float":
-                    values = []
-                    for value in rest.split():
-                        tmp = value.split(".")
-                        if len(tmp) <= 2:
-                            values.append(value)
-                        else:
-                            # Run together ... lets see how many decimals
-                            n_decimals = len(tmp[-1])
-                            # and before the decimal
-                            n_digits = len(tmp[-2]) - n_decimals
-                            n = n_digits + 1 + n_decimals
-                            n_values = len(tmp) - 1
-                            # blanks at front have been stripped, so count back
-                            start = 0
-                            end = len(value) - (n_values - 1) * n
-                            while start < len(value):
-                                values.append(value[start:end])
-                                start = end
-                                end += n
-                    tmp = values
+                    tmp = _split_run_together(rest.split())
                 else:
                     tmp = rest.split()
 
@@ -277,57 +594,95 @@ class MOPACBase(seamm.Node):
                 if name == "MICROSTATE_CONFIGURATIONS" and spin_polarized:
                     size = size * 2
 
-                while len(tmp) < size:
-                    lineno += 1
-                    line = lines[lineno].strip()
-                    if line[0] != "#":
-                        tmp.extend(line.split())
+                fixed = None
+                if kind == "float":
+                    # Gather the following lines, counting the values by their
+                    # decimal points, and decode them all at once if they are
+                    # in fixed columns.
+                    block = []
+                    count = len(tmp)
+                    while count < size:
+                        if pushed_back is not None:
+                            line, pushed_back = pushed_back, None
+                        else:
+                            line = next(lines, None)
+                            if line is None:
+                                # Truncated section, e.g. a job that was killed
+                                break
+                        if "=" in line or "OF MOPAC" in line:
+                            pushed_back = line
+                            break
+                        stripped = line.strip()
+                        if stripped != "" and stripped[0] != "#":
+                            line = line.rstrip("\r\n")
+                            block.append(line)
+                            count += line.count(".")
+                    if len(block) > 0:
+                        fixed = _fixed_width_floats(block)
+                        if fixed is None:
+                            # Irregular lines, so split them into tokens
+                            tmp.extend(_split_run_together(" ".join(block).split()))
+                else:
+                    while len(tmp) < size:
+                        if pushed_back is not None:
+                            line, pushed_back = pushed_back, None
+                        else:
+                            line = next(lines, None)
+                            if line is None:
+                                # Truncated section, e.g. a job that was killed
+                                break
+                        line = line.strip()
+                        if line != "" and line[0] != "#":
+                            tmp.extend(line.split())
 
                 if kind == "integer":
-                    values = []
-                    for value in tmp:
-                        values.append(int(value))
+                    if as_arrays:
+                        values = np.array(tmp, dtype=np.int64)
+                    else:
+                        values = []
+                        for value in tmp:
+                            values.append(int(value))
                 elif kind == "float":
-                    values = []
-                    for value in tmp:
-                        values.append(float(value.translate(trans)))
+                    values = np.array(
+                        " ".join(tmp).translate(_D_TO_E).split(), dtype=np.float64
+                    )
+                    if fixed is not None:
+                        values = np.concatenate((values, fixed))
+                    if not as_arrays:
+                        values = values.tolist()
                 else:
                     values = tmp
 
-                if "UPDATED" in name:
+                if accumulate:
                     if name not in data:
                         data[name] = []
                     data[name].append(values)
                 else:
-                    if (
-                        name in properties
-                        and properties[name]["dimensionality"] == "scalar"
-                    ):
+                    if scalar:
                         if not (units == "ARBITRARY_UNITS" and name in data):
-                            data[name] = values[0]
+                            if isinstance(values, np.ndarray):
+                                data[name] = values[0].item()
+                            else:
+                                data[name] = values[0]
                     else:
                         data[name] = values
             else:
-                if ":" in key:
-                    name, units = key.split(":")
-                else:
-                    name = key
+                if wanted is not None and name not in wanted:
+                    continue
 
-                if name not in properties:
-                    logger.warning("Property '{}' not recognized.".format(name))
-                    kind = "string"
-                else:
-                    kind = properties[name]["type"]
-                if "units" in properties[name]:
-                    data[name + ",units"] = properties[name]["units"]
+                if metadata_units is not None:
+                    data[name + ",units"] = metadata_units
                 if kind == "integer":
                     value = int(rest)
                 elif kind == "float":
-                    value = float(self._sanitize_value(rest.strip()))
+                    try:
+                        value = float(rest.translate(_D_TO_E))
+                    except ValueError:
+                        value = float(self._sanitize_value(rest.strip()))
                 else:
                     value = rest.strip('"')
 
-                if "UPDATED" in name:
+                if accumulate:
                     if name not in data:
                         data[name] = []
                     data[name].append(value)
@@ -341,3 +696,150 @@ class MOPACBase(seamm.Node):
         subs = r"\1E\3"
         ret = float(re.sub(regex, subs, value))
         return ret
+
+
+@functools.lru_cache(maxsize=None)
+def _dispatch_table():
+    """How to parse each property in metadata["results"], built once.
+
+    Returns
+    -------
+    {str: (str, bool, str)}
+        The kind of the values, whether the property is a scalar, and its
+        units in the metadata or None, for each property.
+    """
+    table = {}
+    for name, properties in mopac_step.metadata["results"].items():
+        table[name] = (
+            properties["type"],
+            properties["dimensionality"] == "scalar",
+            properties.get("units"),
+        )
+    return table
+
+
+@functools.lru_cache(maxsize=4096)
+def _aux_key(key):
+    """Parse a key in the AUX file, remembering the result.
+
+    The same keys appear in every section of every AUX file, so they are only
+    parsed and looked up in the metadata once.
+
+    Parameters
+    ----------
+    key : str
+        The key, i.e. the part of the line before the "=".
+
+    Returns
+    -------
+    _AuxKey
+    """
+    units = None
+    size = None
+    if key[-1] == "]":
+        name, size = key[0:-1].split("[")
+        size = int(size)
+    else:
+        name = key
+    if ":" in name:
+        name, units = name.split(":")
+
+    table = _dispatch_table()
+    known = name in table
+    if known:
+        kind, scalar, metadata_units = table[name]
+    else:
+        kind, scalar, metadata_units = "string", False, None
+    return _AuxKey(
+        name, units, size, kind, scalar, "UPDATED" in name, metadata_units, known
+    )
+
+
+def _warn_unknown(name):
+    """Warn, once, about a property that is not in the metadata."""
+    if name not in _unknown_properties:
+        _unknown_properties.add(name)
+        logger.warning("Property '{}' not recognized.".format(name))
+
+
+def _split_run_together(tokens):
+    """Split any floating point numbers that MOPAC has run together.
+
+    When a number fills its field there is no blank before it, giving tokens
+    such as "-210.123-310.123". The width of the numbers is worked out from
+    the digits after the last decimal point.
+
+    Parameters
+    ----------
+    tokens : [str]
+        The whitespace-separated tokens.
+
+    Returns
+    -------
+    [str]
+        The tokens, with run together numbers split.
+    """
+    values = []
+    for value in tokens:
+        tmp = value.split(".")
+        if len(tmp) <= 2:
+            values.append(value)
+        else:
+            # Run together ... lets see how many decimals
+            n_decimals = len(tmp[-1])
+            # and before the decimal
+            n_digits = len(tmp[-2]) - n_decimals
+            n = n_digits + 1 + n_decimals
+            n_values = len(tmp) - 1
+            # blanks at front have been stripped, so count back
+            start = 0
+            end = len(value) - (n_values - 1) * n
+            while start < len(value):
+                values.append(value[start:end])
+                start = end
+                end += n
+    return values
+
+
+def _fixed_width_floats(lines):
+    """Decode a block of floating point numbers written in fixed columns.
+
+    MOPAC writes arrays with a Fortran format such as 10F10.4, so every field
+    has the same width and the decimal point in the same column. The width is
+    found from the first line, and the whole block is then decoded at once,
+    which also handles numbers run together.
+
+    Parameters
+    ----------
+    lines : [str]
+        The lines of the block, with their leading blanks.
+
+    Returns
+    -------
+    numpy.ndarray or None
+        The values, or None if the lines are not in fixed columns, in which
+        case they need to be split into tokens.
+    """
+    first = lines[0]
+    dot = first.find(".")
+    next_dot = first.find(".", dot + 1)
+    if dot < 0 or next_dot < 0:
+        return None
+    width = next_dot - dot
+    # The characters from the decimal point to the end of the field
+    tail = len(first) - first.rfind(".")
+    start = dot + tail - width
+    if tail > width or start < 0:
+        return None
+
+    text = "".join([line[start:] for line in lines]).translate(_D_TO_E)
+    if len(text) % width != 0 or not text.isascii():
+        return None
+    buffer = text.encode("ascii")
+    columns = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, width)
+    if not (columns[:, width - tail] == ord(".")).all():
+        return None
+    try:
+        return np.frombuffer(buffer, dtype=f"S{width}").astype(np.float64)
+    except ValueError:
+        return None
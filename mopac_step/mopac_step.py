@@ -3,13 +3,10 @@
 
 """Main module."""
 
-import configparser
 import importlib.resources
-import os
-import shutil
-from pathlib import Path
 
 import mopac_step
+from mopac_step import executor_config
 
 
 class MOPACStep(object):
@@ -176,45 +173,8 @@ class MOPACStep(object):
                 version    : str  -- this plug-in's version (container tag)
                 mdi_script : str  -- absolute path to data/mopac_mdi.py
         """
-        executor_type = executor.name
-        ini_dir = Path(seamm_options["root"]).expanduser()
-        ini_path = ini_dir / "mopac.ini"
         resources = importlib.resources.files("mopac_step") / "data"
-
-        # Bootstrap a default mopac.ini if the user has none yet, mirroring
-        # the [local] conda/conda-environment defaults written by
-        # MOPAC.run(). Written with configparser primitives to avoid pulling
-        # in seamm_util.Configuration here. In practice mopac.ini almost
-        # always already exists by the time an MDI run is launched, since
-        # seamm-mopac must be installed for the engine to import mopactools.
-        if not ini_path.exists():
-            boot = configparser.ConfigParser()
-            boot.read_string((resources / "mopac.ini").read_text())
-            if "local" not in boot:
-                boot.add_section("local")
-            boot["local"]["conda"] = os.environ["CONDA_EXE"]
-            boot["local"]["conda-environment"] = "seamm-mopac"
-            with ini_path.open("w") as fd:
-                boot.write(fd)
-
-        full_config = configparser.ConfigParser()
-        full_config.read(ini_path)
-
-        # Last-ditch: fall back to an executable on $PATH.
-        if executor_type not in full_config:
-            path = shutil.which("mopac")
-            if path is None:
-                raise RuntimeError(
-                    f"No section for '{executor_type}' in the MOPAC ini file "
-                    f"({ini_path}), nor in the defaults, nor on $PATH."
-                )
-            full_config.add_section(executor_type)
-            full_config.set(executor_type, "installation", "local")
-            full_config.set(executor_type, "code", str(path))
-            with ini_path.open("w") as fd:
-                full_config.write(fd)
-
-        config = dict(full_config.items(executor_type))
+        config = executor_config.resolve(executor.name, seamm_options["root"])
         config["version"] = mopac_step.__version__
         config["mdi_script"] = str(resources / "mopac_mdi.py")
         return config
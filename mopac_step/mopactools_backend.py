@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+
+"""Run MOPAC in-process through the mopactools API.
+
+For many small molecules the time to start MOPAC and to write and read its
+files dominates. mopactools loads the MOPAC library into Python, so the
+energy, gradients and stress, and optimized structures, can be calculated
+without a separate process or any files. Only calculations whose keywords can
+be expressed through the API are run this way; anything else, e.g.
+vibrational analysis or CI, must be run by the MOPAC executable.
+
+mopactools is optional. If it is not installed, available() returns False.
+"""
+
+import logging
+
+import numpy as np
+
+try:
+    from mopactools.api import MopacSystem, MopacState, MozymeState, from_data
+except ImportError:
+    from_data = None
+
+from mopac_step.mopac_step import MOPACStep
+
+logger = logging.getLogger(__name__)
+
+# All of MOPAC's Hamiltonians. Only those in MOPACStep._MDI_CAPABLE_METHODS
+# can be run by mopactools; the others need the executable.
+HAMILTONIANS = (
+    "PM7",
+    "PM7-TS",
+    "PM6-ORG",
+    "PM6",
+    "PM6-D3",
+    "PM6-DH+",
+    "PM6-DH2",
+    "PM6-DH2X",
+    "PM6-D3H4",
+    "PM6-D3H4X",
+    "PM3",
+    "RM1",
+    "AM1",
+    "MNDO",
+    "MNDOD",
+)
+
+MULTIPLICITIES = (
+    "SINGLET",
+    "DOUBLET",
+    "TRIPLET",
+    "QUARTET",
+    "QUINTET",
+    "SEXTET",
+    "SEPTET",
+    "OCTET",
+    "NONET",
+)
+
+# Keywords with no effect in-process, or whose effect the API always has
+IGNORED = (
+    "1SCF",
+    "OLDGEO",
+    "GRADIENTS",
+    "BONDS",
+    "UHF",
+    "MOZYME",
+    "LBFGS",
+    "DENOUT",
+    "OLDENS",
+)
+
+
+def available():
+    """Whether mopactools is installed."""
+    return from_data is not None
+
+
+def version():
+    """The version of mopactools, or None if it is not installed."""
+    if not available():
+        return None
+    try:
+        from importlib.metadata import version
+
+        return version("mopactools")
+    except Exception:
+        return "unknown"
+
+
+def unsupported(keywords):
+    """The keywords that cannot be used in-process.
+
+    Parameters
+    ----------
+    keywords : [str]
+        The MOPAC keywords for a calculation.
+
+    Returns
+    -------
+    [str]
+        The keywords that the API cannot handle, empty if the calculation can
+        be run in-process.
+    """
+    result = []
+    for keyword in keywords:
+        if (
+            keyword in MOPACStep._MDI_CAPABLE_METHODS
+            or keyword in MULTIPLICITIES
+            or keyword in IGNORED
+            or keyword.startswith("AUX(")
+            or keyword.startswith("CHARGE=")
+            or keyword.startswith("RELSCF=")
+            or keyword.startswith("DUMP=")
+            or keyword == "PRECISE"
+            or (keyword.startswith("P=") and keyword.endswith("GPa"))
+        ):
+            continue
+        result.append(keyword)
+    return result
+
+
+def calculate(
+    configuration, keywords, xyz=None, lattice=None, lattice_opt=False, state=None
+):
+    """Run one calculation in-process.
+
+    Parameters
+    ----------
+    configuration : molsystem.Configuration
+        The system, which gives the elements, charge and spin.
+    keywords : [str]
+        The MOPAC keywords, as for the input file. The calculation is an
+        optimization unless 1SCF is given.
+    xyz : numpy.ndarray = None
+        The Cartesian coordinates (Å), by default those of the configuration.
+    lattice : numpy.ndarray = None
+        The cell vectors (Å) of a periodic system, by default those of the
+        configuration.
+    lattice_opt : bool = False
+        Whether to also optimize the cell of a periodic system.
+    state : mopactools.api.MopacState or MozymeState = None
+        The electronic state from an earlier calculation to restart from.
+
+    Returns
+    -------
+    dict, MopacState or MozymeState
+        The results, keyed like the AUX file, and the final electronic state.
+    """
+    if not available():
+        raise RuntimeError("mopactools is not installed.")
+    bad = unsupported(keywords)
+    if len(bad) > 0:
+        raise ValueError(f"Cannot run in-process with keywords {', '.join(bad)}")
+
+    relax = "1SCF" not in keywords
+    periodic = configuration.periodicity == 3
+    n_atoms = configuration.n_atoms
+
+    if xyz is None:
+        xyz = configuration.atoms.get_coordinates(fractionals=False, in_cell=True)
+    xyz = np.asarray(xyz, dtype=np.float64)
+
+    system = MopacSystem()
+    system.natom = n_atoms
+    system.natom_move = n_atoms if relax else 0
+    system.charge = configuration.charge
+    n_electrons = sum(configuration.atoms.atomic_numbers) - configuration.charge
+    system.spin = (configuration.spin_multiplicity - 1 - n_electrons % 2) // 2
+    system.model = next(k for k in keywords if k in MOPACStep._MDI_CAPABLE_METHODS)
+    system.atom = np.array(configuration.atoms.atomic_numbers, dtype=np.int32)
+    system.coord = xyz.ravel()
+    if periodic:
+        if lattice is None:
+            lattice = configuration.cell.vectors()
+        system.nlattice = 3
+        # MOPAC only calculates the stress if the cell vectors may move
+        system.nlattice_move = 3 if (not relax or lattice_opt) else 0
+        system.lattice = np.asarray(lattice, dtype=np.float64).ravel()
+    else:
+        system.nlattice = 0
+        system.nlattice_move = 0
+        system.lattice = np.array([], dtype=np.float64)
+    for keyword in keywords:
+        if keyword.startswith("P=") and keyword.endswith("GPa"):
+            system.pressure = float(keyword[2:-3])
+        elif keyword == "PRECISE":
+            system.tolerance = 0.01
+        elif keyword.startswith("RELSCF="):
+            system.tolerance = float(keyword[7:])
+
+    if state is None:
+        if "MOZYME" in keywords:
+            state = MozymeState()
+        else:
+            state = MopacState()
+            state.uhf = "UHF" in keywords
+
+    properties = from_data(system, state, relax=relax, vibe=False)
+    if properties.error_msg:
+        raise RuntimeError(
+            "MOPAC reported error(s): " + "; ".join(properties.error_msg)
+        )
+
+    data = {
+        "MOPAC_VERSION": f"mopactools.{version()}",
+        "HEAT_OF_FORMATION": float(properties.heat),
+        "DIPOLE": float(np.linalg.norm(properties.dipole)),
+        "ATOM_CHARGES": np.asarray(properties.charge, dtype=np.float64),
+    }
+
+    gradients = np.asarray(properties.coord_deriv, dtype=np.float64)
+    if periodic and properties.lattice_deriv is not None:
+        gradients = np.concatenate(
+            (gradients, np.asarray(properties.lattice_deriv, dtype=np.float64))
+        )
+    data["GRADIENT_NORM"] = float(np.linalg.norm(gradients))
+    if relax or "GRADIENTS" in keywords:
+        data["GRADIENTS"] = gradients
+
+    if relax:
+        data["ATOM_X_OPT"] = np.asarray(properties.coord_update, dtype=np.float64)
+    if periodic:
+        if relax and properties.lattice_update is not None:
+            data["TRANS_VECTS"] = np.asarray(properties.lattice_update)
+        if properties.stress is not None:
+            data["VOIGT_STRESS"] = np.asarray(properties.stress, dtype=np.float64)
+
+    if "BONDS" in keywords:
+        data["BOND_ORDERS"] = bond_order_matrix(
+            n_atoms,
+            properties.bond_index,
+            properties.bond_atom,
+            properties.bond_order,
+        )
+
+    return data, state
+
+
+def bond_order_matrix(n_atoms, bond_index, bond_atom, bond_order):
+    """Convert the sparse bond orders from the API to the AUX file's form.
+
+    The API gives the bond orders in compressed sparse column form with
+    Fortran (1-based) indices: the bonds of atom i are at bond_index[i] to
+    bond_index[i + 1] - 1 in bond_atom and bond_order.
+
+    Returns
+    -------
+    numpy.ndarray
+        The lower triangle of the bond order matrix, by rows, as written to
+        the AUX file.
+    """
+    result = np.zeros(n_atoms * (n_atoms + 1) // 2)
+    bond_index = np.asarray(bond_index) - 1
+    bond_atom = np.asarray(bond_atom) - 1
+    for i in range(n_atoms):
+        for k in range(bond_index[i], bond_index[i + 1]):
+            j = bond_atom[k]
+            row, column = max(i, j), min(i, j)
+            result[row * (row + 1) // 2 + column] = bond_order[k]
+    return result
+
+
+def output_text(keywords):
+    """A note for the output, standing in for MOPAC's output file."""
+    text = f" In-process calculation with mopactools {version()}\n"
+    text += " " + " ".join(keywords) + "\n"
+    if "1SCF" not in keywords:
+        # mopac_relax uses the L-BFGS optimizer
+        text += " Geometry optimization using L-BFGS\n"
+    return text
@@ -11,6 +11,7 @@ import numpy as np
 from tabulate import tabulate
 
 import mopac_step
+from mopac_step import instrumentation
 from molsystem import RMSD
 import seamm
 import seamm_util.printing as printing
@@ -31,6 +32,17 @@ class Optimization(mopac_step.Energy):
         super().__init__(flowchart=flowchart, title=title, extension=extension)
 
         self._calculation = "optimization"
+        self._aux_properties.update(
+            {
+                "ATOM_X_OPT",
+                "ATOM_X_UPDATED",
+                "GRADIENT_NORM_UPDATED",
+                "HEAT_OF_FORM_UPDATED",
+                "NUMBER_SCF_CYCLES",
+                "TRANS_VECTS",
+                "TRANS_VECTS_UPDATED",
+            }
+        )
         self._model = None
         self._metadata = mopac_step.metadata
         self.parameters = mopac_step.OptimizationParameters()
@@ -275,7 +287,8 @@ class Optimization(mopac_step.Energy):
         )
 
         if P["method"] == "default":
-            tmp = "\n".join(out_sections[0])
+            # Searches the text of the output without decoding it
+            tmp = out_sections[0]
             if (
                 "GEOMETRY OPTIMISED USING EIGENVECTOR FOLLOWING (EF)" in tmp
                 or "Geometry optimization using EF" in tmp
@@ -382,6 +395,9 @@ class Optimization(mopac_step.Energy):
                 f"The geometry optimization using {opt_method} -- converged in "
                 "{NUMBER_SCF_CYCLES} iterations."
             )
+        elif "HEAT_OF_FORM_UPDATED" not in data:
+            # Run in-process, which does not report the number of iterations
+            text = f"The geometry optimization using {opt_method} converged."
         else:
             data["NUMBER_SCF_CYCLES"] = len(data["HEAT_OF_FORM_UPDATED"])
             data["HEAT_OF_FORMATION"] = data["HEAT_OF_FORM_UPDATED"][-1]
@@ -426,13 +442,11 @@ class Optimization(mopac_step.Energy):
                         logger.warning(
                             "Expected updated lattice vectors, but did not find!"
                         )
-            xyz = []
             if "ATOM_X_OPT" in data:
-                it = iter(data["ATOM_X_OPT"])
+                xyz = data["ATOM_X_OPT"]
             else:
-                it = iter(data["ATOM_X_UPDATED"][-1])
-            for x in it:
-                xyz.append([float(x), float(next(it)), float(next(it))])
+                xyz = data["ATOM_X_UPDATED"][-1]
+            xyz = np.asarray(xyz, dtype=float).reshape(-1, 3).tolist()
 
             if configuration.symmetry.n_symops > 1:
                 # Convert to coordinates of just the asymmetric atoms.
@@ -456,7 +470,8 @@ class Optimization(mopac_step.Energy):
                     RDKMol = configuration.to_RDKMol()
 
             if periodicity == 0:
-                result = RMSD(RDKMol, initial_RDKMol, symmetry=True, include_h=True)
+                with instrumentation.phase("rmsd"):
+                    result = RMSD(RDKMol, initial_RDKMol, symmetry=True, include_h=True)
                 data["RMSD with H"] = result["RMSD"]
                 data["displaced atom with H"] = result["displaced atom"]
                 data["maximum displacement with H"] = result["maximum displacement"]
@@ -465,7 +480,8 @@ class Optimization(mopac_step.Energy):
                 if P["structure handling"] != "Discard the structure":
                     configuration.coordinates_from_RDKMol(RDKMol)
 
-                result = RMSD(RDKMol, initial_RDKMol, symmetry=True)
+                with instrumentation.phase("rmsd"):
+                    result = RMSD(RDKMol, initial_RDKMol, symmetry=True)
                 data["RMSD"] = result["RMSD"]
                 data["displaced atom"] = result["displaced atom"]
                 data["maximum displacement"] = result["maximum displacement"]
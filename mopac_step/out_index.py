@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+"""A memory-mapped index of the sections of the MOPAC output file.
+
+When MOPAC runs several calculations in one job, e.g. the strained cells for
+force constants, the output file contains the output of each in turn, each
+starting with the banner citing MOPAC. Rather than reading the whole file
+into a list of lines and copying the lines of each section, the file is
+memory-mapped and the boundaries of the sections found once. Each section is
+a lazy view of the file, which is only decoded when its lines are needed,
+and the lines with a given marker can be found without decoding the section.
+"""
+
+import logging
+import mmap
+import os
+
+import numpy as np
+
+from mopac_step import retention
+
+logger = logging.getLogger(__name__)
+
+# The lines in the banner at the start of the output of each calculation.
+MARKERS = (b"** Cite this program as:", b"Digital Object Ident")
+
+# The size of the chunks when counting or decoding lines
+CHUNK = 16 * 1024 * 1024
+
+
+class OutIndex(object):
+    """The sections of a MOPAC output file.
+
+    The index behaves like a read-only list of OutSection views.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The output file, normally mopac.out.
+    encoding : str = "utf-8"
+        The encoding of the file.
+    """
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        self.sections = []
+        self._fd = None
+        self._mm = None
+        self.open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getitem__(self, index):
+        return self.sections[index]
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def close(self):
+        """Unmap and close the file. The sections can no longer be used."""
+        self.sections = []
+        if isinstance(self._mm, mmap.mmap):
+            try:
+                self._mm.close()
+            except BufferError:
+                # A view is still being read, e.g. by a generator. The map is
+                # closed when it is garbage collected.
+                pass
+        self._mm = None
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+
+    def open(self):
+        """Map the file and find the sections."""
+        self.close()
+        self._fd = retention.open_mappable(self.path)
+        size = os.fstat(self._fd.fileno()).st_size
+        if size == 0:
+            self._mm = b""
+            self.sections = [OutSection(self._mm, 0, 0, self.encoding)]
+            return
+        self._mm = mmap.mmap(self._fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # The line number and offset of each line with a marker
+        anchors = []
+        line = 0
+        offset = 0
+        for start in self._marker_lines():
+            line += _count_lines(self._mm, offset, start)
+            offset = start
+            anchors.append((line, start))
+        n_lines = line + _count_lines(self._mm, offset, size)
+        if self._mm[size - 1 : size] != b"\n":
+            n_lines += 1
+        anchors.append((n_lines, size))
+
+        # Split the file just as the line-based version did, including that a
+        # marker at line 5 is skipped without counting it, which shifts the
+        # later sections up by a line.
+        bounds = []
+        start = 0
+        shift = 0
+        for line, _ in anchors[:-1]:
+            lineno = line - shift
+            if lineno == 5:
+                shift += 1
+                continue
+            bounds.append(slice(start, lineno - 5))
+            start = lineno - 6
+        bounds.append(slice(start, None))
+
+        for bound in bounds:
+            first, last, _ = bound.indices(n_lines)
+            first = self._line_offset(first, anchors)
+            last = max(first, self._line_offset(last, anchors))
+            self.sections.append(OutSection(self._mm, first, last, self.encoding))
+
+    def _marker_lines(self):
+        """The offsets of the starts of the lines with a marker, in order.
+
+        Yields
+        ------
+        int
+        """
+        mm = self._mm
+        positions = []
+        for marker in MARKERS:
+            pos = mm.find(marker)
+            while pos >= 0:
+                positions.append(pos)
+                pos = mm.find(marker, pos + 1)
+        last = -1
+        for pos in sorted(positions):
+            start = mm.rfind(b"\n", 0, pos) + 1
+            if start != last:
+                yield start
+                last = start
+
+    def _line_offset(self, line, anchors):
+        """The offset of the start of a line, found from the nearest anchor.
+
+        Parameters
+        ----------
+        line : int
+            The line number, counting from 0.
+        anchors : [(int, int)]
+            The line number and offset of known lines, in order, ending with
+            the number of lines and size of the file.
+
+        Returns
+        -------
+        int
+        """
+        for anchor_line, offset in anchors:
+            if anchor_line >= line:
+                break
+        if anchor_line == line:
+            return offset
+        if anchor_line == anchors[-1][0] and offset > 0:
+            # From the end of the file, which may not end with a newline
+            if self._mm[offset - 1 : offset] == b"\n":
+                offset -= 1
+            anchor_line -= 1
+            offset = self._mm.rfind(b"\n", 0, offset) + 1
+        while anchor_line > line and offset > 0:
+            offset = self._mm.rfind(b"\n", 0, offset - 1) + 1
+            anchor_line -= 1
+        return offset
+
+
+class OutSection(object):
+    """A lazy view of a range of lines in the output file.
+
+    Iterating over the section gives its lines, without the line endings,
+    as the lines of the file would. The lines are decoded from the mapped file
+    as they are needed. Slicing gives another view, and `in` looks for text
+    anywhere in the section, without decoding it.
+
+    Parameters
+    ----------
+    mm : mmap.mmap or bytes
+        The file.
+    start, end : int
+        The offsets of the start of the first line and the end of the last.
+    encoding : str = "utf-8"
+        The encoding of the file.
+    """
+
+    def __init__(self, mm, start, end, encoding="utf-8"):
+        self._mm = mm
+        self.start = start
+        self.end = end
+        self.encoding = encoding
+        self._n_lines = None
+        self._offsets = None
+        self._markers = {}
+        self._line_starts = {}
+
+    def __contains__(self, text):
+        return self._find_offset(text) >= 0
+
+    def __getitem__(self, index):
+        if (
+            isinstance(index, slice)
+            and index.start in self._line_starts
+            and index.stop is None
+            and index.step in (None, 1)
+        ):
+            # From a line found with find(), without indexing all the lines
+            return OutSection(
+                self._mm, self._line_starts[index.start], self.end, self.encoding
+            )
+        offsets = self.line_offsets()
+        if isinstance(index, slice):
+            first, last, step = index.indices(len(offsets) - 1)
+            if step != 1:
+                return [self[i] for i in range(first, last, step)]
+            last = max(first, last)
+            return OutSection(
+                self._mm, int(offsets[first]), int(offsets[last]), self.encoding
+            )
+        n = len(offsets) - 1
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError("line index out of range")
+        line = self._mm[offsets[index] : offsets[index + 1]].decode(self.encoding)
+        return line.rstrip("\r\n")
+
+    def __iter__(self):
+        start = self.start
+        while start < self.end:
+            end = min(start + CHUNK, self.end)
+            if end < self.end:
+                # Finish the chunk at the end of a line
+                end = self._mm.rfind(b"\n", start, end) + 1
+                if end == 0:
+                    end = self._mm.find(b"\n", start + CHUNK, self.end) + 1
+                    if end == 0:
+                        end = self.end
+            yield from self._mm[start:end].decode(self.encoding).splitlines()
+            start = end
+
+    def __len__(self):
+        if self._n_lines is None:
+            self._n_lines = _count_lines(self._mm, self.start, self.end)
+            if self.end > self.start and self._mm[self.end - 1 : self.end] != b"\n":
+                self._n_lines += 1
+        return self._n_lines
+
+    def __repr__(self):
+        return f"OutSection({self.start}, {self.end})"
+
+    @property
+    def text(self):
+        """The text of the section."""
+        return self._mm[self.start : self.end].decode(self.encoding)
+
+    def find(self, text):
+        """The first line containing the text.
+
+        The result is remembered, so looking for the same markers again, e.g.
+        in several steps, is free.
+
+        Parameters
+        ----------
+        text : str
+            The text to look for.
+
+        Returns
+        -------
+        int
+            The index of the line, or -1 if the text is not in the section.
+        """
+        if text not in self._markers:
+            pos = self._find_offset(text)
+            if pos < 0:
+                self._markers[text] = -1
+            else:
+                line = _count_lines(self._mm, self.start, pos)
+                self._markers[text] = line
+                newline = self._mm.rfind(b"\n", self.start, pos)
+                self._line_starts[line] = self.start if newline < 0 else newline + 1
+        return self._markers[text]
+
+    def line_offsets(self):
+        """The offsets of the starts of the lines, plus the end of the last.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if self._offsets is None:
+            offsets = [np.array([self.start])]
+            if self.end > self.start:
+                data = np.frombuffer(
+                    self._mm,
+                    dtype=np.uint8,
+                    count=self.end - self.start,
+                    offset=self.start,
+                )
+                offsets.append(np.flatnonzero(data == ord("\n")) + self.start + 1)
+                del data
+                if offsets[-1].size == 0 or offsets[-1][-1] != self.end:
+                    offsets.append(np.array([self.end]))
+            self._offsets = np.concatenate(offsets)
+        return self._offsets
+
+    def _find_offset(self, text):
+        """The offset of the first occurrence of the text, or -1."""
+        return self._mm.find(text.encode(self.encoding), self.start, self.end)
+
+
+def _count_lines(mm, start, end):
+    """The number of newlines between two offsets in the file."""
+    n = 0
+    while start < end:
+        stop = min(start + CHUNK, end)
+        n += mm[start:stop].count(b"\n")
+        start = stop
+    return n
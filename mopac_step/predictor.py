@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+"""Predict the time for MOPAC calculations from the timings of earlier ones.
+
+Each run of MOPAC records the host, formula, keywords, number of threads and
+time in the timing store, ~/.seamm.d/timing/mopac.db. The time per calculation
+grows roughly as a power of the number of basis functions, with a prefactor
+that depends on the kind of calculation (MOZYME, force constants, CI,
+COSMO) and the number of threads. For each kind of calculation and number of
+threads a straight line is fit to log(time) against log(n_basis), using the
+timings on this host if there are enough, and otherwise those from all hosts.
+
+Numbers of threads with too few timings for their own line share the slope
+of all the timings of that kind, with an offset for each number of threads,
+so a single timing is enough to compare them. Since MOPAC runs serially until
+there are timings showing that more threads help, a long calculation tries the
+next number of threads whenever the most threads tried so far is the best.
+
+The predictions are used to choose the number of threads, and to tell the
+user roughly how long a calculation will take.
+"""
+
+import logging
+import math
+import platform
+import threading
+
+import numpy as np
+
+from mopac_step.timing_store import TimingStore
+
+logger = logging.getLogger(__name__)
+
+# The fewest timings, over at least two sizes, needed to fit a line
+MIN_POINTS = 3
+
+# Use more threads only if that is predicted to be this much faster
+SPEEDUP = 1.1
+
+# Try more threads than have been timed for calculations predicted to take
+# longer than this, in seconds
+EXPLORE_TIME = 60.0
+
+# The fitted predictors: path -> (last run, host, predictor)
+_cache = {}
+_lock = threading.Lock()
+
+
+def n_basis(formula):
+    """The rough number of basis functions for a formula, e.g. "C6 H6".
+
+    This is the same estimate as used when running MOPAC: four functions
+    for each heavy atom and one for each hydrogen.
+
+    Parameters
+    ----------
+    formula : str
+        The formula, with the elements separated by spaces.
+
+    Returns
+    -------
+    int
+    """
+    result = 0
+    for item in formula.split():
+        element = item.rstrip("0123456789")
+        count = int(item[len(element) :] or 1)
+        result += count if element == "H" else 4 * count
+    return result
+
+
+def kind(keywords):
+    """The kind of calculation, which sets the prefactor of the timings.
+
+    Parameters
+    ----------
+    keywords : str or [str]
+        The keywords, as in the timing file or the input file.
+
+    Returns
+    -------
+    (bool, bool, bool, bool)
+        Whether the calculation uses MOZYME, calculates force constants, uses
+        CI, and uses COSMO.
+    """
+    if not isinstance(keywords, str):
+        keywords = " ".join(keywords)
+    # The name of each keyword, without any value, e.g. THERMO for THERMO(298)
+    names = {_name(w) for w in keywords.replace("&&", " ").split()}
+    return (
+        "MOZYME" in names,
+        not names.isdisjoint(("FORCE", "FORCETS", "THERMO")),
+        not names.isdisjoint(("C.I.", "OPEN", "MECI")),
+        "EPS" in names,
+    )
+
+
+def _name(keyword):
+    """The name of a keyword, without its value, e.g. "EPS" for "EPS=78.4"."""
+    for separator in "=(":
+        keyword = keyword.split(separator, 1)[0]
+    return keyword
+
+
+def _enough(data):
+    """Whether there are enough points, at two sizes or more, to fit a line."""
+    return len(data) >= MIN_POINTS and len({x for x, _ in data}) > 1
+
+
+class TimingPredictor(object):
+    """Predictions of the time for MOPAC calculations.
+
+    Parameters
+    ----------
+    rows : [dict(str, str)]
+        The timings, as read from the timing store.
+    host : str = None
+        The host to predict for. Its timings are used if there are enough.
+    """
+
+    def __init__(self, rows=[], host=None):
+        self.host = host
+        # (kind, nproc) -> (intercept, slope) of log(time) vs log(n_basis)
+        self.models = {}
+        # kind -> (slope, {nproc: intercept}), fit to all numbers of threads
+        self.pooled = {}
+        self._fit(rows)
+
+    @classmethod
+    def load(cls, store=None, host=None):
+        """The predictor for the timings in a store.
+
+        The fit is kept for the rest of the process, until a run is added.
+
+        Parameters
+        ----------
+        store : mopac_step.TimingStore = None
+            The timings, by default ~/.seamm.d/timing/mopac.db.
+        host : str = None
+            The host to predict for, by default this one.
+
+        Returns
+        -------
+        TimingPredictor
+        """
+        if store is None:
+            store = TimingStore()
+        if host is None:
+            host = platform.node()
+        with _lock:
+            try:
+                key = (store.last_id(), host)
+                cached = _cache.get(store.path)
+                if cached is not None and cached[0:2] == key:
+                    return cached[2]
+                rows = store.rows()
+            except Exception as e:
+                logger.warning(f"Could not read the MOPAC timings {store.path}: {e}")
+                return cls(host=host)
+            result = cls(rows, host=host)
+            _cache[store.path] = (*key, result)
+            return result
+
+    def _fit(self, rows):
+        """Fit the timings for each kind of calculation and number of threads."""
+        points = {}
+        for row in rows:
+            try:
+                n_calculations = row["keywords"].count("&&") + 1
+                t = float(row["time"]) / n_calculations
+                n = n_basis(row["formula"])
+                key = (kind(row["keywords"]), int(row["nproc"]))
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            if t <= 0 or n <= 0:
+                continue
+            local = row.get("node") == self.host
+            points.setdefault(key, ([], []))[0 if local else 1].append(
+                (math.log(n), math.log(t))
+            )
+
+        for key, (local, other) in points.items():
+            for data in (local, local + other):
+                if _enough(data):
+                    x, y = np.array(data).T
+                    slope, intercept = np.polyfit(x, y, 1)
+                    self.models[key] = (intercept, slope)
+                    break
+
+        # A common slope for each kind, with an offset per number of threads
+        kinds = {}
+        for (key, nproc), (local, other) in points.items():
+            pooled = kinds.setdefault(key, ({}, {}))
+            pooled[0][nproc] = local
+            pooled[1][nproc] = local + other
+        for key, (local, everything) in kinds.items():
+            for data in (local, everything):
+                data = {nproc: d for nproc, d in data.items() if len(d) > 0}
+                if not _enough([xy for d in data.values() for xy in d]):
+                    continue
+                threads = sorted(data)
+                design = []
+                y = []
+                for nproc in threads:
+                    for x_i, y_i in data[nproc]:
+                        design.append([x_i] + [float(j == nproc) for j in threads])
+                        y.append(y_i)
+                solution = np.linalg.lstsq(np.array(design), np.array(y), rcond=None)[0]
+                self.pooled[key] = (
+                    solution[0],
+                    dict(zip(threads, solution[1:].tolist())),
+                )
+                break
+
+    def predict(self, n_basis, keywords, nproc):
+        """The predicted time for the calculations.
+
+        Parameters
+        ----------
+        n_basis : int
+            The number of basis functions.
+        keywords : [str]
+            The keywords of each calculation.
+        nproc : int
+            The number of threads.
+
+        Returns
+        -------
+        float or None
+            The time in seconds, or None if there are too few timings.
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        if n_basis <= 0:
+            return None
+        key = kind(keywords)
+        model = self.models.get((key, nproc))
+        if model is None:
+            slope, intercepts = self.pooled.get(key, (None, {}))
+            if nproc not in intercepts:
+                return None
+            model = (intercepts[nproc], slope)
+        intercept, slope = model
+        return len(keywords) * math.exp(intercept + slope * math.log(n_basis))
+
+    def best_threads(self, n_basis, keywords, max_threads):
+        """The number of threads giving the shortest predicted time.
+
+        More threads are only used if they are predicted to be noticeably
+        faster, so that cores are not wasted for little gain. If the most
+        threads timed so far are the best for a long calculation, the next
+        power of two is tried, so that the timings show whether it is better.
+
+        Parameters
+        ----------
+        n_basis : int
+            The number of basis functions.
+        keywords : [str]
+            The keywords of each calculation.
+        max_threads : int
+            The most threads that may be used.
+
+        Returns
+        -------
+        int or None
+            The number of threads, or None if there are too few timings.
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        key = kind(keywords)
+        threads = {nproc for k, nproc in self.models if k == key}
+        threads.update(self.pooled.get(key, (None, {}))[1])
+        times = {}
+        for nproc in threads:
+            if nproc <= max_threads:
+                t = self.predict(n_basis, keywords, nproc)
+                if t is not None:
+                    times[nproc] = t
+        if len(times) == 0:
+            return None
+        best = None
+        for nproc in sorted(times):
+            if best is None or times[nproc] * SPEEDUP < times[best]:
+                best = nproc
+
+        # Explore more threads while more have always been better
+        if best == max(times) and times[best] > EXPLORE_TIME:
+            nproc = 1
+            while nproc <= best:
+                nproc *= 2
+            if nproc <= max_threads:
+                return nproc
+            if best < max_threads:
+                return max_threads
+        return best
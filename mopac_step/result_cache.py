@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+"""A cache of MOPAC results shared by all jobs and flowcharts.
+
+MOPAC is deterministic, so a calculation with exactly the same input file,
+run by the same executable, gives the same results. The output files are
+stored under a hash of the input file, any files it reads such as the density
+for OLDENS, the executor configuration and the MOPAC that runs it, and copied
+back into the job directory when the same calculation is run again.
+
+The version of MOPAC is only written in its output, so the MOPAC is
+identified by a checksum of the executable, or by the container image it
+runs in. If the executable cannot be found, e.g. because it is only on the
+path once modules are loaded, the cache is not used.
+
+Each entry is a directory named by its key, holding the files and a small
+JSON file describing them. The entries are stored in subdirectories named by
+the first two characters of the key so that no directory gets too large. The
+total size is kept under a limit by removing the least recently used entries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import shutil
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {"": 1, "K": 1e3, "M": 1e6, "G": 1e9, "T": 1e12}
+
+# The checksums of executables: path -> (size, mtime_ns, checksum)
+_checksums = {}
+_lock = threading.Lock()
+
+
+def parse_size(text):
+    """The size in bytes of e.g. "2 GB", "500MB" or "1000000".
+
+    Parameters
+    ----------
+    text : str or int
+        The size.
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(text, (int, float)):
+        return int(text)
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?)B?\s*", text.upper())
+    if match is None:
+        raise ValueError(f"Cannot understand the size '{text}'")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def executable(config):
+    """The MOPAC executable that an executor configuration runs.
+
+    Parameters
+    ----------
+    config : dict
+        The executor configuration, from mopac.ini.
+
+    Returns
+    -------
+    pathlib.Path or None
+        The executable, or None if it cannot be found.
+    """
+    words = config.get("code", "").split()
+    if len(words) == 0 or "{" in words[0]:
+        return None
+    name = words[0]
+    candidates = []
+    if os.path.isabs(name):
+        candidates.append(Path(name))
+    else:
+        if config.get("installation") == "conda":
+            environment = config.get("conda-environment", "") or "seamm-mopac"
+            if os.sep in environment:
+                candidates.append(Path(environment) / "bin" / name)
+            else:
+                conda = config.get("conda", "") or os.environ.get("CONDA_EXE", "")
+                if conda != "":
+                    root = Path(conda).expanduser().resolve().parent.parent
+                    candidates.append(root / "envs" / environment / "bin" / name)
+        path = shutil.which(name)
+        if path is not None:
+            candidates.append(Path(path))
+    for path in candidates:
+        if path.is_file():
+            return path.resolve()
+    return None
+
+
+def checksum(path):
+    """The checksum of a file, remembered until the file changes.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file.
+
+    Returns
+    -------
+    str
+    """
+    path = Path(path)
+    stat = path.stat()
+    with _lock:
+        cached = _checksums.get(path)
+    if cached is not None and cached[0:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    result = _digest(path)
+    with _lock:
+        _checksums[path] = (stat.st_size, stat.st_mtime_ns, result)
+    return result
+
+
+def identity(config):
+    """What identifies the MOPAC that an executor configuration runs.
+
+    Parameters
+    ----------
+    config : dict
+        The executor configuration, from mopac.ini.
+
+    Returns
+    -------
+    dict or None
+        The container image, or the path and checksum of the executable, or
+        None if the executable cannot be found.
+    """
+    if config.get("installation", "docker") == "docker" and "container" in config:
+        return {
+            "container": config["container"],
+            "version": config.get("version", ""),
+            "platform": config.get("platform", ""),
+        }
+    path = executable(config)
+    if path is None:
+        return None
+    return {"executable": str(path), "checksum": checksum(path)}
+
+
+def _digest(path):
+    """The hash of the contents of a file."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fd:
+        while chunk := fd.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """A content-addressed, size-limited cache of the files from MOPAC.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The directory for the cache.
+    max_size : int or str = "2 GB"
+        The maximum total size of the cached files.
+    """
+
+    def __init__(self, path, max_size="2 GB"):
+        self.path = Path(path).expanduser()
+        self.max_size = parse_size(max_size)
+
+    def key(self, input_text, config, inputs=()):
+        """The key for a calculation.
+
+        Parameters
+        ----------
+        input_text : str
+            The MOPAC input file, mopac.dat.
+        config : dict
+            The executor configuration, including what identifies MOPAC.
+        inputs : [str or pathlib.Path] = ()
+            Other files that MOPAC reads, e.g. the density for OLDENS. Files
+            that do not exist are noted as missing.
+
+        Returns
+        -------
+        str
+            The hash of the input and configuration.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(input_text.encode())
+        digest.update(b"\0")
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        for path in inputs:
+            path = Path(path)
+            digest.update(b"\0" + path.name.encode() + b"\0")
+            if path.exists():
+                digest.update(_digest(path).encode())
+        return digest.hexdigest()
+
+    def _entry(self, key):
+        return self.path / key[0:2] / key
+
+    def get(self, key, directory):
+        """Copy the cached files for a calculation into a directory.
+
+        Parameters
+        ----------
+        key : str
+            The key of the calculation.
+        directory : str or pathlib.Path
+            Where to put the files.
+
+        Returns
+        -------
+        [str] or None
+            The names of the files, or None if the calculation is not cached.
+        """
+        entry = self._entry(key)
+        try:
+            meta = json.loads((entry / "meta.json").read_text())
+            directory = Path(directory)
+            for filename in meta["files"]:
+                shutil.copyfile(entry / filename, directory / filename)
+            # Mark it as recently used
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Could not use cached MOPAC results {entry}: {e}")
+            return None
+        logger.info(f"Using the cached MOPAC results in {entry}")
+        return meta["files"]
+
+    def put(self, key, directory, filenames):
+        """Store the files from a calculation.
+
+        Any problem storing the files is logged and ignored, since the cache
+        is only an optimization.
+
+        Parameters
+        ----------
+        key : str
+            The key of the calculation.
+        directory : str or pathlib.Path
+            The directory with the files.
+        filenames : [str]
+            The files to store. Any that do not exist are skipped.
+
+        Returns
+        -------
+        bool
+            Whether the files were stored.
+        """
+        if self.max_size <= 0:
+            return False
+        directory = Path(directory)
+        entry = self._entry(key)
+        tmp = entry.with_name(f".{key}.{os.getpid()}.tmp")
+        try:
+            tmp.mkdir(parents=True, exist_ok=True)
+            stored = []
+            size = 0
+            for filename in filenames:
+                path = directory / filename
+                if path.exists():
+                    shutil.copyfile(path, tmp / filename)
+                    size += path.stat().st_size
+                    stored.append(filename)
+            meta = {"files": stored, "size": size, "created": time.time()}
+            (tmp / "meta.json").write_text(json.dumps(meta))
+            try:
+                # Atomic, and fails if another job stored it first.
+                os.rename(tmp, entry)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)
+        except Exception as e:
+            logger.debug(f"Could not cache the MOPAC results in {entry}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        self.evict()
+        return True
+
+    def entries(self):
+        """The entries in the cache, least recently used first.
+
+        Returns
+        -------
+        [(float, int, pathlib.Path)]
+            The time last used, size and directory of each entry.
+        """
+        result = []
+        if not self.path.exists():
+            return result
+        for subdirectory in self.path.iterdir():
+            if not subdirectory.is_dir():
+                continue
+            for entry in subdirectory.iterdir():
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    meta = json.loads((entry / "meta.json").read_text())
+                    result.append((entry.stat().st_mtime, meta["size"], entry))
+                except Exception:
+                    continue
+        result.sort(key=lambda x: x[0])
+        return result
+
+    def evict(self):
+        """Remove the least recently used entries until under the size limit.
+
+        Returns
+        -------
+        int
+            The number of entries removed.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        n = 0
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            n += 1
+        return n
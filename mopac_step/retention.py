@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Compress the bulky output files of finished MOPAC runs.
+
+The AUX and output files of large calculations can be many gigabytes, yet
+once a step has been analyzed they are only read again if the flowchart is
+rerun. After a successful analysis they can be compressed with gzip at its
+fastest level, streaming so that the files are never held in memory, or the
+AUX file removed altogether when its parsed sections are kept in the sidecar
+(see AuxCache).
+
+The readers find the compressed files transparently: asking for mopac.out
+gives mopac.out.gz if only it exists. Since OutIndex and AuxIndex memory-map
+the files, a compressed file is decompressed to an anonymous temporary file,
+which is mapped instead.
+"""
+
+import gzip
+import logging
+import os
+from pathlib import Path
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# The suffix of compressed files
+SUFFIX = ".gz"
+
+# gzip's fastest level; the files are large and rarely read again
+LEVEL = 1
+
+# The size of the chunks when streaming
+CHUNK = 1024 * 1024
+
+# The policies for the files, for the --mopac-files option
+POLICIES = ("keep", "compress", "minimal")
+
+
+def locate(path):
+    """The file to read for a path, which may have been compressed.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file, e.g. mopac.out.
+
+    Returns
+    -------
+    pathlib.Path
+        The file if it exists, otherwise the compressed file if that exists,
+        otherwise the file as given.
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    compressed = path.with_name(path.name + SUFFIX)
+    if compressed.exists():
+        return compressed
+    return path
+
+
+def compress(path, level=LEVEL):
+    """Compress a file with gzip, replacing it.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file.
+    level : int = 1
+        The gzip compression level.
+
+    Returns
+    -------
+    pathlib.Path or None
+        The compressed file, or None if the file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    result = path.with_name(path.name + SUFFIX)
+    tmp = path.with_name(f".{result.name}.{os.getpid()}")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp, "wb", compresslevel=level) as fd:
+            shutil.copyfileobj(src, fd, CHUNK)
+        shutil.copystat(path, tmp)
+        os.replace(tmp, result)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    path.unlink()
+    return result
+
+
+def open_mappable(path):
+    """Open a file, which may be compressed, so that it can be memory-mapped.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        The file. If it does not exist, the compressed file is used.
+
+    Returns
+    -------
+    file object
+        The file, or a temporary file with the decompressed contents, opened
+        for reading in binary mode.
+    """
+    path = locate(path)
+    if path.suffix != SUFFIX:
+        return open(path, mode="rb")
+    fd = tempfile.TemporaryFile()
+    try:
+        with gzip.open(path, "rb") as src:
+            shutil.copyfileobj(src, fd, CHUNK)
+        fd.flush()
+        fd.seek(0)
+    except BaseException:
+        fd.close()
+        raise
+    return fd
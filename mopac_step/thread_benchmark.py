@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""Measure how MOPAC's speed depends on the number of threads on this host.
+
+    python -m mopac_step benchmark [--mopac PATH] [--sizes 100,500,...]
+
+runs single-point calculations on clusters of water molecules of increasing
+size, each with 1, 2, 4 ... threads up to the number of cores, with and
+without MOZYME. The timings and the settings chosen from them are written to
+the policy file for the host, which MOPAC steps then use to choose the number
+of threads and when to switch to MOZYME.
+"""
+
+import argparse
+import math
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from tabulate import tabulate
+
+from mopac_step.host_policy import HostPolicy, policy_path
+
+SIZES = (100, 250, 500, 1000, 2000, 4000)
+
+# The geometry of a water molecule, with O at the origin
+WATER = (
+    ("O", 0.0, 0.0, 0.0),
+    ("H", 0.757, 0.586, 0.0),
+    ("H", -0.757, 0.586, 0.0),
+)
+
+# The spacing of the water molecules in the cluster, in Å
+SPACING = 3.1
+
+
+def water_cluster(n_basis):
+    """A cubic cluster of water molecules with about this many basis functions.
+
+    Parameters
+    ----------
+    n_basis : int
+        The number of basis functions wanted. Each water has 6.
+
+    Returns
+    -------
+    [(str, float, float, float)]
+        The element and Cartesian coordinates of each atom.
+    """
+    n_waters = max(1, math.ceil(n_basis / 6))
+    side = math.ceil(n_waters ** (1 / 3))
+    atoms = []
+    for n in range(n_waters):
+        i, j, k = n % side, (n // side) % side, n // (side * side)
+        for element, x, y, z in WATER:
+            atoms.append((element, x + i * SPACING, y + j * SPACING, z + k * SPACING))
+    return atoms
+
+
+def thread_ladder(max_threads):
+    """1, 2, 4 ... up to and including the maximum number of threads."""
+    result = []
+    n = 1
+    while n < max_threads:
+        result.append(n)
+        n *= 2
+    result.append(max_threads)
+    return result
+
+
+def time_mopac(mopac, atoms, threads, mozyme=False, hamiltonian="PM7"):
+    """The wall time for a single-point calculation.
+
+    Parameters
+    ----------
+    mopac : str
+        The MOPAC executable.
+    atoms : [(str, float, float, float)]
+        The system.
+    threads : int
+        The number of threads.
+    mozyme : bool = False
+        Whether to use MOZYME.
+    hamiltonian : str = "PM7"
+        The Hamiltonian.
+
+    Returns
+    -------
+    float or None
+        The time in seconds, or None if MOPAC failed.
+    """
+    keywords = ["1SCF", hamiltonian, "GEO-OK", f"THREADS={threads}"]
+    if mozyme:
+        keywords.append("MOZYME")
+    lines = [" ".join(keywords), "Thread benchmark", f"{len(atoms)} atoms"]
+    for element, x, y, z in atoms:
+        lines.append(f"{element:2} {x:12.6f} 1 {y:12.6f} 1 {z:12.6f} 1")
+
+    env = dict(os.environ)
+    env["OMP_NUM_THREADS"] = str(threads)
+    env["MKL_NUM_THREADS"] = str(threads)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "mopac.dat"
+        path.write_text("\n".join(lines) + "\n")
+        t0 = time.perf_counter()
+        subprocess.run(
+            [mopac, "mopac.dat"],
+            cwd=directory,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        t = time.perf_counter() - t0
+        out = Path(directory) / "mopac.out"
+        if not out.exists() or "MOPAC DONE" not in out.read_text()[-500:]:
+            return None
+    return t
+
+
+def run(mopac, sizes=SIZES, max_threads=None, mozyme=True, hamiltonian="PM7"):
+    """Time MOPAC for each size and number of threads.
+
+    Returns
+    -------
+    [dict]
+        The timings, as used by HostPolicy.from_timings().
+    """
+    if max_threads is None:
+        max_threads = os.cpu_count()
+    timings = []
+    for n_basis in sizes:
+        atoms = water_cluster(n_basis)
+        n_basis = 6 * (len(atoms) // 3)
+        for use_mozyme in (False, True) if mozyme else (False,):
+            for threads in thread_ladder(max_threads):
+                t = time_mopac(mopac, atoms, threads, use_mozyme, hamiltonian)
+                timings.append(
+                    {
+                        "n_atoms": len(atoms),
+                        "n_basis": n_basis,
+                        "threads": threads,
+                        "mozyme": use_mozyme,
+                        "time": t,
+                    }
+                )
+                t = "failed" if t is None else f"{t:.2f} s"
+                print(
+                    f"{n_basis:6d} basis functions, {threads:3d} threads"
+                    f"{', MOZYME' if use_mozyme else ''}: {t}",
+                    flush=True,
+                )
+    return timings
+
+
+def main(argv=None):
+    """Run the benchmark and write the policy for this host."""
+    parser = argparse.ArgumentParser(
+        prog="python -m mopac_step benchmark",
+        description="Measure the best number of threads for MOPAC on this host.",
+    )
+    parser.add_argument(
+        "--mopac",
+        default=shutil.which("mopac"),
+        help="the MOPAC executable, by default 'mopac' in the path",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(n) for n in SIZES),
+        help="the numbers of basis functions, separated by commas",
+    )
+    parser.add_argument(
+        "--max-threads",
+        type=int,
+        default=os.cpu_count(),
+        help="the most threads to try",
+    )
+    parser.add_argument("--hamiltonian", default="PM7", help="the Hamiltonian to use")
+    parser.add_argument("--no-mozyme", action="store_true", help="do not try MOZYME")
+    parser.add_argument(
+        "--output", default=None, help="the policy file, by default for this host"
+    )
+    options = parser.parse_args(argv)
+
+    if options.mopac is None:
+        print("Could not find MOPAC. Use --mopac to give the executable.")
+        return 1
+
+    sizes = [int(n) for n in options.sizes.split(",")]
+    timings = run(
+        options.mopac,
+        sizes=sizes,
+        max_threads=options.max_threads,
+        mozyme=not options.no_mozyme,
+        hamiltonian=options.hamiltonian,
+    )
+    if all(row["time"] is None for row in timings):
+        print(f"MOPAC ({options.mopac}) failed for every calculation.")
+        return 1
+    policy = HostPolicy.from_timings(timings)
+    path = policy.save(options.output)
+
+    table = {
+        "Basis functions": [n for n, _ in policy.threads],
+        "Threads": [t for _, t in policy.threads],
+    }
+    if len(policy.mozyme_threads) == len(policy.threads):
+        table["Threads with MOZYME"] = [t for _, t in policy.mozyme_threads]
+    print()
+    print(tabulate(table, headers="keys", tablefmt="simple"))
+    if policy.mozyme_atoms is None:
+        print("\nMOZYME was not faster for any of the sizes.")
+    else:
+        print(f"\nMOZYME is faster from {policy.mozyme_atoms} atoms.")
+    print(f"\nThe policy was written to {path}")
+    if options.output is not None and Path(options.output) != policy_path():
+        print(f"Copy it to {policy_path()} for MOPAC to use it.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+"""A database of the time taken by MOPAC calculations.
+
+Every MOPAC step that runs records the host, the system, the keywords, the
+number of threads and the time taken, together with the time for each phase
+of the step. Many jobs on a host may finish at once, so the records are kept
+in a SQLite database in WAL mode, which lets them write safely at the same
+time while others read. The columns used to select timings, the host,
+formula, keywords and date, are indexed.
+
+The timings used to be appended to ~/.seamm.d/timing/mopac.csv. That file is
+imported when the database is created, and each run is still appended to it
+so that other tools reading it keep working. export_csv() writes all the runs
+in the same format.
+"""
+
+import csv
+import logging
+from pathlib import Path
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+TIMING_PATH = Path("~/.seamm.d/timing/mopac.db")
+
+# The columns of the runs, as in the CSV file
+COLUMNS = (
+    "node",
+    "cpu",
+    "cpu_version",
+    "cpu_count",
+    "cpu_speed",
+    "date",
+    "H_SMILES",
+    "ISOMERIC_SMILES",
+    "formula",
+    "net_charge",
+    "spin_multiplicity",
+    "keywords",
+    "nproc",
+    "time",
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    {", ".join(f'"{c}" TEXT' for c in COLUMNS[:-2])},
+    nproc INTEGER,
+    time REAL
+);
+CREATE INDEX IF NOT EXISTS runs_node ON runs (node);
+CREATE INDEX IF NOT EXISTS runs_formula ON runs (formula);
+CREATE INDEX IF NOT EXISTS runs_keywords ON runs (keywords);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (date);
+CREATE TABLE IF NOT EXISTS phases (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS phases_run ON phases (run);
+"""
+
+
+class TimingStore(object):
+    """The timings of MOPAC calculations.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path = ~/.seamm.d/timing/mopac.db
+        The database, which is created if needed.
+    csv_path : str or pathlib.Path = "default"
+        The CSV file that each run is also appended to, by default the
+        database with the suffix ".csv", or None for none.
+    """
+
+    def __init__(self, path=TIMING_PATH, csv_path="default"):
+        self.path = Path(path).expanduser()
+        if csv_path == "default":
+            self.csv_path = self.path.with_suffix(".csv")
+        elif csv_path is None:
+            self.csv_path = None
+        else:
+            self.csv_path = Path(csv_path).expanduser()
+
+    def _exists(self):
+        """Whether there are any timings, in the database or to import."""
+        if self.path.exists():
+            return True
+        return self.csv_path is not None and self.csv_path.exists()
+
+    def _connect(self):
+        """Open the database, creating it if needed."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=60)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA foreign_keys=ON")
+        if db.execute("PRAGMA user_version").fetchone()[0] == 0:
+            # Create the tables and import the old CSV file once, even if
+            # several jobs get here at the same time.
+            db.execute("BEGIN IMMEDIATE")
+            if db.execute("PRAGMA user_version").fetchone()[0] == 0:
+                for statement in SCHEMA.split(";"):
+                    db.execute(statement)
+                if self.csv_path is not None and self.csv_path.exists():
+                    self._import_csv(db, self.csv_path)
+                db.execute("PRAGMA user_version = 1")
+            db.commit()
+        return db
+
+    def add(self, row, phases={}):
+        """Record a run.
+
+        Parameters
+        ----------
+        row : dict(str, str) or [str]
+            The values of the columns, as a dictionary or in order.
+        phases : dict(str, float) = {}
+            The time in seconds for each phase of the step.
+
+        Returns
+        -------
+        int
+            The id of the run.
+        """
+        if not isinstance(row, dict):
+            row = dict(zip(COLUMNS, row))
+        columns = [c for c in COLUMNS if c in row]
+        db = self._connect()
+        try:
+            with db:
+                cursor = db.execute(
+                    _insert_sql(columns), [_value(c, row[c]) for c in columns]
+                )
+                run = cursor.lastrowid
+                db.executemany(
+                    "INSERT INTO phases (run, name, time) VALUES (?, ?, ?)",
+                    [(run, name, t) for name, t in phases.items()],
+                )
+        finally:
+            db.close()
+        self._append_csv(row)
+        return run
+
+    def last_id(self):
+        """The id of the latest run, or 0. This changes when a run is added."""
+        if not self._exists():
+            return 0
+        db = self._connect()
+        try:
+            return db.execute("SELECT max(id) FROM runs").fetchone()[0] or 0
+        finally:
+            db.close()
+
+    def rows(self, **where):
+        """The recorded runs, optionally only those matching some columns.
+
+        Parameters
+        ----------
+        where : dict(str, str)
+            Values of the columns to match, e.g. node="myhost".
+
+        Returns
+        -------
+        [dict]
+            The runs, in the order recorded, each with its phases in
+            "phases".
+        """
+        if not self._exists():
+            return []
+        condition = ""
+        values = []
+        if len(where) > 0:
+            for column in where:
+                if column not in COLUMNS:
+                    raise KeyError(f"No column '{column}' in the timings")
+            condition = " WHERE " + " AND ".join(f'"{c}" = ?' for c in where)
+            values = list(where.values())
+        db = self._connect()
+        try:
+            sql = f"SELECT * FROM runs{condition} ORDER BY id"
+            result = {row["id"]: dict(row) for row in db.execute(sql, values)}
+            for row in result.values():
+                row["phases"] = {}
+            sql = (
+                "SELECT run, name, time FROM phases"
+                f" WHERE run IN (SELECT id FROM runs{condition})"
+            )
+            for run, name, t in db.execute(sql, values):
+                result[run]["phases"][name] = t
+        finally:
+            db.close()
+        return list(result.values())
+
+    def export_csv(self, path):
+        """Write the runs to a CSV file, as the timings used to be kept.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            The file to write.
+
+        Returns
+        -------
+        int
+            The number of runs written.
+        """
+        rows = self.rows()
+        with Path(path).expanduser().open("w", newline="") as fd:
+            writer = csv.writer(fd)
+            writer.writerow(COLUMNS)
+            for row in rows:
+                writer.writerow(["" if row[c] is None else row[c] for c in COLUMNS])
+        return len(rows)
+
+    def _append_csv(self, row):
+        """Append a run to the CSV file, writing the header if it is new."""
+        if self.csv_path is None:
+            return
+        try:
+            new = not self.csv_path.exists() or self.csv_path.stat().st_size == 0
+            with self.csv_path.open("a", newline="") as fd:
+                writer = csv.writer(fd)
+                if new:
+                    writer.writerow(COLUMNS)
+                writer.writerow(["" if row.get(c) is None else row[c] for c in COLUMNS])
+        except Exception as e:
+            logger.debug(f"Could not append the timing to {self.csv_path}: {e}")
+
+    def _import_csv(self, db, path):
+        """Import the timings from the CSV file used previously."""
+        try:
+            with path.open(newline="") as fd:
+                rows = [
+                    [_value(c, row.get(c)) for c in COLUMNS]
+                    for row in csv.DictReader(fd)
+                ]
+            db.executemany(_insert_sql(COLUMNS), rows)
+            logger.info(f"Imported {len(rows)} MOPAC timings from {path}")
+        except Exception as e:
+            logger.warning(f"Could not import the MOPAC timings from {path}: {e}")
+
+
+def _insert_sql(columns):
+    """The SQL to add a run with values for the given columns."""
+    names = ", ".join(f'"{c}"' for c in columns)
+    return f"INSERT INTO runs ({names}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _value(column, value):
+    """The value to store for a column, converting the numbers."""
+    if value is None or value == "":
+        return None
+    try:
+        if column == "nproc":
+            return int(value)
+        if column == "time":
+            return float(value)
+    except ValueError:
+        return None
+    return str(value)
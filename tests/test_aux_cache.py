@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the sidecar cache of the parsed AUX file."""
+
+import os
+
+import numpy as np
+import pytest
+
+import mopac_step
+from .test_parse_aux import AUX_TEXT
+
+
+@pytest.fixture
+def aux_path(tmp_path):
+    """An AUX file with two sections."""
+    path = tmp_path / "mopac.aux"
+    path.write_text(AUX_TEXT)
+    return path
+
+
+@pytest.fixture
+def base():
+    """A MOPACBase node, which holds the parsing methods."""
+    return mopac_step.MOPACBase()
+
+
+def _same(a, b):
+    assert a.keys() == b.keys()
+    for key, value in a.items():
+        if isinstance(value, np.ndarray):
+            assert b[key].dtype == value.dtype
+            assert np.array_equal(b[key], value)
+        elif isinstance(value, list) and len(value) > 0:
+            assert len(b[key]) == len(value)
+            for x, y in zip(value, b[key]):
+                assert type(x) is type(y)
+                assert np.array_equal(x, y)
+        else:
+            assert type(b[key]) is type(value)
+            assert b[key] == value
+
+
+@pytest.mark.parametrize("as_arrays", [False, True])
+def test_round_trip(base, aux_path, as_arrays):
+    """The sections from the sidecar are the same as those parsed."""
+    expected = list(base.read_aux(aux_path, as_arrays=as_arrays))
+    parsed = list(base.read_aux(aux_path, as_arrays=as_arrays, cache=True))
+    sidecar = aux_path.with_name("mopac.aux.npz")
+    assert sidecar.exists()
+
+    with mopac_step.AuxCache(aux_path, as_arrays=as_arrays) as tmp:
+        assert tmp.open()
+        assert tmp.complete
+        assert len(tmp) == 2
+
+    # Make sure the second read does not parse the file
+    base.parse_aux = None
+    cached = list(base.read_aux(aux_path, as_arrays=as_arrays, cache=True))
+
+    assert len(cached) == len(expected) == len(parsed) == 2
+    for a, b in zip(expected, cached):
+        _same(a, b)
+
+
+def test_wanted(base, aux_path):
+    """A sidecar with fewer properties than wanted is not used."""
+    wanted = {"CPU_TIME"}
+    list(base.read_aux(aux_path, wanted=wanted, cache=True))
+
+    with mopac_step.AuxCache(aux_path) as sidecar:
+        assert sidecar.open()
+        assert sidecar.covers(0, {"CPU_TIME"})
+        assert not sidecar.covers(0, {"CPU_TIME", "ATOM_X"})
+        assert not sidecar.covers(0)
+
+    first, second = base.read_aux(aux_path, wanted={"ATOM_X"}, cache=True)
+    assert "ATOM_X" in first
+
+
+def test_changed_aux_file(base, aux_path):
+    """The sidecar is ignored if the AUX file changes."""
+    list(base.read_aux(aux_path, cache=True))
+    with mopac_step.AuxCache(aux_path) as sidecar:
+        assert sidecar.open()
+
+    aux_path.write_text(AUX_TEXT.replace("0.25", "0.50"))
+    stat = os.stat(aux_path)
+    os.utime(aux_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    with mopac_step.AuxCache(aux_path) as sidecar:
+        assert not sidecar.open()
+
+    first, second = base.read_aux(aux_path, cache=True)
+    assert first["CPU_TIME"] == pytest.approx(0.5)
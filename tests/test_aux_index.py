@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the memory-mapped index of the AUX file."""
+
+import pytest
+
+import mopac_step
+from .test_parse_aux import AUX_TEXT
+
+
+@pytest.fixture
+def aux_path(tmp_path):
+    """An AUX file with two sections and a killed third one."""
+    path = tmp_path / "mopac.aux"
+    text = AUX_TEXT.replace(
+        " METHOD=PM7\n", ' METHOD=PM7\n KEYWORDS="PM7 AUX(MOS=10,XP) 1SCF"\n'
+    )
+    path.write_text(text + " START OF MOPAC FILE\n ATOM_CHARGES[003]=\n  -0.6\n")
+    return path
+
+
+def test_index(aux_path):
+    """The keys of the complete sections are found, in order."""
+    with mopac_step.AuxIndex(aux_path) as index:
+        assert len(index) == 2
+        assert index.keys(0) == [
+            "MOPAC_VERSION",
+            "METHOD",
+            "KEYWORDS",
+            "ATOM_EL",
+            "ATOM_X",
+            "HEAT_OF_FORMATION",
+            "HEAT_OF_FORM_UPDATED",
+            "HEAT_OF_FORM_UPDATED",
+            "AO_ATOMINDEX",
+            "CPU_TIME",
+        ]
+        assert index.keys(1) == [
+            "MOPAC_VERSION",
+            "ATOM_CHARGES",
+            "GRADIENTS",
+            "CPU_TIME",
+        ]
+        assert list(index.lines(1, wanted={"ATOM_CHARGES"})) == [
+            " ATOM_CHARGES[003]=",
+            "  -0.61990  0.30995  0.30995",
+        ]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "mopac.aux"
+    path.write_text("")
+    with mopac_step.AuxIndex(path) as index:
+        assert len(index) == 0
+
+
+def test_read_aux_keywords(aux_path):
+    """Keys whose values contain "=" are read correctly."""
+    base = mopac_step.MOPACBase()
+    first, second = base.read_aux(aux_path)
+    assert first["KEYWORDS"] == "PM7 AUX(MOS=10,XP) 1SCF"
+    assert first["ATOM_EL"] == ["O", "H", "H"]
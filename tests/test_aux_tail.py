@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for following the progress of a running job in the AUX file."""
+
+import json
+
+from mopac_step import AuxTail
+
+header = """ START OF MOPAC FILE
+ MOPAC_VERSION="22.191L"
+ KEYWORDS=" PM7 EF AUX"
+"""
+
+cycle = """ HEAT_OF_FORM_UPDATED:KCAL/MOL[1]=
+  {:.5f}
+ GRADIENT_NORM_UPDATED:KCAL/MOL/ANGSTROM[1]=
+ {:.3f}
+ ATOM_X_UPDATED:ANGSTROMS[0009]=
+   0.000   0.000   0.000
+   0.957   0.000   0.000
+  -0.240   0.927   0.000
+"""
+
+
+def test_incremental(tmp_path):
+    """The file is parsed as it grows, without rereading it."""
+    path = tmp_path / "mopac.aux"
+    tail = AuxTail(path)
+    assert tail.poll() == 0
+
+    text = header + cycle.format(-57.1, 10.0)
+    path.write_text(text)
+    assert tail.poll() == 1
+
+    # The next cycle arrives in pieces, split in the middle of a line
+    text = cycle.format(-57.2, 5.0) + cycle.format(-57.3, 2.5)
+    with path.open("a") as fd:
+        fd.write(text[:60])
+    tail.poll()
+    with path.open("a") as fd:
+        fd.write(text[60:])
+    tail.poll()
+    assert tail._offset == path.stat().st_size
+
+    # The last values are only known to be complete at the next key
+    with path.open("a") as fd:
+        fd.write(" END OF MOPAC FILE\n")
+    tail.poll()
+
+    assert tail.n_calculations == 1
+    assert [c["cycle"] for c in tail.cycles] == [1, 2, 3]
+    assert [c["energy"] for c in tail.cycles] == [-57.1, -57.2, -57.3]
+    assert [c["gradient_norm"] for c in tail.cycles] == [10.0, 5.0, 2.5]
+
+
+def test_thread(tmp_path):
+    """The background thread writes the status file."""
+    path = tmp_path / "mopac.aux"
+    status = tmp_path / "progress.json"
+    seen = []
+    with AuxTail(path, status=status, interval=0.01, callback=seen.append) as tail:
+        path.write_text(header + cycle.format(-57.1, 10.0) + " END OF MOPAC FILE\n")
+    assert seen == [tail]
+    progress = json.loads(status.read_text())
+    assert progress["cycles"] == [
+        {"calculation": 1, "cycle": 1, "energy": -57.1, "gradient_norm": 10.0}
+    ]
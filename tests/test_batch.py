@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for running a batch of configurations in one MOPAC step."""
+
+from pathlib import Path
+
+import molsystem
+import pytest
+import seamm
+
+import mopac_step
+from .test_run import make_step
+
+
+@pytest.fixture
+def mopac(tmp_path):
+    seamm.flowchart_variables = seamm.Variables()
+    flowchart = seamm.Flowchart(directory=str(tmp_path))
+    node = mopac_step.MOPAC(flowchart=flowchart)
+    node.options = {"batch": "current configuration"}
+    flowchart.add_node(node)
+    flowchart.add_edge(flowchart.get_node("1"), node, edge_type="execution")
+    flowchart.set_ids()
+    return node
+
+
+@pytest.fixture
+def system():
+    system_db = molsystem.SystemDB(filename=":memory:")
+    system = system_db.create_system()
+    for name in ("first", "second", "third"):
+        configuration = system.create_configuration(name=name)
+        configuration.atoms.append(x=[0.0], y=[0.0], z=[0.0], symbol=["Ar"])
+    return system
+
+
+def test_batch_configurations(mopac, system):
+    current = system.configuration
+    assert mopac.batch_configurations(system, current) == [current]
+
+    mopac.options["batch"] = "all configurations"
+    names = [c.name for c in mopac.batch_configurations(system, current)]
+    assert names == ["first", "second", "third"]
+
+    # An explicit list takes precedence
+    mopac.configurations = system.configurations[1:]
+    names = [c.name for c in mopac.batch_configurations(system, current)]
+    assert names == ["second", "third"]
+
+
+@pytest.fixture
+def batch(tmp_path):
+    """A MOPAC step with an energy on a batch of three configurations."""
+    node, system = make_step(tmp_path, configurations=("first", "second", "third"))
+    node.options["batch"] = "all configurations"
+    # Not the last configuration, which is left current if not restored
+    system.configuration = system.configurations[1]
+    return node, system
+
+
+def _structures(text):
+    """The coordinates of the first hydrogen of each structure in the input."""
+    return [line.split()[1] for line in text.splitlines() if line.startswith("H ")]
+
+
+def test_batch_input(batch):
+    """The calculations for all the configurations are in one input file."""
+    mopac, system = batch
+    current = system.configuration.id
+    energy = mopac.subflowchart.get_node("1").next()
+    energy.parameters["input only"].value = "yes"
+    mopac.run()
+
+    text = (Path(mopac.directory) / "mopac.dat").read_text()
+    assert text.count("AUX(") == 3
+    # The first hydrogen differs for each configuration
+    assert _structures(text)[0::2] == ["0.96000000"] * 3
+    assert _structures(text)[1::2] == ["-0.24000000", "-0.23000000", "-0.22000000"]
+    assert mopac.flowchart.executor.inputs == []
+    assert system.configuration.id == current
+
+
+def test_batch_error(batch):
+    """The current configuration is restored if running MOPAC fails."""
+    mopac, system = batch
+    current = system.configuration.id
+
+    def fail(**kwargs):
+        raise RuntimeError("MOPAC failed")
+
+    mopac.flowchart.executor.run = fail
+    with pytest.raises(RuntimeError):
+        mopac.run()
+    assert system.configuration.id == current
+
+
+def test_analyze_batch(batch):
+    """Each configuration is analyzed in turn, committing once at the end."""
+    mopac, system = batch
+    current = system.configuration.id
+    system_db = system.system_db
+    analyzed = []
+    commits = []
+
+    analyze = mopac._analyze_configuration
+
+    def record(*args, **kwargs):
+        analyzed.append((system.configuration.name, system_db.deferred_commit))
+        return analyze(*args, **kwargs)
+
+    commit = system_db.commit_transaction
+
+    def count():
+        commits.append(system_db.deferred_commit)
+        return commit()
+
+    mopac._analyze_configuration = record
+    system_db.commit_transaction = count
+    mopac.run()
+
+    assert len(mopac.flowchart.executor.inputs) == 1
+    assert analyzed == [("first", True), ("second", True), ("third", True)]
+    assert commits == [False]
+    assert not system_db.deferred_commit
+    assert system.configuration.id == current
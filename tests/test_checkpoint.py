@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for resuming interrupted MOPAC runs."""
+
+from mopac_step import checkpoint
+
+banner = [
+    " " + "*" * 40,
+    " **  MOPAC2016  **",
+    " **" + " " * 36 + "**",
+    " " + "*" * 40,
+    "",
+    " ** Cite this program as: MOPAC2016",
+    " " + "*" * 40,
+]
+
+
+def aux(title, finished=True):
+    text = f" START OF MOPAC FILE\n TITLE={title}\n"
+    return text + (" END OF MOPAC FILE\n" if finished else "")
+
+
+def out(title):
+    return "\n".join(banner + ["", f" {title}", ""]) + "\n"
+
+
+def test_resume(tmp_path):
+    progress = checkpoint.Checkpoint(tmp_path)
+    progress.start("input")
+    (tmp_path / "mopac.aux").write_text(aux("1") + aux("2") + aux("3", False))
+    (tmp_path / "mopac.out").write_text(out("1") + out("2") + out("3"))
+
+    # A different input is not resumed
+    assert progress.resume("other input") is None
+    assert progress.resume("input") == (2, 0)
+    assert (tmp_path / "mopac.aux.done").read_text() == aux("1") + aux("2")
+    assert "3" not in (tmp_path / "mopac.out.done").read_text()
+    assert not (tmp_path / "mopac.aux").exists()
+
+    # Interrupted again, before anything finished
+    assert progress.resume("input") == (2, 2)
+
+    (tmp_path / "mopac.aux").write_text(aux("3"))
+    (tmp_path / "mopac.out").write_text(out("3"))
+    progress.finish()
+    assert (tmp_path / "mopac.aux").read_text() == aux("1") + aux("2") + aux("3")
+    assert checkpoint.complete_sections(tmp_path / "mopac.aux")[0] == 3
+    assert not (tmp_path / "resume.json").exists()
+    assert progress.resume("input") is None
+
+
+def test_restartable():
+    assert checkpoint.restartable(["PM7", "EF"])
+    assert checkpoint.restartable(["PM7", "1SCF", "FORCE"])
+    assert not checkpoint.restartable(["PM7", "1SCF"])
+
+
+def test_with_coordinates():
+    structure = "O    0.00000000 1   0.00000000 1   0.00000000 0\n"
+    assert checkpoint.with_coordinates(structure, [[1.0, 2.0, 3.0]]) == (
+        "O    1.00000000 1   2.00000000 1   3.00000000 0\n"
+    )
+    assert checkpoint.with_coordinates(structure, []) is None
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for starting MOPAC calculations from earlier densities."""
+
+from mopac_step import densities
+
+TEXT = """PM7 CHARGE=0
+water
+optimize
+O 0.0 1 0.0 1 0.0 1
+H 0.96 1 0.0 1 0.0 1
+
+PM7 CHARGE=0 OLDGEO FORCE
+water
+frequencies
+
+PM6 CHARGE=0 OLDGEO 1SCF
+water
+other Hamiltonian
+
+"""
+
+
+def calculations():
+    lines = [line for line in TEXT.split("\n") if line.startswith("PM")]
+    starts = [TEXT.index(line) for line in lines]
+    return starts, [(line.split(), None) for line in lines]
+
+
+def test_chain():
+    starts, items = calculations()
+    densities.chain(items)
+    assert items[0][0] == ["PM7", "CHARGE=0", "DENOUT"]
+    assert items[1][0] == ["PM7", "CHARGE=0", "OLDGEO", "FORCE", "OLDENS"]
+    # A different Hamiltonian does not reuse the density
+    assert items[2][0] == ["PM6", "CHARGE=0", "OLDGEO", "1SCF"]
+
+    text, new_starts = densities.rewrite(TEXT, starts, items)
+    assert text.startswith("PM7 CHARGE=0 DENOUT\nwater\n")
+    assert text[new_starts[1] :].startswith("PM7 CHARGE=0 OLDGEO FORCE OLDENS\n")
+    assert text[new_starts[2] :] == TEXT[starts[2] :]
+
+
+def test_registry(tmp_path):
+    registry = densities.DensityRegistry()
+    path = tmp_path / "mopac.den"
+    registry.add("O 0 0 0", ["PM7", "CHARGE=0", "DENOUT"], path)
+    assert registry.get("O 0 0 0", ["PM7", "CHARGE=0"]) is None
+
+    path.write_bytes(b"density")
+    registry.add("O 0 0 0", ["PM7", "CHARGE=0", "DENOUT"], path)
+    assert registry.get("O 0 0 0", ["PM7", "CHARGE=0", "1SCF"]) == path
+    assert registry.get("O 0 0 0", ["PM7", "CHARGE=1"]) is None
+    assert registry.get("O 0 0 1", ["PM7", "CHARGE=0"]) is None
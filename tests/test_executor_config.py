@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for reading how to run MOPAC from mopac.ini."""
+
+import os
+
+from mopac_step import executor_config
+
+
+def test_bootstrap(tmp_path):
+    executor_config.clear()
+    config = executor_config.resolve("local", tmp_path)
+    assert config["installation"] == "conda"
+    assert config["conda-environment"] == "seamm-mopac"
+    # The comments in the default file are kept
+    text = executor_config.ini_path(tmp_path).read_text()
+    assert text.startswith("# Configuration options for how to run MOPAC")
+    assert [p.name for p in tmp_path.iterdir()] == ["mopac.ini"]
+
+
+def test_cached_until_changed(tmp_path):
+    executor_config.clear()
+    path = executor_config.ini_path(tmp_path)
+    path.write_text("[local]\ninstallation = local\ncode = mopac\n")
+
+    config = executor_config.resolve("local", tmp_path)
+    config["version"] = "changed by the caller"
+    assert "version" not in executor_config.resolve("local", tmp_path)
+
+    path.write_text("[local]\ninstallation = local\ncode = /opt/mopac/MOPAC2016.exe\n")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    config = executor_config.resolve("local", tmp_path)
+    assert config["code"] == "/opt/mopac/MOPAC2016.exe"
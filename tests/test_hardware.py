@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the description of the hardware in the timing records."""
+
+import json
+import platform
+
+from mopac_step import hardware
+
+
+def test_fingerprint_cached_on_disk(tmp_path):
+    path = tmp_path / f"{platform.node()}.json"
+    saved = dict.fromkeys(hardware.FIELDS, "x")
+    path.write_text(json.dumps(saved))
+    # The cached file is used rather than probing the CPU
+    assert hardware.fingerprint(tmp_path) == saved
+
+
+def test_fingerprint(tmp_path):
+    result = hardware.fingerprint(tmp_path)
+    assert tuple(result) == hardware.FIELDS
+    assert result["node"] == platform.node()
+    path = tmp_path / f"{platform.node()}.json"
+    assert json.loads(path.read_text()) == result
+    # and the same object is returned for the rest of the process
+    assert hardware.fingerprint(tmp_path) is result
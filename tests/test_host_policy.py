@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the per-host policy for threads and MOZYME."""
+
+from pathlib import Path
+
+from mopac_step import HostPolicy
+from mopac_step.thread_benchmark import thread_ladder, water_cluster
+from .test_run import make_step
+
+
+def timing(n_basis, threads, mozyme, t):
+    return {
+        "n_atoms": n_basis // 2,
+        "n_basis": n_basis,
+        "threads": threads,
+        "mozyme": mozyme,
+        "time": t,
+    }
+
+
+TIMINGS = [
+    # Small: threads do not help, and MOZYME is slower
+    timing(100, 1, False, 1.0),
+    timing(100, 2, False, 0.95),
+    timing(100, 1, True, 2.0),
+    timing(100, 2, True, 2.0),
+    # Large: 2 threads help, and MOZYME is faster
+    timing(1000, 1, False, 100.0),
+    timing(1000, 2, False, 60.0),
+    timing(1000, 1, True, 30.0),
+    timing(1000, 2, True, None),
+]
+
+
+def test_from_timings():
+    policy = HostPolicy.from_timings(TIMINGS, host="here")
+    assert policy.threads == [(100, 1), (1000, 2)]
+    assert policy.mozyme_threads == [(100, 1), (1000, 1)]
+    assert policy.mozyme_atoms == 500
+
+    assert policy.threads_for(50) == 1
+    assert policy.threads_for(500) == 2
+    assert policy.threads_for(5000) == 2
+
+
+def test_save_load(tmp_path):
+    policy = HostPolicy.from_timings(TIMINGS, host="here")
+    path = policy.save(tmp_path / "here.json")
+    loaded = HostPolicy.load(path)
+    assert loaded.threads == policy.threads
+    assert loaded.mozyme_atoms == 500
+    assert HostPolicy.load(tmp_path / "missing.json") is None
+
+
+def test_ladder():
+    assert thread_ladder(1) == [1]
+    assert thread_ladder(6) == [1, 2, 4, 6]
+    assert len(water_cluster(600)) == 300
+
+
+def test_energy_mozyme(tmp_path, monkeypatch):
+    """The analysis uses MOZYME whenever the policy made the input use it."""
+    policy = HostPolicy(host="here", mozyme_atoms=2)
+    monkeypatch.setattr(HostPolicy, "load", classmethod(lambda cls, *args: policy))
+    mopac, _ = make_step(tmp_path)
+    mopac.run()
+
+    text = mopac.flowchart.executor.inputs[0]
+    assert text.count("AUX(") == 2
+    assert "MOZYME" in text.splitlines()[0]
+    output = (Path(mopac.directory) / "step.out").read_text()
+    assert "MOZYME Enthalpy of Formation" in output
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for timing the phases of a step."""
+
+import json
+
+from mopac_step import instrumentation
+
+
+def test_nested_phases(tmp_path):
+    timer = instrumentation.PhaseTimer(step="1.2")
+    with timer:
+        with instrumentation.phase("analyze"):
+            for _ in instrumentation.timed(range(3), "parse_aux"):
+                pass
+            with instrumentation.phase("store_results"):
+                pass
+    # Nothing is recorded without an active timer
+    with instrumentation.phase("analyze"):
+        pass
+
+    assert [r["phase"] for r in timer.records] == [
+        "analyze/parse_aux",
+        "analyze/parse_aux",
+        "analyze/parse_aux",
+        "analyze/parse_aux",
+        "analyze/store_results",
+        "analyze",
+    ]
+    assert set(timer.totals(depth=0)) == {"analyze"}
+    assert set(timer.totals()) == {
+        "analyze",
+        "analyze/parse_aux",
+        "analyze/store_results",
+    }
+
+    path = tmp_path / "timings.jsonl"
+    timer.write(path)
+    timer.write(path)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(lines) == 12
+    assert lines[-1]["step"] == "1.2" and lines[-1]["depth"] == 0
+
+
+def test_profile(tmp_path):
+    with instrumentation.profile("cProfile", tmp_path):
+        sum(range(1000))
+    assert (tmp_path / "profile.prof").exists()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for running MOPAC steps in the background."""
+
+import threading
+import time
+
+import pytest
+
+from mopac_step import JobQueue, MOPACJob
+
+
+def test_queue_limit():
+    queue = JobQueue(max_jobs=2)
+    lock = threading.Lock()
+    running = []
+    most = [0]
+
+    def work(n):
+        with lock:
+            running.append(n)
+            most[0] = max(most[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(n)
+        return n
+
+    futures = [queue.submit(work, n) for n in range(6)]
+    assert [f.result() for f in futures] == list(range(6))
+    assert most[0] == 2
+
+
+def stages(log):
+    """A step that waits for MOPAC, then analyzes."""
+    log.append("prepared")
+    value = yield None
+    log.append(f"analyzed {value}")
+    return "next node"
+
+
+def test_job_result():
+    log = []
+    step = stages(log)
+    next(step)
+    finished = []
+    future = JobQueue().submit(lambda: "results")
+    job = MOPACJob(None, step, future, finish=lambda: finished.append(True))
+    assert job.result() == "next node"
+    assert job.result() == "next node"
+    assert log == ["prepared", "analyzed results"]
+    assert finished == [True]
+
+
+def test_job_error():
+    step = stages([])
+    next(step)
+
+    def fail():
+        raise RuntimeError("MOPAC failed")
+
+    job = MOPACJob(None, step, JobQueue().submit(fail))
+    with pytest.raises(RuntimeError, match="MOPAC failed"):
+        job.result()
+    assert job.done()
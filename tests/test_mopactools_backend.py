@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the parts of the mopactools backend that need no MOPAC."""
+
+import numpy as np
+import pytest
+
+from mopac_step import mopactools_backend
+
+
+def test_unsupported():
+    keywords = [
+        "1SCF",
+        "PM7",
+        "AUX(MOS=10,XP,XS,PRECISION=3)",
+        "CHARGE=0",
+        "SINGLET",
+        "BONDS",
+    ]
+    assert mopactools_backend.unsupported(keywords) == []
+    assert mopactools_backend.unsupported(keywords + ["FORCE", "EF"]) == [
+        "FORCE",
+        "EF",
+    ]
+
+
+@pytest.mark.parametrize("hamiltonian", ["PM3", "MNDO", "MNDOD", "PM7-TS"])
+def test_unsupported_hamiltonian(hamiltonian):
+    """Hamiltonians that mopactools cannot run go to the executable."""
+    keywords = ["1SCF", hamiltonian, "CHARGE=0", "SINGLET"]
+    assert mopactools_backend.unsupported(keywords) == [hamiltonian]
+
+
+def test_bond_order_matrix():
+    """The sparse, 1-based bond orders become the AUX lower triangle."""
+    # Water: O bonded to both H, each H bonded to O
+    bond_index = [1, 3, 4, 5]
+    bond_atom = [2, 3, 1, 1]
+    bond_order = [0.95, 0.96, 0.95, 0.96]
+    result = mopactools_backend.bond_order_matrix(3, bond_index, bond_atom, bond_order)
+    expected = np.zeros((3, 3))
+    expected[1, 0] = 0.95
+    expected[2, 0] = 0.96
+    assert result.tolist() == expected[np.tril_indices(3)].tolist()
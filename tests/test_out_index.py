@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the index of the sections of the MOPAC output file."""
+
+from mopac_step import OutIndex
+
+banner = [
+    " " + "*" * 40,
+    " **" + " " * 36 + "**",
+    " **  MOPAC2016  **",
+    " **" + " " * 36 + "**",
+    " " + "*" * 40,
+    " ** Cite this program as: MOPAC2016",
+    " **  Stewart Computational Chemistry",
+    " " + "*" * 40,
+]
+
+
+def calculation(title, heat):
+    return [
+        "",
+        f" {title}",
+        "",
+        " FINAL  POINT  AND  DERIVATIVES",
+        f"          FINAL HEAT OF FORMATION =        {heat:.5f} KCAL/MOL",
+        "",
+    ]
+
+
+def test_sections(tmp_path):
+    """The file is split where the line-based version split it."""
+    lines = banner + calculation("first", -57.1)
+    lines += banner + calculation("second", -57.2)
+    lines += banner + calculation("third", -57.3)
+    path = tmp_path / "mopac.out"
+    path.write_text("\n".join(lines) + "\n")
+
+    with OutIndex(path) as out:
+        assert len(out) == 3
+        first, second, third = out
+        # The first citation does not count as a line, so the later sections
+        # start with the last lines of the one before.
+        assert list(first) == lines[0:13]
+        assert list(second) == lines[12:27]
+        assert list(third) == lines[26:]
+        assert len(second) == 15
+
+        assert "second" in second
+        assert "second" not in third
+        n = second.find("FINAL  POINT  AND  DERIVATIVES")
+        assert n == 13
+        assert list(second[n:]) == lines[25:27]
+        assert second[n + 1] == lines[26]
+        assert second.find("Nothing") == -1
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "mopac.out"
+    path.write_text("")
+    with OutIndex(path) as out:
+        assert len(out) == 1
+        assert list(out[0]) == []
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for running independent parts of a MOPAC calculation at once."""
+
+from pathlib import Path
+
+import pytest
+import seamm
+
+import mopac_step
+
+INPUT = """\
+1SCF PM7
+title
+strain 1
+ O 0.0 1 0.0 1 0.0 1
+1SCF PM7
+title
+strain 2
+ O 0.0 1 0.0 1 0.0 1
+1SCF PM7 OLDGEO
+title
+follow-up of strain 2
+"""
+
+
+class FakeExecutor(object):
+    """Writes an output and AUX section for each calculation in mopac.dat."""
+
+    def run(self, directory=None, files={}, return_files=[], **kwargs):
+        directory = Path(directory)
+        titles = files["mopac.dat"].splitlines()[2::4]
+        (directory / "mopac.out").write_text("".join(f"{t}\n" for t in titles))
+        aux = ""
+        for n, title in enumerate(titles):
+            aux += f' START OF MOPAC FILE\n TITLE="{title}"\n'
+            aux += f" CPU_TIME:SECONDS[1]= {n + 1}.0\n END OF MOPAC FILE\n"
+        (directory / "mopac.aux").write_text(aux)
+        return {"mopac.out": {"data": ""}}
+
+
+@pytest.fixture
+def mopac(tmp_path):
+    flowchart = seamm.Flowchart(directory=str(tmp_path))
+    node = mopac_step.MOPAC(flowchart=flowchart)
+    flowchart.add_node(node)
+    flowchart.add_edge(flowchart.get_node("1"), node, edge_type="execution")
+    flowchart.set_ids()
+    return node
+
+
+def test_independent_inputs(mopac):
+    starts = [
+        0,
+        INPUT.index("1SCF PM7\ntitle\nstrain 2"),
+        INPUT.index("1SCF PM7 OLDGEO"),
+    ]
+    calculations = [(["1SCF", "PM7"], None)] * 2 + [(["1SCF", "PM7", "OLDGEO"], None)]
+    groups = mopac._independent_inputs(INPUT, starts, calculations)
+    assert len(groups) == 2
+    assert "".join(groups) == INPUT
+    assert groups[1].startswith("1SCF PM7\ntitle\nstrain 2")
+
+
+def test_run_parallel(mopac):
+    split = INPUT.index("1SCF PM7\ntitle\nstrain 2")
+    groups = [INPUT[:split], INPUT[split:]]
+    result = mopac._run_parallel(
+        FakeExecutor(), groups, 2, return_files=["mopac.out", "mopac.aux"]
+    )
+    assert result["mopac.out"]["data"] == (
+        "strain 1\nstrain 2\nfollow-up of strain 2\n"
+    )
+
+    # The AUX file is in order, with the CPU time restarting for each part
+    base = mopac_step.MOPACBase()
+    path = Path(mopac.directory) / "mopac.aux"
+    sections = list(base.read_aux(path))
+    assert [s["CPU_TIME"] for s in sections] == [1.0, 1.0, 2.0]
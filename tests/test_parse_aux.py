@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for parsing MOPAC's AUX file."""
+
+import numpy as np
+import pytest
+
+import mopac_step
+from mopac_step.mopac_base import _aux_key, _fixed_width_floats
+
+# Two calculations, as written by MOPAC for e.g. a MOZYME calculation and its
+# follow-up. The second section has floating point numbers run together, as
+# MOPAC does when the numbers fill the field.
+AUX_TEXT = """\
+ START OF MOPAC FILE
+ ####################################
+ #                                  #
+ #       Start of Input data        #
+ #                                  #
+ ####################################
+ MOPAC_VERSION="MOPAC2016.22.191L"
+ METHOD=PM7
+ ATOM_EL[003]=
+   O  H  H
+ ATOM_X:ANGSTROMS[009]=
+    0.0000    0.0000    0.0000
+    0.9600    0.0000    0.0000
+   -0.2400    0.9300    0.0000
+ HEAT_OF_FORMATION:KCAL/MOL=-0.57776D+02
+ HEAT_OF_FORM_UPDATED:KCAL/MOL[1]=
+   -57.70000
+ HEAT_OF_FORM_UPDATED:KCAL/MOL[1]=
+   -57.77600
+ AO_ATOMINDEX[06]=
+   1 1 1 1 2 3
+ CPU_TIME:SECONDS[1]= 0.25
+ END OF MOPAC FILE
+ START OF MOPAC FILE
+ MOPAC_VERSION="MOPAC2016.22.191L"
+ ATOM_CHARGES[003]=
+  -0.61990  0.30995  0.30995
+ GRADIENTS:KCAL/MOL/ANGSTROM[09]= -10.123 -210.123-310.123
+    1.000    2.000    3.000
+    4.000    5.000    6.000
+ CPU_TIME:SECONDS[1]= 0.75
+ END OF MOPAC FILE
+"""
+
+
+@pytest.fixture
+def aux_path(tmp_path):
+    """An AUX file with two sections."""
+    path = tmp_path / "mopac.aux"
+    path.write_text(AUX_TEXT)
+    return path
+
+
+@pytest.fixture
+def base():
+    """A MOPACBase node, which holds the parsing methods."""
+    return mopac_step.MOPACBase()
+
+
+def test_parse_aux_list(base):
+    """parse_aux still handles a list of lines."""
+    lines = AUX_TEXT.splitlines()
+    end = lines.index(" END OF MOPAC FILE")
+    data = base.parse_aux(lines[1:end])
+
+    assert data["MOPAC_VERSION"] == "MOPAC2016.22.191L"
+    assert data["ATOM_EL"] == ["O", "H", "H"]
+    assert data["ATOM_X"][3] == pytest.approx(0.96)
+    assert data["HEAT_OF_FORMATION"] == pytest.approx(-57.776)
+    assert data["HEAT_OF_FORMATION,units"] == "kcal/mol"
+    assert data["HEAT_OF_FORM_UPDATED"] == [[-57.7], [-57.776]]
+    assert data["AO_ATOMINDEX"] == [1, 1, 1, 1, 2, 3]
+    assert data["CPU_TIME"] == pytest.approx(0.25)
+
+
+def test_read_aux_is_lazy(base, aux_path):
+    """read_aux yields one section at a time."""
+    sections = base.read_aux(aux_path)
+    first = next(sections)
+    assert first["METHOD"] == "PM7"
+    assert "ATOM_CHARGES" not in first
+
+    second = next(sections)
+    assert second["ATOM_CHARGES"] == pytest.approx([-0.6199, 0.30995, 0.30995])
+
+    with pytest.raises(StopIteration):
+        next(sections)
+
+
+def test_read_aux_run_together_floats(base, aux_path):
+    """Floating point numbers that are run together are split."""
+    _, second = base.read_aux(aux_path)
+    assert second["GRADIENTS"][0:3] == pytest.approx([-10.123, -210.123, -310.123])
+    assert len(second["GRADIENTS"]) == 9
+
+
+def test_read_aux_ignores_incomplete_section(base, tmp_path):
+    """A last section without its end marker, e.g. from a killed job, is
+    ignored."""
+    path = tmp_path / "mopac.aux"
+    text = AUX_TEXT + " START OF MOPAC FILE\n ATOM_CHARGES[003]=\n  -0.61990\n"
+    path.write_text(text)
+    sections = list(base.read_aux(path))
+    assert len(sections) == 2
+
+
+def test_read_aux_as_arrays(base, aux_path):
+    """Numerical arrays can be decoded directly into NumPy arrays."""
+    first, second = base.read_aux(aux_path, as_arrays=True)
+
+    assert isinstance(first["ATOM_X"], np.ndarray)
+    assert first["ATOM_X"].dtype == np.float64
+    assert first["ATOM_X"].shape == (9,)
+    assert first["AO_ATOMINDEX"].dtype == np.int64
+    assert first["AO_ATOMINDEX"].tolist() == [1, 1, 1, 1, 2, 3]
+
+    # Strings stay as lists and scalars as Python numbers
+    assert first["ATOM_EL"] == ["O", "H", "H"]
+    assert type(first["CPU_TIME"]) is float
+    assert type(first["HEAT_OF_FORMATION"]) is float
+
+    # Updated values are a list of arrays, one per step
+    assert len(first["HEAT_OF_FORM_UPDATED"]) == 2
+    assert first["HEAT_OF_FORM_UPDATED"][1][0] == pytest.approx(-57.776)
+
+    assert second["GRADIENTS"][0:3] == pytest.approx([-10.123, -210.123, -310.123])
+
+
+def test_read_aux_wanted(base, aux_path):
+    """Only the wanted properties are parsed; the rest are skipped."""
+    wanted = {"ATOM_X", "CPU_TIME"}
+    sections = base.read_aux(aux_path, wanted=wanted)
+    first = next(sections)
+    assert sorted(first) == ["ATOM_X", "ATOM_X,units", "CPU_TIME", "CPU_TIME,units"]
+    assert first["ATOM_X"][3] == pytest.approx(0.96)
+
+    # The wanted properties can be changed between sections
+    wanted.clear()
+    wanted.add("ATOM_CHARGES")
+    second = next(sections)
+    assert list(second) == ["ATOM_CHARGES"]
+    assert second["ATOM_CHARGES"] == pytest.approx([-0.6199, 0.30995, 0.30995])
+
+
+def test_energy_aux_properties():
+    """An energy step does not need e.g. the density matrix, but does need any
+    requested results."""
+    energy = mopac_step.Energy()
+    wanted = energy.aux_properties
+    assert "HEAT_OF_FORMATION" in wanted
+    assert "DENSITY_MATRIX" not in wanted
+
+    energy.parameters["results"].value = {"DENSITY_MATRIX": {"variable": "P"}}
+    assert "DENSITY_MATRIX" in energy.aux_properties
+
+    optimization = mopac_step.Optimization()
+    assert {"HEAT_OF_FORMATION", "ATOM_X_OPT"} <= optimization.aux_properties
+
+
+def test_parse_aux_fixed_width_block(base):
+    """A block in fixed columns is decoded at once, even when run together."""
+    block = [
+        " -10.123-210.123-310.123   1.000",
+        "   2.000   3.000   4.000",
+        "   5.000",
+    ]
+    expected = [-10.123, -210.123, -310.123, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert _fixed_width_floats(block).tolist() == pytest.approx(expected)
+
+    lines = [" GRADIENTS:KCAL/MOL/ANGSTROM[08]=", *block, " CPU_TIME:SECONDS[1]= 0.75"]
+    data = base.parse_aux(lines, as_arrays=True)
+    assert data["GRADIENTS"].tolist() == pytest.approx(expected)
+    assert data["CPU_TIME"] == pytest.approx(0.75)
+
+    data = base.parse_aux(lines)
+    assert data["GRADIENTS"] == pytest.approx(expected)
+
+
+def test_parse_aux_irregular_block(base):
+    """Lines that are not in fixed columns are split into tokens."""
+    lines = [
+        " ATOM_CHARGES[005]=",
+        "  -0.61990  0.30995",
+        " 0.1 0.2  0.3",
+        " CPU_TIME:SECONDS[1]= 0.75",
+    ]
+    assert _fixed_width_floats(lines[1:3]) is None
+    data = base.parse_aux(lines, as_arrays=True)
+    assert data["ATOM_CHARGES"].tolist() == pytest.approx(
+        [-0.6199, 0.30995, 0.1, 0.2, 0.3]
+    )
+
+
+def test_aux_key():
+    """The keys are parsed once and looked up in the metadata."""
+    key = _aux_key("ATOM_X:ANGSTROMS[0009]")
+    assert key.name == "ATOM_X"
+    assert key.units == "ANGSTROMS"
+    assert key.size == 9
+    assert key.kind == "float"
+    assert not key.accumulate
+    assert _aux_key("ATOM_X:ANGSTROMS[0009]") is key
+
+    key = _aux_key("HEAT_OF_FORM_UPDATED:KCAL/MOL")
+    assert key.size is None
+    assert key.accumulate
+
+
+def test_parse_aux_unknown(base, caplog):
+    """Unknown properties are kept as strings, with one warning."""
+    lines = [" NOT_A_PROPERTY[2]=", " a b", " NOT_A_PROPERTY[2]= c d"]
+    data = base.parse_aux(lines)
+    assert data["NOT_A_PROPERTY"] == ["c", "d"]
+    assert caplog.text.count("'NOT_A_PROPERTY' not recognized") == 1
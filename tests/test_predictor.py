@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for predicting the time for MOPAC calculations."""
+
+import pytest
+
+from mopac_step import TimingPredictor, TimingStore
+from mopac_step.predictor import kind, n_basis
+
+
+def test_n_basis():
+    assert n_basis("C6 H6") == 30
+    assert n_basis("C H2 Cl") == 10
+
+
+def test_kind():
+    assert kind("1SCF PM7 MOZYME") == (True, False, False, False)
+    assert kind(["PM7 FORCE", "PM7 EPS=78.4"]) == (False, True, False, True)
+    assert kind("PM7 THERMO(298,398)") == (False, True, False, False)
+    assert kind("PM7 C.I.=(4,2)") == (False, False, True, False)
+    # Keywords are matched exactly, not as parts of other words
+    assert kind("PM7 THERMOX FORCES MOZYMES") == (False, False, False, False)
+
+
+def timings(store):
+    """Timings where 4 threads are twice as fast for large systems."""
+    for formula, n in (("C10 H20", 60), ("C100 H200", 600), ("C1000 H2000", 6000)):
+        for nproc in (1, 2, 4):
+            t = 1e-6 * n**2
+            if n > 1000:
+                t /= {1: 1, 2: 1.05, 4: 2}[nproc]
+            store.add(
+                {"node": "here", "formula": formula, "keywords": "1SCF PM7"}
+                | {"nproc": nproc, "time": t}
+            )
+
+
+def test_predict(tmp_path):
+    store = TimingStore(tmp_path / "mopac.db")
+    timings(store)
+    predictor = TimingPredictor.load(store, host="here")
+    assert predictor.predict(600, ["1SCF PM7"], 1) == pytest.approx(0.36, rel=0.5)
+    assert predictor.predict(600, ["1SCF PM7 MOZYME"], 1) is None
+
+    # Extra threads are not worth it for small systems
+    assert predictor.best_threads(60, ["1SCF PM7"], 4) == 1
+    assert predictor.best_threads(6000, ["1SCF PM7"], 4) == 4
+    assert predictor.best_threads(6000, ["1SCF PM7"], 2) == 1
+
+    # Without timings there is no prediction
+    predictor = TimingPredictor.load(TimingStore(tmp_path / "missing.db"))
+    assert predictor.best_threads(600, ["1SCF PM7"], 4) is None
+
+
+def test_pooled(tmp_path):
+    """A single timing with more threads is compared using the common slope."""
+    store = TimingStore(tmp_path / "mopac.db")
+    for formula, n in (("C10 H20", 60), ("C100 H200", 600), ("C1000 H2000", 6000)):
+        store.add(
+            {"node": "here", "formula": formula, "keywords": "1SCF PM7"}
+            | {"nproc": 1, "time": 1e-6 * n**2}
+        )
+    store.add(
+        {"node": "here", "formula": "C100 H200", "keywords": "1SCF PM7"}
+        | {"nproc": 4, "time": 1e-6 * 600**2 / 3}
+    )
+    predictor = TimingPredictor.load(store, host="here")
+    assert (kind("1SCF PM7"), 4) not in predictor.models
+    assert predictor.predict(6000, ["1SCF PM7"], 4) == pytest.approx(12, rel=0.01)
+    assert predictor.best_threads(6000, ["1SCF PM7"], 4) == 4
+    assert predictor.predict(6000, ["1SCF PM7"], 2) is None
+
+
+def test_explore(tmp_path):
+    """Long calculations try more threads than have been timed."""
+    store = TimingStore(tmp_path / "mopac.db")
+    for formula, n in (("C10 H20", 60), ("C100 H200", 600), ("C1000 H2000", 6000)):
+        store.add(
+            {"node": "here", "formula": formula, "keywords": "1SCF PM7"}
+            | {"nproc": 1, "time": 1e-5 * n**2}
+        )
+    predictor = TimingPredictor.load(store, host="here")
+    # Short calculations stay serial
+    assert predictor.best_threads(60, ["1SCF PM7"], 8) == 1
+    assert predictor.best_threads(6000, ["1SCF PM7"], 8) == 2
+    assert predictor.best_threads(6000, ["1SCF PM7"], 1) == 1
+
+    # Once 2 threads are timed and found faster, 4 are tried
+    store.add(
+        {"node": "here", "formula": "C1000 H2000", "keywords": "1SCF PM7"}
+        | {"nproc": 2, "time": 1e-5 * 6000**2 / 1.8}
+    )
+    predictor = TimingPredictor.load(store, host="here")
+    assert predictor.best_threads(6000, ["1SCF PM7"], 8) == 4
+    assert predictor.best_threads(6000, ["1SCF PM7"], 3) == 3
+
+    # but not if 2 threads were no faster
+    store.add(
+        {"node": "here", "formula": "C100 H200", "keywords": "1SCF PM7"}
+        | {"nproc": 2, "time": 1e-5 * 600**2}
+    )
+    store.add(
+        {"node": "here", "formula": "C1000 H2000", "keywords": "1SCF PM7"}
+        | {"nproc": 2, "time": 1e-5 * 6000**2 * 1.8}
+    )
+    predictor = TimingPredictor.load(store, host="here")
+    assert predictor.best_threads(6000, ["1SCF PM7"], 8) == 1
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the cache of MOPAC results."""
+
+import os
+
+import pytest
+
+from mopac_step import ResultCache, parse_size, result_cache
+
+CONFIG = {"code": "mopac", "version": "2023.1"}
+
+
+def test_parse_size():
+    assert parse_size("2 GB") == 2_000_000_000
+    assert parse_size("500mb") == 500_000_000
+    assert parse_size("1000") == 1000
+    assert parse_size(0) == 0
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_key():
+    cache = ResultCache("unused")
+    key = cache.key("1SCF PM7\n", CONFIG)
+    assert key == cache.key("1SCF PM7\n", dict(reversed(CONFIG.items())))
+    assert key != cache.key("1SCF PM6\n", CONFIG)
+    assert key != cache.key("1SCF PM7\n", {**CONFIG, "version": "2023.2"})
+
+
+def test_key_inputs(tmp_path):
+    """The files read by MOPAC, e.g. the density, are part of the key."""
+    cache = ResultCache("unused")
+    density = tmp_path / "mopac.den"
+    missing = cache.key("1SCF PM7 OLDENS\n", CONFIG, [density])
+    density.write_bytes(b"first")
+    first = cache.key("1SCF PM7 OLDENS\n", CONFIG, [density])
+    density.write_bytes(b"second")
+    second = cache.key("1SCF PM7 OLDENS\n", CONFIG, [density])
+    assert len({missing, first, second}) == 3
+
+
+def test_identity(tmp_path):
+    """MOPAC is identified by its executable, not the version of the plug-in."""
+    path = tmp_path / "bin" / "mopac"
+    path.parent.mkdir()
+    path.write_bytes(b"MOPAC 22.0")
+    config = {"installation": "local", "code": f"{path} -v", "version": "2024.1"}
+    first = result_cache.identity(config)
+    assert first["executable"] == str(path.resolve())
+
+    # Upgrading MOPAC at the same path changes it
+    path.write_bytes(b"MOPAC 23.0 build 2")
+    assert result_cache.identity(config) != first
+
+    config = {"installation": "conda", "code": "mopac", "conda-environment": ""}
+    config["conda-environment"] = str(tmp_path)
+    assert result_cache.identity(config)["executable"] == str(path.resolve())
+
+    config = {"installation": "local", "code": str(tmp_path / "missing")}
+    assert result_cache.identity(config) is None
+
+    config = {"code": "mopac", "container": "seamm-mopac:{version}", "version": "1"}
+    assert result_cache.identity(config)["container"] == "seamm-mopac:{version}"
+
+
+def test_put_get(tmp_path):
+    cache = ResultCache(tmp_path / "cache")
+    run = tmp_path / "run"
+    run.mkdir()
+    (run / "mopac.out").write_text("output")
+    (run / "mopac.aux").write_text("aux")
+
+    key = cache.key("1SCF PM7\n", CONFIG)
+    job = tmp_path / "job"
+    job.mkdir()
+    assert cache.get(key, job) is None
+
+    assert cache.put(key, run, ["mopac.out", "mopac.aux", "mopac.arc"])
+    assert cache.get(key, job) == ["mopac.out", "mopac.aux"]
+    assert (job / "mopac.out").read_text() == "output"
+    assert not (job / "mopac.arc").exists()
+
+
+def test_eviction(tmp_path):
+    cache = ResultCache(tmp_path / "cache", max_size=35)
+    run = tmp_path / "run"
+    run.mkdir()
+    (run / "mopac.out").write_text("x" * 10)
+
+    keys = [cache.key(f"calculation {i}", CONFIG) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, run, ["mopac.out"])
+        # Make the order of use certain, whatever the resolution of the clock
+        path = cache.path / key[0:2] / key
+        os.utime(path, (i, i))
+    cache.get(keys[0], run)  # Now the most recently used
+
+    cache.put(cache.key("calculation 3", CONFIG), run, ["mopac.out"])
+    assert cache.get(keys[1], run) is None
+    assert cache.get(keys[0], run) is not None
+    assert cache.get(keys[2], run) is not None
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for compressing the output files of finished MOPAC runs."""
+
+from pathlib import Path
+
+import pytest
+import seamm
+
+import mopac_step
+from mopac_step import retention
+from .test_out_index import banner, calculation
+from .test_aux_cache import _same
+from .test_parse_aux import AUX_TEXT
+
+
+@pytest.fixture
+def mopac(tmp_path):
+    """A MOPAC step with a finished run in its directory."""
+    flowchart = seamm.Flowchart(directory=str(tmp_path))
+    node = mopac_step.MOPAC(flowchart=flowchart)
+    flowchart.add_node(node)
+    flowchart.add_edge(flowchart.get_node("1"), node, edge_type="execution")
+    flowchart.set_ids()
+
+    directory = Path(node.directory)
+    directory.mkdir(parents=True)
+    lines = banner + calculation("first", -57.1) + banner + calculation("next", -57.2)
+    (directory / "mopac.out").write_text("\n".join(lines) + "\n")
+    (directory / "mopac.aux").write_text(AUX_TEXT)
+    return node
+
+
+def _read(node, wanted=None):
+    """Parse the results as on a rerun, returning the AUX data and out text."""
+    aux_sections, out = node._read_results(wanted)
+    with out:
+        text = [section.text for section in out]
+    return list(aux_sections), text
+
+
+def _check(result, expected):
+    assert result[1] == expected[1]
+    assert len(result[0]) == len(expected[0])
+    for a, b in zip(result[0], expected[0]):
+        _same(a, b)
+
+
+def test_compress(tmp_path):
+    path = tmp_path / "mopac.out"
+    path.write_text("line\n" * 1000)
+    result = retention.compress(path)
+    assert result == tmp_path / "mopac.out.gz"
+    assert not path.exists()
+    assert result.stat().st_size < 1000
+    assert retention.locate(path) == result
+    with retention.open_mappable(path) as fd:
+        assert fd.read() == b"line\n" * 1000
+
+    assert retention.compress(path) is None
+    assert retention.locate(tmp_path / "other") == tmp_path / "other"
+
+
+def test_keep(mopac):
+    expected = _read(mopac)
+    mopac._retain_files("keep")
+    directory = Path(mopac.directory)
+    assert (directory / "mopac.out").exists()
+    assert (directory / "mopac.aux").exists()
+    _check(_read(mopac), expected)
+
+
+def test_compress_files(mopac):
+    """The compressed files are read transparently, using the sidecar."""
+    expected = _read(mopac)
+    mopac._retain_files("compress")
+    directory = Path(mopac.directory)
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "mopac.aux.gz",
+        "mopac.aux.npz",
+        "mopac.out.gz",
+    ]
+    with mopac_step.AuxCache(directory / "mopac.aux", as_arrays=True) as sidecar:
+        assert sidecar.open()
+
+    # The sidecar is used, so the AUX file is not parsed again
+    mopac.parse_aux = None
+    _check(_read(mopac), expected)
+
+
+def test_compress_without_sidecar(mopac):
+    """Without a sidecar, the compressed AUX file is parsed."""
+    mopac._retain_files("compress")
+    directory = Path(mopac.directory)
+    assert not (directory / "mopac.aux.npz").exists()
+    aux, _ = _read(mopac)
+    assert len(aux) == 2
+    assert (directory / "mopac.aux.npz").exists()
+
+
+def test_minimal(mopac):
+    """The AUX file is removed once its sections are in the sidecar."""
+    expected = _read(mopac)
+    mopac._retain_files("minimal")
+    directory = Path(mopac.directory)
+    assert not (directory / "mopac.aux").exists()
+    assert not (directory / "mopac.aux.gz").exists()
+    assert (directory / "mopac.out.gz").exists()
+    _check(_read(mopac), expected)
+
+
+def test_minimal_parses_all(mopac):
+    """The AUX file is only removed once the sidecar holds all of it."""
+    wanted = {"HEAT_OF_FORMATION"}
+    expected = _read(mopac)
+    directory = Path(mopac.directory)
+    (directory / "mopac.aux.npz").unlink()
+    _read(mopac, wanted)
+    with mopac_step.AuxCache(directory / "mopac.aux", as_arrays=True) as sidecar:
+        assert sidecar.open()
+        assert sidecar.complete and not sidecar.full
+
+    mopac._retain_files("compress")
+    with mopac_step.AuxCache(directory / "mopac.aux", as_arrays=True) as sidecar:
+        assert sidecar.open()
+        assert not sidecar.full
+    mopac._retain_files("minimal")
+    assert sorted(p.name for p in directory.iterdir()) == [
+        "mopac.aux.npz",
+        "mopac.out.gz",
+    ]
+    mopac.parse_aux = None
+    _check(_read(mopac), expected)
+
+
+def test_new_aux_invalidates_sidecar(mopac):
+    """A sidecar for a removed AUX file is not used for a new one."""
+    _read(mopac)
+    mopac._retain_files("minimal")
+    directory = Path(mopac.directory)
+    (directory / "mopac.aux").write_text(AUX_TEXT)
+    with mopac_step.AuxCache(directory / "mopac.aux", as_arrays=True) as sidecar:
+        assert not sidecar.open()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for running the MOPAC step, with a stand-in for MOPAC."""
+
+import json
+from pathlib import Path
+
+import molsystem
+import pytest
+import seamm
+
+import mopac_step
+from mopac_step import densities, result_cache
+from .test_out_index import banner, calculation
+from .test_parse_aux import AUX_TEXT
+
+# One section of the AUX file
+AUX_SECTION = AUX_TEXT.split(" END OF MOPAC FILE")[0] + " END OF MOPAC FILE\n"
+
+
+class FakeMOPAC(object):
+    """Writes the output and AUX section for each calculation in mopac.dat."""
+
+    name = "local"
+
+    def __init__(self):
+        self.inputs = []
+
+    def run(self, directory=None, files={}, return_files=[], **kwargs):
+        directory = Path(directory)
+        text = files["mopac.dat"]
+        self.inputs.append(text)
+        # Every calculation has the AUX keyword
+        n = sum(1 for line in text.splitlines() if "AUX(" in line)
+        lines = []
+        for i in range(n):
+            lines += banner + calculation(f"calculation {i}", -57.1 - i)
+        out = "\n".join(lines) + "\n MOPAC DONE\n"
+        (directory / "mopac.out").write_text(out)
+        (directory / "mopac.aux").write_text(n * AUX_SECTION)
+        if "DENOUT" in text:
+            (directory / "mopac.den").write_bytes(b"density")
+        return {"mopac.out": {"data": out}}
+
+
+def make_step(directory, n_energies=1, configurations=("water",)):
+    """A MOPAC step with Energy substeps, and a system with configurations.
+
+    Parameters
+    ----------
+    directory : pathlib.Path
+        The directory for the flowchart.
+    n_energies : int = 1
+        The number of Energy substeps.
+    configurations : [str] = ("water",)
+        The names of the configurations of water, the last being current.
+
+    Returns
+    -------
+    mopac_step.MOPAC, molsystem._System
+        The step and the system.
+    """
+    seamm.flowchart_variables = seamm.Variables()
+    flowchart = seamm.Flowchart(directory=str(directory))
+    node = mopac_step.MOPAC(flowchart=flowchart)
+    flowchart.add_node(node)
+    flowchart.add_edge(flowchart.get_node("1"), node, edge_type="execution")
+    previous = node.subflowchart.get_node("1")
+    for _ in range(n_energies):
+        energy = mopac_step.Energy(flowchart=node.subflowchart)
+        node.subflowchart.add_node(energy)
+        node.subflowchart.add_edge(previous, energy, edge_type="execution")
+        previous = energy
+    flowchart.set_ids()
+    flowchart.executor = FakeMOPAC()
+
+    system_db = molsystem.SystemDB(filename=":memory:")
+    seamm.flowchart_variables.set_variable("_system_db", system_db)
+    system = system_db.create_system(name="water")
+    for i, name in enumerate(configurations):
+        configuration = system.create_configuration(name=name)
+        configuration.atoms.append(
+            x=[0.0, 0.96, -0.24 + 0.01 * i],
+            y=[0.0, 0.0, 0.93],
+            z=[0.0, 0.0, 0.0],
+            symbol=["O", "H", "H"],
+        )
+
+    node.options = {
+        "ncores": "1",
+        "parallel_jobs": "1",
+        "result_cache_size": "0",
+    }
+    node.global_options = {"ncores": "available", "root": str(directory)}
+    node._timing_store = mopac_step.TimingStore(Path(directory) / "timing.db")
+    return node, system
+
+
+@pytest.fixture
+def mopac(tmp_path):
+    node, _ = make_step(tmp_path)
+    return node
+
+
+def test_run(mopac):
+    mopac.run()
+    directory = Path(mopac.directory)
+    assert (directory / "success.dat").exists()
+    assert len(mopac.flowchart.executor.inputs) == 1
+
+
+def _phases(node):
+    path = Path(node.directory) / "timings.jsonl"
+    return [json.loads(line)["phase"] for line in path.read_text().splitlines()]
+
+
+def test_executor_phase(mopac):
+    """The time running MOPAC is recorded with the other phases."""
+    mopac.run()
+    assert "executor" in _phases(mopac)
+    rows = mopac._timing_store.rows()
+    assert len(rows) == 1
+    assert rows[0]["nproc"] == 1
+    assert "executor" in rows[0]["phases"]
+
+
+def test_parallel_jobs_not_timed(tmp_path):
+    """Several MOPAC processes at once do not give a timing for the history."""
+    mopac, _ = make_step(tmp_path, n_energies=2)
+    mopac.options["parallel_jobs"] = "2"
+    # Treat the two calculations as independent
+    mopac._independent_inputs = lambda text, starts, calculations: [
+        text[: starts[1]],
+        text[starts[1] :],
+    ]
+    mopac.run()
+    assert len(mopac.flowchart.executor.inputs) == 2
+    assert mopac._timing_store.rows() == []
+
+
+def test_timed_after_parallel_jobs(tmp_path):
+    """A run that is not timed does not stop later runs being timed."""
+    mopac, _ = make_step(tmp_path, n_energies=2)
+    mopac.options["parallel_jobs"] = "2"
+    mopac._independent_inputs = lambda text, starts, calculations: [
+        text[: starts[1]],
+        text[starts[1] :],
+    ]
+    mopac.run()
+    assert mopac._timing_store.rows() == []
+
+    # Rerun, this time as one MOPAC process
+    mopac.options["parallel_jobs"] = "1"
+    del mopac._independent_inputs
+    (Path(mopac.directory) / "success.dat").unlink()
+    mopac.run()
+    assert len(mopac.flowchart.executor.inputs) == 3
+    rows = mopac._timing_store.rows()
+    assert len(rows) == 1
+    assert rows[0]["nproc"] == 1
+
+
+def test_cached_density(mopac, monkeypatch):
+    """Cached results include the density, for later steps to start from."""
+    monkeypatch.setattr(
+        result_cache, "identity", lambda config: {"executable": "mopac"}
+    )
+    mopac.options["result_cache_size"] = "10 MB"
+    monkeypatch.setattr(densities, "registry", densities.DensityRegistry())
+    mopac.run()
+    directory = Path(mopac.directory)
+    for path in directory.glob("mopac.*"):
+        path.unlink()
+    (directory / "success.dat").unlink()
+    # As in a new session, with no densities saved
+    densities.registry = densities.DensityRegistry()
+    mopac.run()
+    assert len(mopac.flowchart.executor.inputs) == 1
+    assert (directory / "mopac.den").read_bytes() == b"density"
+    structure_lines, _ = mopac.mopac_structure()
+    keywords = mopac.flowchart.executor.inputs[0].splitlines()[0].split()
+    assert densities.registry.get(structure_lines, keywords) == directory / "mopac.den"
+
+
+def test_sidecar_complete(mopac):
+    """The analysis takes only its sections, yet the sidecar is complete."""
+    mopac.run()
+    aux = Path(mopac.directory) / "mopac.aux"
+    with mopac_step.AuxCache(aux, as_arrays=True) as sidecar:
+        assert sidecar.open()
+        assert sidecar.complete
+        assert not sidecar.full
+
+
+@pytest.mark.parametrize(
+    "policy, files",
+    [
+        ("keep", ["mopac.aux", "mopac.aux.npz", "mopac.out"]),
+        ("compress", ["mopac.aux.gz", "mopac.aux.npz", "mopac.out.gz"]),
+        ("minimal", ["mopac.aux.npz", "mopac.out.gz"]),
+    ],
+)
+def test_mopac_files(mopac, policy, files):
+    """The output files are kept, compressed or removed, and still rerun."""
+    mopac.options["mopac_files"] = policy
+    mopac.run()
+    directory = Path(mopac.directory)
+    assert sorted(p.name for p in directory.glob("mopac.[ao]*")) == files
+    first = (directory / "step.out").read_text()
+    assert "Enthalpy of Formation" in first
+
+    # Rerunning analyzes the results again without running MOPAC
+    (directory / "step.out").unlink()
+    mopac.run()
+    assert len(mopac.flowchart.executor.inputs) == 1
+    again = (directory / "step.out").read_text()
+    assert again[again.index("Results") :] == first[first.index("Results") :]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for writing the structure for the MOPAC input."""
+
+import molsystem
+import pytest
+import seamm
+
+import mopac_step
+
+
+@pytest.fixture
+def mopac(tmp_path):
+    seamm.flowchart_variables = seamm.Variables()
+    flowchart = seamm.Flowchart(directory=str(tmp_path))
+    node = mopac_step.MOPAC(flowchart=flowchart)
+    flowchart.add_node(node)
+    flowchart.add_edge(flowchart.get_node("1"), node, edge_type="execution")
+    flowchart.set_ids()
+
+    system_db = molsystem.SystemDB(filename=":memory:")
+    seamm.flowchart_variables.set_variable("_system_db", system_db)
+    system = system_db.create_system()
+    configuration = system.create_configuration(name="methane")
+    configuration.atoms.add_attribute("freeze", coltype="str", default="")
+    configuration.atoms.append(
+        x=[0.0, 1.09, -0.36],
+        y=[0.0, 0.0, 1.03],
+        z=[0.0, 0.0, 0.0],
+        symbol=["C", "H", "Cl"],
+        freeze=["", "xz", "y"],
+    )
+    return node
+
+
+def test_structure(mopac):
+    structure, symlines = mopac.mopac_structure()
+    assert structure == (
+        "C    0.00000000 1   0.00000000 1   0.00000000 1\n"
+        "H    1.09000000 0   0.00000000 1   0.00000000 0\n"
+        "Cl  -0.36000000 1   1.03000000 0   0.00000000 1\n"
+    )
+    assert symlines == ""
+
+
+def test_structure_cache(mopac):
+    _, configuration = mopac.get_system_configuration(None)
+    with mopac.structure_cache():
+        first = mopac.mopac_structure()
+        assert mopac.mopac_structure() is first
+    # Outside the context the structure is written again
+    configuration.atoms.set_coordinates([[0.0, 0.0, 0.1]] * 3, fractionals=False)
+    assert mopac.mopac_structure() != first
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the database of MOPAC timings."""
+
+from concurrent.futures import ThreadPoolExecutor
+import csv
+
+from mopac_step import TimingStore
+from mopac_step.timing_store import COLUMNS
+
+
+def test_import_and_export(tmp_path):
+    # The timings from before the database are imported
+    (tmp_path / "mopac.csv").write_text(
+        "node,formula,keywords,nproc,time\nold,C H4,1SCF PM7,1,0.5\n"
+    )
+    store = TimingStore(tmp_path / "mopac.db")
+    run = store.add(
+        {"node": "new", "formula": "C6 H6", "keywords": "1SCF PM7", "time": 1.5}
+        | {"nproc": 2},
+        phases={"mopac": 1.2, "analyze": 0.2},
+    )
+    assert run == 2
+
+    rows = store.rows(node="new")
+    assert len(rows) == 1
+    assert rows[0]["nproc"] == 2
+    assert rows[0]["phases"] == {"mopac": 1.2, "analyze": 0.2}
+    assert store.rows(node="old")[0]["time"] == 0.5
+
+    assert store.export_csv(tmp_path / "export.csv") == 2
+    with (tmp_path / "export.csv").open(newline="") as fd:
+        rows = list(csv.DictReader(fd))
+    assert tuple(rows[0]) == COLUMNS
+    assert [row["formula"] for row in rows] == ["C H4", "C6 H6"]
+
+
+def test_csv(tmp_path):
+    """Each run is also appended to the CSV file, for the tools that read it."""
+    store = TimingStore(tmp_path / "mopac.db")
+    store.add({"node": "here", "formula": "C6 H6", "nproc": 2, "time": 1.5})
+    store.add(["here", "", "", "", "", "today"] + 6 * [""] + ["1", "0.5"])
+    with (tmp_path / "mopac.csv").open(newline="") as fd:
+        rows = list(csv.DictReader(fd))
+    assert tuple(rows[0]) == COLUMNS
+    assert [row["nproc"] for row in rows] == ["2", "1"]
+    assert rows[1]["date"] == "today"
+
+    # A new database starts from the CSV file
+    store = TimingStore(tmp_path / "new.db", csv_path=tmp_path / "mopac.csv")
+    assert len(store.rows()) == 2
+
+    store = TimingStore(tmp_path / "other.db", csv_path=None)
+    store.add({"node": "here", "time": 1.0})
+    assert not (tmp_path / "other.csv").exists()
+
+
+def test_concurrent_writes(tmp_path):
+    store = TimingStore(tmp_path / "mopac.db")
+
+    def add(n):
+        return TimingStore(store.path).add({"node": "here", "time": n})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(add, range(40)))
+    assert sorted(ids) == list(range(1, 41))
+    assert store.last_id() == 40